@@ -1,37 +1,89 @@
 import asyncio
-from core.llm import get_llm_response
+from core.llm import aget_json_response
+from core.tracing import traced
+from core.prompts import fit, fit_lines
+from agents.memory import ArchitectState
 import json
 
+def average_score(items: list, default: float) -> float:
+    """Mean of the items' scores, skipping replies that never validated"""
+    scores = [item["score"] for item in items if item.get("score") is not None]
+    return sum(scores) / len(scores) if scores else default
+
+async def run_step_graph(steps: dict) -> dict:
+    """Run {name: (dependencies, step_fn)} as a small DAG.
+
+    Each step starts as soon as its dependencies finish and is called with
+    their results in the listed order; independent steps run concurrently.
+    """
+    tasks = {}
+    
+    async def run_step(name):
+        deps, step_fn = steps[name]
+        dep_results = [await tasks[d] for d in deps]
+        return await step_fn(*dep_results)
+    
+    # Create every task before any runs, so steps can await each other by name
+    for name in steps:
+        tasks[name] = asyncio.ensure_future(run_step(name))
+    try:
+        await asyncio.gather(*tasks.values())
+    finally:
+        for task in tasks.values():
+            task.cancel()
+    return {name: task.result() for name, task in tasks.items()}
+
+ARCHITECT_SYSTEM_PROMPT = """
+        You are the Chief Policy Architect. You analyse citizen and Senate feedback
+        on a government policy and revise it toward consensus.
+        Always reply with a single JSON object in the format you are asked for.
+        """
+
 class ArchitectAgent:
     def __init__(self):
         self.role = "Chief Policy Architect"
-        self.iteration_history = []
-        self.analysis_logs = []  # For streaming real-time logs
+        self.state = ArchitectState()  # Bounded iteration history and analysis logs
         self.current_analysis = ""
     
+    @property
+    def iteration_history(self):
+        return self.state.iteration_history
+    
     def log_step(self, step: str, content: str):
         """Log analysis step for real-time streaming"""
         log_entry = {"step": step, "content": content}
-        self.analysis_logs.append(log_entry)
+        self.state.analysis_logs.append(log_entry)
         return log_entry
     
     def get_analysis_logs(self):
         """Get all logged analysis steps"""
-        return self.analysis_logs
+        return self.state.analysis_logs.to_list()
     
     def clear_logs(self):
         """Clear logs for new analysis"""
-        self.analysis_logs = []
+        self.state.analysis_logs.clear()
     
-    async def analyze_step_by_step(self, policy: str, citizen_feedback: list, senate_reports: list, iteration: int = 1):
-        """Generate step-by-step analysis logs in real-time"""
-        self.clear_logs()
-        
-        # Step 1: Summarize citizen concerns
+    def reset(self):
+        """Forget all history before reusing the agent for another run"""
+        self.state.reset()
+        self.current_analysis = ""
+    
+    def snapshot(self) -> dict:
+        return {"role": self.role, **self.state.snapshot()}
+    
+    def restore(self, snapshot: dict):
+        """Load memory saved by snapshot()"""
+        self.state.restore(snapshot)
+    
+    @traced("architect.citizens")
+    async def analyze_citizens(self, citizen_feedback: list, avg_citizen_score: float, debate_digest: str = None):
+        """Step 1: Summarize citizen concerns (from the debate digest when there is one)"""
         self.log_step("CITIZEN_ANALYSIS", "Analyzing citizen feedback...")
         
-        citizen_summary = "\n".join([f"- {f['agent']} ({f.get('emotional_state', 'neutral')}): {f['message']}" for f in citizen_feedback[:15]])
-        avg_citizen_score = sum(f.get('score', 50) for f in citizen_feedback) / len(citizen_feedback) if citizen_feedback else 50
+        if debate_digest:
+            citizen_summary = fit(debate_digest, "architect_citizens", "feedback")
+        else:
+            citizen_summary = fit_lines([f"- {f['agent']} ({f.get('emotional_state', 'neutral')}): {f['message']}" for f in citizen_feedback], "architect_citizens", "feedback")
         
         prompt_citizens = f"""
         Analyze these citizen responses to the policy:
@@ -47,17 +99,18 @@ class ArchitectAgent:
             "suggested_fixes": ["fix1", "fix2"]
         }}
         """
-        from core.llm import get_json_response
-        citizen_analysis = await asyncio.to_thread(get_json_response, prompt_citizens)
+        citizen_analysis = await aget_json_response(prompt_citizens, system=ARCHITECT_SYSTEM_PROMPT, schema="architect_citizens", agent=self.role)
         
         self.log_step("CITIZEN_FINDINGS", json.dumps(citizen_analysis, indent=2))
-        await asyncio.sleep(0.3)  # Simulate processing time
-        
-        # Step 2: Summarize Senate analysis
+        return citizen_analysis
+    
+    @traced("architect.senate")
+    async def analyze_senate(self, senate_reports: list, avg_senate_score: float):
+        """Step 2: Summarize Senate analysis"""
         self.log_step("SENATE_ANALYSIS", "Analyzing Senate recommendations...")
         
-        senate_summary = "\n".join([f"- {r['agent']} (Score: {r.get('score', 'N/A')}): {r['message']}" for r in senate_reports])
-        avg_senate_score = sum(r.get('score', 50) for r in senate_reports) / len(senate_reports) if senate_reports else 50
+        # Reports accumulate across iterations; the newest matter most
+        senate_summary = fit_lines([f"- {r['agent']} (Score: {r['score'] if r.get('score') is not None else 'N/A'}): {r['message']}" for r in senate_reports], "architect_senate", "reports", newest=True)
         
         prompt_senate = f"""
         Analyze these Senate observer reports:
@@ -73,12 +126,14 @@ class ArchitectAgent:
             "political_feasibility": "high/medium/low"
         }}
         """
-        senate_analysis = await asyncio.to_thread(get_json_response, prompt_senate)
+        senate_analysis = await aget_json_response(prompt_senate, system=ARCHITECT_SYSTEM_PROMPT, schema="architect_senate", agent=self.role)
         
         self.log_step("SENATE_FINDINGS", json.dumps(senate_analysis, indent=2))
-        await asyncio.sleep(0.3)
-        
-        # Step 3: Identify conflicts
+        return senate_analysis
+    
+    @traced("architect.conflicts")
+    async def analyze_conflicts(self, citizen_analysis: dict, senate_analysis: dict):
+        """Step 3: Identify conflicts (needs both earlier findings)"""
         self.log_step("CONFLICT_ANALYSIS", "Identifying citizen vs government conflicts...")
         
         prompt_conflicts = f"""
@@ -94,28 +149,42 @@ class ArchitectAgent:
             "impossible_to_reconcile": ["item1"] or []
         }}
         """
-        conflict_analysis = await asyncio.to_thread(get_json_response, prompt_conflicts)
+        conflict_analysis = await aget_json_response(prompt_conflicts, system=ARCHITECT_SYSTEM_PROMPT, schema="architect_conflicts", agent=self.role)
         
         self.log_step("CONFLICTS_IDENTIFIED", json.dumps(conflict_analysis, indent=2))
-        await asyncio.sleep(0.3)
+        return conflict_analysis
+    
+    async def analyze_step_by_step(self, policy: str, citizen_feedback: list, senate_reports: list, iteration: int = 1,
+                                   debate_digest: str = None):
+        """Generate step-by-step analysis logs in real-time"""
+        self.clear_logs()
+        
+        avg_citizen_score = average_score(citizen_feedback, 50)
+        avg_senate_score = average_score(senate_reports, 50)
+        
+        # Citizen and Senate analyses are independent; only the conflict step waits on both
+        results = await run_step_graph({
+            "citizen_analysis": ((), lambda: self.analyze_citizens(citizen_feedback, avg_citizen_score, debate_digest)),
+            "senate_analysis": ((), lambda: self.analyze_senate(senate_reports, avg_senate_score)),
+            "conflict_analysis": (("citizen_analysis", "senate_analysis"), self.analyze_conflicts),
+        })
         
         return {
-            "citizen_analysis": citizen_analysis,
-            "senate_analysis": senate_analysis,
-            "conflict_analysis": conflict_analysis,
+            **results,
             "avg_citizen_score": avg_citizen_score,
             "avg_senate_score": avg_senate_score
         }
     
-    async def generate_revised_policy(self, original_policy: str, analysis: dict, iteration: int = 1):
-        """Generate revised policy based on analysis"""
+    @traced("architect.revision")
+    async def generate_revised_policy(self, original_policy: str, analysis: dict, iteration: int = 1, on_token=None):
+        """Generate revised policy based on analysis (on_token streams the policy text)"""
         self.log_step("POLICY_REVISION", f"Drafting revised policy for iteration {iteration + 1}...")
         
         prompt = f"""
-        You are the Chief Policy Architect. Based on the analysis, revise the policy.
+        Based on the analysis, revise the policy.
         
         ORIGINAL POLICY:
-        {original_policy}
+        {fit(original_policy, "architect_revision", "policy")}
         
         CITIZEN CONCERNS: {json.dumps(analysis.get('citizen_analysis', {}).get('top_3_concerns', []))}
         SUGGESTED FIXES: {json.dumps(analysis.get('citizen_analysis', {}).get('suggested_fixes', []))}
@@ -142,8 +211,7 @@ class ArchitectAgent:
             "expected_senate_improvement": "+X%"
         }}
         """
-        from core.llm import get_json_response
-        revision = await asyncio.to_thread(get_json_response, prompt)
+        revision = await aget_json_response(prompt, system=ARCHITECT_SYSTEM_PROMPT, schema="architect_revision", on_token=on_token, stream_field="revised_policy", agent=self.role)
         
         self.log_step("REVISION_COMPLETE", json.dumps({
             "changes": revision.get("changes_summary", []),
@@ -155,6 +223,7 @@ class ArchitectAgent:
         
         return revision
     
+    @traced("architect.diff")
     async def generate_diff(self, original_policy: str, revised_policy: str):
         """Generate diff-style comparison"""
         self.log_step("DIFF_GENERATION", "Generating policy diff...")
@@ -163,10 +232,10 @@ class ArchitectAgent:
         Compare these two policies and generate a diff summary:
         
         ORIGINAL:
-        {original_policy[:500]}
+        {fit(original_policy, "architect_diff", "policy")}
         
         REVISED:
-        {revised_policy[:500]}
+        {fit(revised_policy, "architect_diff", "policy")}
         
         Return JSON:
         {{
@@ -176,36 +245,48 @@ class ArchitectAgent:
             "summary": "One sentence summary of key changes"
         }}
         """
-        from core.llm import get_json_response
-        diff = await asyncio.to_thread(get_json_response, prompt)
+        diff = await aget_json_response(prompt, system=ARCHITECT_SYSTEM_PROMPT, schema="architect_diff", agent=self.role)
         
         self.log_step("DIFF_COMPLETE", json.dumps(diff, indent=2))
         
         return diff
     
-    async def generate_report(self, policy: str, observer_reports: list[dict], citizen_feedback: list = None, iteration: int = 1):
+    @traced("architect.report")
+    async def generate_report(self, policy: str, observer_reports: list[dict], citizen_feedback: list = None, iteration: int = 1,
+                              on_revision_token=None, debate_digest: str = None):
         """Complete analysis and report generation"""
         # Store in history
         self.iteration_history.append({
             "iteration": iteration,
             "policy": policy[:300],
-            "citizen_score": sum(f.get('score', 50) for f in citizen_feedback) / len(citizen_feedback) if citizen_feedback else 0,
-            "senate_score": sum(r.get('score', 50) for r in observer_reports) / len(observer_reports) if observer_reports else 0
+            "citizen_score": average_score(citizen_feedback or [], 0),
+            "senate_score": average_score(observer_reports, 0)
         })
         
-        # Run step-by-step analysis
-        analysis = await self.analyze_step_by_step(policy, citizen_feedback or [], observer_reports, iteration)
-        
-        # Generate revised policy
-        revision = await self.generate_revised_policy(policy, analysis, iteration)
+        # analysis -> revision -> {diff, report}; the report doesn't need the diff
+        results = await run_step_graph({
+            "analysis": ((), lambda: self.analyze_step_by_step(policy, citizen_feedback or [], observer_reports, iteration, debate_digest)),
+            "revision": (("analysis",), lambda analysis: self.generate_revised_policy(policy, analysis, iteration, on_token=on_revision_token)),
+            "diff": (("revision",), lambda revision: self.generate_diff(policy, revision.get("revised_policy", policy))),
+            "report_markdown": (("analysis", "revision"), lambda analysis, revision: self.build_report_markdown(analysis, revision, iteration)),
+        })
+        analysis, revision = results["analysis"], results["revision"]
         
-        # Generate diff
-        diff = await self.generate_diff(policy, revision.get("revised_policy", policy))
+        self.log_step("COMPLETE", "Analysis complete. Ready for next iteration or download.")
         
-        # Generate final markdown report
+        return {
+            "new_policy": revision.get("revised_policy", policy),
+            "report_markdown": results["report_markdown"],
+            "diff": results["diff"],
+            "analysis": analysis,
+            "iteration": iteration
+        }
+    
+    async def build_report_markdown(self, analysis: dict, revision: dict, iteration: int):
+        """Generate final markdown report"""
         self.log_step("REPORT_GENERATION", "Generating final report...")
         
-        report_md = f"""# Policy Analysis Report - Iteration {iteration}
+        return f"""# Policy Analysis Report - Iteration {iteration}
 
 ## 📊 Current Scores
 - **Citizen Satisfaction**: {analysis['avg_citizen_score']:.1f}%
@@ -233,16 +314,6 @@ class ArchitectAgent:
 ---
 *Generated by PolicySwarm Architect Agent*
 """
-        
-        self.log_step("COMPLETE", "Analysis complete. Ready for next iteration or download.")
-        
-        return {
-            "new_policy": revision.get("revised_policy", policy),
-            "report_markdown": report_md,
-            "diff": diff,
-            "analysis": analysis,
-            "iteration": iteration
-        }
     
     def get_downloadable_policy(self, final_policy: str, iteration_history: list = None):
         """Generate downloadable markdown policy document"""
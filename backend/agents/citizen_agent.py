@@ -1,6 +1,10 @@
-import asyncio
 from pydantic import BaseModel
-from core.llm import get_llm_response
+from core.llm import aget_json_response
+from core.prompts import fit, fit_lines
+from core.tracing import traced
+from agents.memory import CitizenState
+import asyncio
+import json
 import random
 
 class CitizenPersona(BaseModel):
@@ -10,29 +14,48 @@ class CitizenPersona(BaseModel):
     traits: list[str]
 
 class CitizenAgent:
+    __slots__ = ("persona", "name", "role", "state", "system_prompt")
+
     def __init__(self, persona: CitizenPersona):
         self.persona = persona
         self.name = persona.name
         self.role = persona.role
-        # MEMORY SYSTEM
-        self.conversation_memory = []  # Stores previous messages
-        self.iteration_memory = []  # Stores previous policy iterations
-        self.emotional_state = "neutral"  # neutral, frustrated, hopeful, confused, angry
-        self.engagement_level = 100  # Decreases over time
-        self.key_concerns = []  # Extracted from conversations
+        # MEMORY SYSTEM (bounded: emotional state, engagement, recent messages, iterations, concerns)
+        self.state = CitizenState()
+        # Fixed per-persona prefix, sent as the system message on every call so
+        # the model server can reuse its cached prompt state
+        self.system_prompt = self.build_system_prompt()
+    
+    def build_system_prompt(self) -> str:
+        """Persona details that never change between calls"""
+        quirks = self.get_human_quirks()
+        return f"""
+        You are {self.name}, a {self.role}.
+        Background: {self.persona.background}
+        Traits: {', '.join(self.persona.traits)}
+        
+        You speak AS A REAL HUMAN WOULD:
+        - Occasionally use phrases like: {', '.join(quirks[:3])}
+        - Personal anecdotes from your background
+        - Real concerns from your daily life
+        - Occasional typos or informal speech if it fits your character
+        - Uncertainty where appropriate ("I'm not sure if...")
+        
+        Always reply with a single JSON object in the format you are asked for.
+        """
     
     def update_emotional_state(self, score):
         """Update emotional state based on satisfaction score"""
         if score < 20:
-            self.emotional_state = random.choice(["angry", "frustrated"])
+            self.state.emotional_state = random.choice(["angry", "frustrated"])
         elif score < 40:
-            self.emotional_state = "frustrated"
+            self.state.emotional_state = "frustrated"
         elif score < 60:
-            self.emotional_state = random.choice(["confused", "neutral"])
+            self.state.emotional_state = random.choice(["confused", "neutral"])
         elif score < 80:
-            self.emotional_state = "hopeful"
+            self.state.emotional_state = "hopeful"
         else:
-            self.emotional_state = "excited"
+            self.state.emotional_state = "excited"
     
     def get_human_quirks(self):
         """Get human-like speech quirks based on persona"""
@@ -52,49 +75,36 @@ class CitizenAgent:
     
     def add_to_iteration_memory(self, policy_text: str, iteration: int):
         """Store previous policy for context"""
-        self.iteration_memory.append({
+        self.state.iteration_memory.append({
             "iteration": iteration,
             "policy": policy_text[:500]  # Store summary
         })
     
-    async def react_to_policy(self, policy_text: str, iteration: int = 1):
+    @traced("citizen.react")
+    async def react_to_policy(self, policy_text: str, iteration: int = 1, on_token=None):
         # Build context from previous iterations
         prev_context = ""
-        if self.iteration_memory:
+        if self.state.iteration_memory:
             prev_context = f"""
             PREVIOUS POLICY VERSIONS YOU'VE SEEN:
-            {chr(10).join([f"Iteration {m['iteration']}: {m['policy'][:200]}..." for m in self.iteration_memory[-2:]])}
+            {chr(10).join([f"Iteration {m['iteration']}: {m['policy'][:200]}..." for m in self.state.iteration_memory[-2:]])}
             
             YOU REMEMBER your previous concerns. Has this new version addressed them?
             """
         
-        quirks = self.get_human_quirks()
-        quirk_instruction = f"Occasionally use phrases like: {', '.join(quirks[:3])}"
-        
         prompt = f"""
-        You are {self.name}, a {self.role}.
-        Background: {self.persona.background}
-        Traits: {', '.join(self.persona.traits)}
-        
-        Your current emotional state: {self.emotional_state}
+        CURRENT POLICY PROPOSAL (Iteration {iteration}):
+        "{fit(policy_text, "citizen_reaction", "policy")}"
         
         {prev_context}
         
-        CURRENT POLICY PROPOSAL (Iteration {iteration}):
-        "{policy_text}"
+        Your current emotional state: {self.state.emotional_state}
 
-        React to this policy AS A REAL HUMAN WOULD:
+        React to this policy:
         1. Give a 'satisfaction_score' (0-100) based on how much this benefits YOU personally
         2. Write a 'message' (under 50 words) expressing your genuine opinion
-        3. Include human touches: {quirk_instruction}
-        4. If this is iteration 2+, reference whether your previous concerns were addressed
-        5. Express your emotional_state: {self.emotional_state}
-        
-        Be REALISTIC - include:
-        - Personal anecdotes from your background
-        - Real concerns from your daily life
-        - Occasional typos or informal speech if it fits your character
-        - Uncertainty where appropriate ("I'm not sure if...")
+        3. If this is iteration 2+, reference whether your previous concerns were addressed
+        4. Express your emotional_state: {self.state.emotional_state}
 
         Return JSON format:
         {{
@@ -104,67 +114,65 @@ class CitizenAgent:
             "emotional_reaction": "angry/frustrated/neutral/hopeful/excited"
         }}
         """
-        from core.llm import get_json_response
-        response = await asyncio.to_thread(get_json_response, prompt)
-        
-        score = response.get("satisfaction_score", 50)
-        self.update_emotional_state(score)
+        response = await aget_json_response(prompt, system=self.system_prompt, schema="citizen_reaction", on_token=on_token, agent=self.name)
+        return self.apply_reaction(response)
+    
+    def apply_reaction(self, response: dict) -> dict:
+        """Update state from a (validated) reaction and return the reaction entry"""
+        # None when the reply never validated: it's left out of the averages rather than counted as 50
+        score = response.get("satisfaction_score")
+        if score is not None:
+            self.update_emotional_state(score)
         
         # Store key concern
         if response.get("key_concern"):
-            self.key_concerns.append(response.get("key_concern"))
+            self.state.key_concerns.append(response.get("key_concern"))
         
         return {
             "agent": self.name,
             "role": self.role,
             "message": response.get("message", "No comment."),
             "score": score,
-            "emotional_state": response.get("emotional_reaction", self.emotional_state)
+            "key_concern": response.get("key_concern", ""),
+            "emotional_state": response.get("emotional_reaction", self.state.emotional_state)
         }
     
-    async def reply_to_conversation(self, policy_text: str, recent_messages: list, exchange_count: int, iteration: int = 1):
-        """Generate a contextual reply in an ongoing conversation with memory"""
-        recent_context = "\n".join([f"{m['agent']}: {m['message']}" for m in recent_messages[-5:]])
+    @traced("citizen.reply")
+    async def reply_to_conversation(self, policy_text: str, recent_messages: list, exchange_count: int, iteration: int = 1,
+                                    on_token=None, summary: str = ""):
+        """Generate a contextual reply in an ongoing conversation with memory (on_token streams the message).
+
+        `summary` condenses the messages before `recent_messages` (see core.prompts.RollingSummary).
+        """
+        recent_context = fit_lines([f"{m['agent']}: {m['message']}" for m in recent_messages], "conversation_reply", "recent", newest=True)
+        summary_context = f"Earlier in the conversation: {fit(summary, 'conversation_reply', 'summary')}" if summary else ""
         
         # Build iteration context
         prev_context = ""
-        if self.iteration_memory and iteration > 1:
+        if self.state.iteration_memory and iteration > 1:
             prev_context = f"""
             You've seen previous versions of this policy. In iteration {iteration-1}, your main concern was: 
-            {self.key_concerns[-1] if self.key_concerns else 'general doubts'}
+            {self.state.key_concerns[-1] if self.state.key_concerns else 'general doubts'}
             
             Has the new policy addressed this? Reference this in your response if relevant.
             """
         
-        quirks = self.get_human_quirks()
-        
         # Decrease engagement over time (more likely to exit)
-        self.engagement_level = max(20, self.engagement_level - random.randint(1, 3))
-        exit_likelihood = "high" if self.engagement_level < 40 else "medium" if self.engagement_level < 70 else "low"
+        self.state.engagement_level = max(20, self.state.engagement_level - random.randint(1, 3))
+        exit_likelihood = "high" if self.state.engagement_level < 40 else "medium" if self.state.engagement_level < 70 else "low"
         
+        # Ordered from most to least stable so consecutive calls share a long prefix
         prompt = f"""
-        You are {self.name}, a {self.role}.
-        Background: {self.persona.background}
-        Traits: {', '.join(self.persona.traits)}
-        Current emotional state: {self.emotional_state}
-        Energy level: {self.engagement_level}% (exit likelihood: {exit_likelihood})
+        Policy being discussed: "{fit(policy_text, "conversation_reply", "policy")}"
         
         {prev_context}
-
-        Policy being discussed: "{policy_text[:300]}..."
-
-        Recent conversation:
-        {recent_context}
-
-        This is exchange #{exchange_count}.
         
         IMPORTANT - Respond as a REAL HUMAN would:
         1. Reference specific points made by others (e.g., "I hear what Tom is saying, but...")
         2. Stay true to your character, background, and current emotional state
-        3. Use phrases natural to you: {', '.join(quirks[:2])}
-        4. Show fatigue if engagement is low
-        5. Include human imperfections: slight tangents, interruptions, personal stories
-        6. Keep it under 50 words
+        3. Show fatigue if engagement is low
+        4. Include human imperfections: slight tangents, interruptions, personal stories
+        5. Keep it under 50 words
         
         Natural exit criteria (if energy is low OR you've made your point):
         - {self.name}-specific exit: work, family, personal reasons
@@ -178,12 +186,25 @@ class CitizenAgent:
             "references_other": "name of person you're responding to or empty",
             "introduces_new_point": false
         }}
+        
+        Current emotional state: {self.state.emotional_state}
+        Energy level: {self.state.engagement_level}% (exit likelihood: {exit_likelihood})
+
+        {summary_context}
+
+        Recent conversation:
+        {recent_context}
+
+        This is exchange #{exchange_count}. Your reply:
         """
-        from core.llm import get_json_response
-        response = await asyncio.to_thread(get_json_response, prompt)
+        response = await aget_json_response(prompt, system=self.system_prompt, schema="conversation_reply", on_token=on_token, agent=self.name)
+        if response.get("parse_failed"):
+            # Nothing was said: the caller leaves it out of the transcript and the convergence stats
+            return {"agent": self.name, "role": self.role, "failed": True, "error": response.get("error", ""),
+                    "message": None, "should_exit": False}
         
         # Store in conversation memory
-        self.conversation_memory.append({
+        self.state.conversation_memory.append({
             "exchange": exchange_count,
             "message": response.get("message", "...")
         })
@@ -194,12 +215,101 @@ class CitizenAgent:
             "message": response.get("message", "..."),
             "should_exit": response.get("should_exit", False),
             "exit_reason": response.get("exit_reason", ""),
-            "emotional_state": self.emotional_state
+            "references_other": response.get("references_other", ""),
+            "introduces_new_point": response.get("introduces_new_point", False),
+            "emotional_state": self.state.emotional_state
         }
     
+    def persona_card(self) -> str:
+        """Compact persona description for batched prompts"""
+        concern = f" Last concern: {self.state.key_concerns[-1]}." if self.state.key_concerns else ""
+        return (
+            f"- {self.name} ({self.role}). {self.persona.background} "
+            f"Traits: {', '.join(self.persona.traits)}. Currently {self.state.emotional_state}.{concern}"
+        )
+    
     def reset_for_new_iteration(self, previous_policy: str, iteration: int):
         """Reset agent state for a new iteration while preserving memory"""
         self.add_to_iteration_memory(previous_policy, iteration - 1)
-        self.engagement_level = 100  # Fresh energy for new iteration
-        self.conversation_memory = []  # Clear conversation (new topic)
-        # emotional_state and key_concerns preserved
+        self.state.start_iteration()  # emotional_state and key_concerns preserved
+    
+    def reset(self):
+        """Forget all memory before reusing the agent for another run"""
+        self.state.reset()
+    
+    def snapshot(self) -> dict:
+        return {"name": self.name, "role": self.role, **self.state.snapshot()}
+    
+    def restore(self, snapshot: dict):
+        """Load memory saved by snapshot()"""
+        self.state.restore(snapshot)
+
+# ============ BATCHED REACTIONS ============
+BATCH_SYSTEM_PROMPT = """
+You voice several different citizens reacting to the same government policy.
+Each citizen answers only from their own life and interests, in their own
+voice, as a real human would. They do not read each other's answers.
+
+Always reply with a single JSON object in the format you are asked for.
+"""
+
+async def react_in_batch(citizens: list, policy_text: str, iteration: int = 1) -> list[dict]:
+    """One LLM call for a group of citizens' initial reactions.
+
+    The policy appears once instead of once per citizen. Citizens missing from
+    the reply (or the whole group, if it doesn't validate) fall back to their
+    own react_to_policy call. Results come back in the order of `citizens`.
+    """
+    names = [c.name for c in citizens]
+    prev_context = ""
+    if citizens[0].state.iteration_memory:
+        previous = citizens[0].state.iteration_memory[-1]
+        prev_context = f"""
+        The citizens saw an earlier version (iteration {previous['iteration']}): {previous['policy'][:200]}...
+        Each should say whether their own previous concern was addressed.
+        """
+    
+    # Persona cards first: they only change with emotional state between iterations
+    prompt = f"""
+        CITIZENS:
+        {chr(10).join(c.persona_card() for c in citizens)}
+        
+        CURRENT POLICY PROPOSAL (Iteration {iteration}):
+        "{fit(policy_text, "citizen_reaction_batch", "policy")}"
+        
+        {prev_context}
+        
+        For EACH citizen give a 'satisfaction_score' (0-100) based on how much this benefits
+        them personally, a 'message' (under 50 words) in their own voice, their 'key_concern'
+        (5 words) and 'emotional_reaction' (angry/frustrated/neutral/hopeful/excited).
+        
+        Reply for exactly these names: {json.dumps(names)}
+        
+        Return JSON format:
+        {{
+            "reactions": [
+                {{"name": "{names[0]}", "satisfaction_score": 45, "message": "...", "key_concern": "...", "emotional_reaction": "neutral"}}
+            ]
+        }}
+        """
+    response = await aget_json_response(prompt, system=BATCH_SYSTEM_PROMPT, schema="citizen_reaction_batch", agent="Citizen batch")
+    
+    by_name = {}
+    for reaction in response.get("reactions", []):
+        by_name.setdefault(reaction["name"].strip().lower(), reaction)
+    
+    results = [None] * len(citizens)
+    fallbacks = []
+    for i, citizen in enumerate(citizens):
+        reaction = by_name.get(citizen.name.lower())
+        if reaction is None:
+            fallbacks.append(i)
+        else:
+            results[i] = citizen.apply_reaction(reaction)
+    
+    if fallbacks:
+        print(f"Batched reaction missing {len(fallbacks)}/{len(citizens)} citizens; asking them individually")
+        replies = await asyncio.gather(*[citizens[i].react_to_policy(policy_text, iteration) for i in fallbacks])
+        for i, reply in zip(fallbacks, replies):
+            results[i] = reply
+    return results
@@ -0,0 +1,166 @@
+"""
+PolicySwarm Agent Memory
+Fixed-capacity ring buffers and __slots__ state holders, so an agent's memory
+stays the same size however many exchanges, iterations or runs it sees.
+Each state has reset() (start of a run), snapshot() (plain dict view) and
+restore() (load a snapshot back, e.g. when resuming a checkpointed run).
+"""
+
+# Most recent entries kept per buffer
+MEMORY_LIMITS = {
+    "conversation": 10,  # Own messages in the current debate
+    "iterations": 3,  # Earlier policy versions
+    "concerns": 5,  # Citizen key concerns / observer key insights
+    "history": 10,  # Architect per-iteration scores
+    "analysis_logs": 64  # Architect steps for the current report
+}
+
+class RingBuffer:
+    """Keeps the last `capacity` items; iterates oldest first"""
+    __slots__ = ("capacity", "_items", "_start")
+
+    def __init__(self, capacity: int):
+        self.capacity = max(1, capacity)
+        self._items = []
+        self._start = 0  # Index of the oldest item once full
+
+    def append(self, item):
+        if len(self._items) < self.capacity:
+            self._items.append(item)
+        else:
+            self._items[self._start] = item
+            self._start = (self._start + 1) % self.capacity
+
+    def clear(self):
+        self._items = []
+        self._start = 0
+
+    def __len__(self):
+        return len(self._items)
+
+    def __bool__(self):
+        return bool(self._items)
+
+    def __iter__(self):
+        items, start = self._items, self._start
+        for i in range(len(items)):
+            yield items[(start + i) % len(items)]
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return self.to_list()[index]
+        if index < 0:
+            index += len(self._items)
+        if not 0 <= index < len(self._items):
+            raise IndexError("ring buffer index out of range")
+        return self._items[(self._start + index) % len(self._items)]
+
+    def last(self, default=None):
+        return self[-1] if self._items else default
+
+    def to_list(self) -> list:
+        return list(self)
+
+    def load(self, items):
+        """Replace the contents with items (oldest first)"""
+        self.clear()
+        for item in items:
+            self.append(item)
+
+    def __repr__(self):
+        return f"RingBuffer({self.capacity}, {self.to_list()!r})"
+
+class CitizenState:
+    __slots__ = ("emotional_state", "engagement_level", "conversation_memory", "iteration_memory", "key_concerns")
+
+    def __init__(self):
+        self.conversation_memory = RingBuffer(MEMORY_LIMITS["conversation"])
+        self.iteration_memory = RingBuffer(MEMORY_LIMITS["iterations"])
+        self.key_concerns = RingBuffer(MEMORY_LIMITS["concerns"])
+        self.reset()
+
+    def reset(self):
+        """Forget everything from earlier runs"""
+        self.emotional_state = "neutral"  # neutral, frustrated, hopeful, confused, angry
+        self.engagement_level = 100  # Decreases over time
+        self.conversation_memory.clear()
+        self.iteration_memory.clear()
+        self.key_concerns.clear()
+
+    def start_iteration(self):
+        """Fresh energy and a new conversation; emotional state and concerns carry over"""
+        self.engagement_level = 100
+        self.conversation_memory.clear()
+
+    def snapshot(self) -> dict:
+        return {
+            "emotional_state": self.emotional_state,
+            "engagement_level": self.engagement_level,
+            "conversation_memory": self.conversation_memory.to_list(),
+            "iteration_memory": self.iteration_memory.to_list(),
+            "key_concerns": self.key_concerns.to_list()
+        }
+
+    def restore(self, snapshot: dict):
+        self.emotional_state = snapshot["emotional_state"]
+        self.engagement_level = snapshot["engagement_level"]
+        self.conversation_memory.load(snapshot["conversation_memory"])
+        self.iteration_memory.load(snapshot["iteration_memory"])
+        self.key_concerns.load(snapshot["key_concerns"])
+
+class ObserverState:
+    __slots__ = ("stance", "engagement_level", "conversation_memory", "iteration_memory", "key_insights")
+
+    def __init__(self):
+        self.conversation_memory = RingBuffer(MEMORY_LIMITS["conversation"])
+        self.iteration_memory = RingBuffer(MEMORY_LIMITS["iterations"])
+        self.key_insights = RingBuffer(MEMORY_LIMITS["concerns"])
+        self.reset()
+
+    def reset(self):
+        self.stance = "neutral"  # supportive, critical, neutral, cautious
+        self.engagement_level = 100
+        self.conversation_memory.clear()
+        self.iteration_memory.clear()
+        self.key_insights.clear()
+
+    def start_iteration(self):
+        self.engagement_level = 100
+        self.conversation_memory.clear()
+
+    def snapshot(self) -> dict:
+        return {
+            "stance": self.stance,
+            "engagement_level": self.engagement_level,
+            "conversation_memory": self.conversation_memory.to_list(),
+            "iteration_memory": self.iteration_memory.to_list(),
+            "key_insights": self.key_insights.to_list()
+        }
+
+    def restore(self, snapshot: dict):
+        self.stance = snapshot["stance"]
+        self.engagement_level = snapshot["engagement_level"]
+        self.conversation_memory.load(snapshot["conversation_memory"])
+        self.iteration_memory.load(snapshot["iteration_memory"])
+        self.key_insights.load(snapshot["key_insights"])
+
+class ArchitectState:
+    __slots__ = ("iteration_history", "analysis_logs")
+
+    def __init__(self):
+        self.iteration_history = RingBuffer(MEMORY_LIMITS["history"])
+        self.analysis_logs = RingBuffer(MEMORY_LIMITS["analysis_logs"])
+
+    def reset(self):
+        self.iteration_history.clear()
+        self.analysis_logs.clear()
+
+    def snapshot(self) -> dict:
+        return {
+            "iteration_history": self.iteration_history.to_list(),
+            "analysis_logs": self.analysis_logs.to_list()
+        }
+
+    def restore(self, snapshot: dict):
+        self.iteration_history.load(snapshot["iteration_history"])
+        self.analysis_logs.load(snapshot["analysis_logs"])
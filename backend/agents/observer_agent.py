@@ -1,17 +1,29 @@
-import asyncio
-from core.llm import get_llm_response
+from core.llm import aget_json_response
+from core.tracing import traced
+from core.prompts import fit, fit_lines
+from agents.memory import ObserverState
 import random
 
 class ObserverAgent:
     def __init__(self, role: str, focus: str):
         self.role = role
         self.focus = focus
-        # MEMORY SYSTEM for Senate
-        self.conversation_memory = []
-        self.iteration_memory = []
-        self.stance = "neutral"  # supportive, critical, neutral, cautious
-        self.key_insights = []
-        self.engagement_level = 100
+        # MEMORY SYSTEM for Senate (bounded: stance, engagement, recent messages, iterations, insights)
+        self.state = ObserverState()
+        # Fixed per-observer prefix, sent as the system message on every call
+        self.system_prompt = self.build_system_prompt()
+    
+    def build_system_prompt(self) -> str:
+        """Role details that never change between calls"""
+        personality = self.get_senate_personality()
+        return f"""
+        You are the {self.role}, a Senate observer and government advisor. Your focus is {self.focus}.
+        Your analytical style: {personality['style']}
+        Your natural bias: {personality['bias']}
+        Your natural phrases: {', '.join(personality['quirks'][:2])}
+        
+        Always reply with a single JSON object in the format you are asked for.
+        """
     
     def get_senate_personality(self):
         """Get personality traits for each Senate member"""
@@ -36,38 +48,35 @@ class ObserverAgent:
     
     def add_to_iteration_memory(self, policy: str, citizen_feedback_summary: str, iteration: int):
         """Store previous iteration analysis"""
-        self.iteration_memory.append({
+        self.state.iteration_memory.append({
             "iteration": iteration,
             "policy_summary": policy[:300],
             "citizen_concerns": citizen_feedback_summary[:200]
         })
     
-    async def analyze_debate(self, policy: str, debate_logs: list[dict], iteration: int = 1):
-        """Initial analysis of citizen debate"""
-        debate_text = "\n".join([f"{log['agent']} ({log['role']}): {log['message']} (Score: {log.get('score', 'N/A')})" for log in debate_logs[:20]])
+    @traced("senate.analyze")
+    async def analyze_debate(self, policy: str, debate_digest: str, iteration: int = 1, on_token=None):
+        """Initial analysis of the citizen debate (from its DebateDigest text)"""
+        debate_text = fit(debate_digest, "senate_analysis", "feedback")
         
         personality = self.get_senate_personality()
         
         # Build iteration context
         prev_context = ""
-        if self.iteration_memory:
+        if self.state.iteration_memory:
             prev_context = f"""
             PREVIOUS ITERATION ANALYSIS:
-            In iteration {self.iteration_memory[-1]['iteration']}, citizens were concerned about: {self.iteration_memory[-1]['citizen_concerns']}
-            Your previous insight was: {self.key_insights[-1] if self.key_insights else 'general concerns'}
+            In iteration {self.state.iteration_memory[-1]['iteration']}, citizens were concerned about: {self.state.iteration_memory[-1]['citizen_concerns']}
+            Your previous insight was: {self.state.key_insights[-1] if self.state.key_insights else 'general concerns'}
             
             Has the new policy addressed these? Evaluate progress.
             """
         
         prompt = f"""
-        You are the {self.role}, a Senate observer. Your focus is {self.focus}.
-        Your analytical style: {personality['style']}
-        Your natural bias: {personality['bias']}
+        POLICY (Iteration {iteration}): "{fit(policy, "senate_analysis", "policy")}"
         
         {prev_context}
         
-        POLICY (Iteration {iteration}): "{policy[:500]}"
-        
         CITIZEN FEEDBACK:
         {debate_text}
         
@@ -93,21 +102,22 @@ class ObserverAgent:
             "recommendation": "approve/modify/reject"
         }}
         """
-        from core.llm import get_json_response
-        response = await asyncio.to_thread(get_json_response, prompt)
+        response = await aget_json_response(prompt, system=self.system_prompt, schema="senate_analysis", on_token=on_token, agent=self.role)
         
         # Store insight
         if response.get("key_risk"):
-            self.key_insights.append(response.get("key_risk"))
+            self.state.key_insights.append(response.get("key_risk"))
         
         # Update stance
-        score = response.get("viability_score", 50)
-        if score > 70:
-            self.stance = "supportive"
+        score = response.get("viability_score")  # None if the reply never validated
+        if score is None:
+            pass
+        elif score > 70:
+            self.state.stance = "supportive"
         elif score < 40:
-            self.stance = "critical"
+            self.state.stance = "critical"
         else:
-            self.stance = "cautious"
+            self.state.stance = "cautious"
         
         return {
             "agent": self.role,
@@ -115,29 +125,28 @@ class ObserverAgent:
             "message": response.get("message", "Analysis pending."),
             "score": score,
             "recommendation": response.get("recommendation", "modify"),
-            "stance": self.stance
+            "stance": self.state.stance
         }
     
-    async def reply_to_senate_debate(self, policy: str, citizen_conversation: str, recent_senate_messages: list, exchange_count: int, iteration: int = 1):
+    @traced("senate.reply")
+    async def reply_to_senate_debate(self, policy: str, debate_digest: str, recent_senate_messages: list, exchange_count: int, iteration: int = 1, on_token=None):
         """Generate a contextual reply in the Senate strategic debate"""
-        recent_context = "\n".join([f"{m['agent']}: {m['message']}" for m in recent_senate_messages[-4:]])
+        recent_context = fit_lines([f"{m['agent']}: {m['message']}" for m in recent_senate_messages], "senate_reply", "recent", newest=True)
         
         personality = self.get_senate_personality()
         
         # Decrease engagement
-        self.engagement_level = max(30, self.engagement_level - random.randint(2, 5))
+        self.state.engagement_level = max(30, self.state.engagement_level - random.randint(2, 5))
         
         prompt = f"""
-        You are the {self.role}, focusing on {self.focus}.
-        Your style: {personality['style']}
-        Your current stance: {self.stance}
-        
         ITERATION {iteration}
         
-        Policy being evaluated: "{policy[:400]}"
+        Policy being evaluated: "{fit(policy, "senate_reply", "policy")}"
+        
+        Your current stance: {self.state.stance}
         
         Summary of citizen concerns:
-        {citizen_conversation[:600]}
+        {fit(debate_digest, "senate_reply", "conversation")}
         
         Recent Senate discussion:
         {recent_context}
@@ -163,10 +172,13 @@ class ObserverAgent:
             "new_insight": "any new point you're raising"
         }}
         """
-        from core.llm import get_json_response
-        response = await asyncio.to_thread(get_json_response, prompt)
+        response = await aget_json_response(prompt, system=self.system_prompt, schema="senate_reply", on_token=on_token, agent=self.role)
+        if response.get("parse_failed"):
+            # Nothing was said: the caller leaves it out of the Senate transcript
+            return {"agent": self.role, "focus": self.focus, "failed": True, "error": response.get("error", ""),
+                    "message": None, "stance": self.state.stance}
         
-        self.conversation_memory.append({
+        self.state.conversation_memory.append({
             "exchange": exchange_count,
             "message": response.get("message", "...")
         })
@@ -175,18 +187,19 @@ class ObserverAgent:
             "agent": self.role,
             "focus": self.focus,
             "message": response.get("message", "..."),
-            "stance": self.stance
+            "stance": self.state.stance
         }
     
-    async def final_verdict(self, policy: str, senate_discussion: list, citizen_score: float, iteration: int = 1):
+    @traced("senate.verdict")
+    async def final_verdict(self, policy: str, senate_discussion: list, citizen_score: float, iteration: int = 1, on_token=None):
         """Give final verdict after Senate discussion"""
-        discussion_summary = "\n".join([f"{m['agent']}: {m['message']}" for m in senate_discussion[-5:]])
+        discussion_summary = fit_lines([f"{m['agent']}: {m['message']}" for m in senate_discussion], "verdict", "recent", newest=True)
         
         prompt = f"""
-        You are the {self.role}. The Senate discussion is concluding.
-        
         ITERATION {iteration}
-        Policy: "{policy[:400]}"
+        Policy: "{fit(policy, "verdict", "policy")}"
+        
+        The Senate discussion is concluding.
         
         Citizen Satisfaction Score: {citizen_score}%
         
@@ -207,14 +220,13 @@ class ObserverAgent:
             "condition": "Only if X is addressed"
         }}
         """
-        from core.llm import get_json_response
-        response = await asyncio.to_thread(get_json_response, prompt)
+        response = await aget_json_response(prompt, system=self.system_prompt, schema="verdict", on_token=on_token, stream_field="final_message", agent=self.role)
         
         return {
             "agent": self.role,
             "focus": self.focus,
             "message": f"[FINAL VERDICT] {response.get('final_message', 'Assessment complete.')}",
-            "score": response.get("viability_score", 50),
+            "score": response.get("viability_score"),
             "recommendation": response.get("recommendation", "modify"),
             "condition": response.get("condition", "None")
         }
@@ -222,6 +234,15 @@ class ObserverAgent:
     def reset_for_new_iteration(self, policy: str, citizen_summary: str, iteration: int):
         """Reset for new iteration while preserving memory"""
         self.add_to_iteration_memory(policy, citizen_summary, iteration - 1)
-        self.engagement_level = 100
-        self.conversation_memory = []
-        # stance and key_insights preserved
+        self.state.start_iteration()  # stance and key_insights preserved
+    
+    def reset(self):
+        """Forget all memory before reusing the agent for another run"""
+        self.state.reset()
+    
+    def snapshot(self) -> dict:
+        return {"role": self.role, "focus": self.focus, **self.state.snapshot()}
+    
+    def restore(self, snapshot: dict):
+        """Load memory saved by snapshot()"""
+        self.state.restore(snapshot)
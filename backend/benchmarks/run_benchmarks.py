@@ -0,0 +1,287 @@
+"""
+PolicySwarm End-to-End Benchmarks
+Drives run_simulation and the FastAPI endpoints against the offline mock
+provider (fixed latency) and reports, per scenario:
+- citizen exchanges/second and per-phase wall time
+- event-loop lag while the simulation runs
+- peak RSS of the process running the scenario
+- /logs p50/p99 latency under concurrent polling
+
+Each scenario runs in a fresh process so peak RSS is not shared.
+
+Usage (from backend/):
+    python -m benchmarks.run_benchmarks --personas 10 50 --max-exchanges 50 100 \\
+        --latency-ms 20 --output bench_results.json
+
+Early termination of the citizen debate is off unless --convergence on is
+given (the mock's few canned phrases always trigger it, which would cap every
+max_exchanges setting at the same length).
+"""
+import argparse
+import asyncio
+import json
+import multiprocessing
+import platform
+import resource
+import socket
+import statistics
+import subprocess
+import sys
+import threading
+import time
+from datetime import datetime, timezone
+
+BENCH_POLICY = (
+    "All households earning below the national median receive a monthly digital "
+    "transit credit, funded by a congestion charge on private vehicles in metro areas."
+)
+
+def percentile(values: list, pct: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+def scaled_personas(base_personas: list, count: int) -> list:
+    """Repeat the built-in personas (with numbered names) to reach `count`"""
+    personas = []
+    for i in range(count):
+        base = base_personas[i % len(base_personas)]
+        suffix = f" #{i // len(base_personas) + 1}" if i >= len(base_personas) else ""
+        personas.append(type(base)(**{**base.dict(), "name": base.name + suffix}))
+    return personas
+
+def configure_mock(latency_ms: float, seed: int):
+    from core import llm
+    llm.config["llm_provider"] = "mock"
+    llm.config["mock"] = {
+        "seed": seed,
+        "latency": {"distribution": "fixed", "mean_ms": latency_ms},
+        "max_concurrency": 1024
+    }
+    llm.config["cache"] = {"enabled": False}
+    llm._mock = None
+
+def phase_timings(events: list) -> dict:
+    """Wall time per phase from the timestamped event log"""
+    markers = []
+    for entry in events:
+        message = entry["message"]
+        if entry["agent"] != "System":
+            continue
+        if message.startswith("Phase 1"):
+            markers.append(("citizens", entry["ts"]))
+        elif message.startswith("Phase 2"):
+            markers.append(("senate", entry["ts"]))
+        elif message.startswith("Phase 3"):
+            markers.append(("architect", entry["ts"]))
+        elif "ITERATION" in message or message.startswith("Simulation complete") or "CONSENSUS" in message:
+            markers.append(("idle", entry["ts"]))
+    totals = {"citizens": 0.0, "senate": 0.0, "architect": 0.0}
+    for (phase, start), (_, end) in zip(markers, markers[1:]):
+        if phase in totals:
+            totals[phase] += end - start
+    return {phase: round(seconds, 4) for phase, seconds in totals.items()}
+
+async def measure_loop_lag(stop: asyncio.Event, interval: float = 0.01) -> list:
+    """Record how late the loop wakes a sleeper (ms)"""
+    lags = []
+    loop = asyncio.get_running_loop()
+    while not stop.is_set():
+        start = loop.time()
+        await asyncio.sleep(interval)
+        lags.append(max(0.0, (loop.time() - start - interval) * 1000))
+    return lags
+
+def session_overrides(base_config: dict, max_exchanges: int, convergence: bool) -> dict:
+    """Engine settings swept by the benchmark, with persistence and tracing off: they'd add
+    SQLite writes and span bookkeeping to the timings, and runs to the real cache/runs.sqlite"""
+    return {
+        "max_exchanges": max_exchanges,
+        "convergence": {**base_config["convergence"], "enabled": convergence},
+        "run_store": {**base_config["run_store"], "enabled": False},
+        "tracing": {**base_config["tracing"], "enabled": False}
+    }
+
+def debate_stats(session) -> dict:
+    """Why and after how many exchanges each iteration's citizen debate ended"""
+    return {
+        "debate_stop": [m.get("debate_stop") for m in session.metrics],
+        "debate_exchanges": [m.get("debate_exchanges") for m in session.metrics]
+    }
+
+# ============ SCENARIOS ============
+def simulation_scenario(personas_count: int, max_exchanges: int, convergence: bool, latency_ms: float, seed: int) -> dict:
+    """Run one full simulation directly through run_simulation"""
+    configure_mock(latency_ms, seed)
+    import builtins
+    builtins.print = lambda *args, **kwargs: None  # Engine logs every event to stdout
+    import main
+
+    session_config = {**main.config, **session_overrides(main.config, max_exchanges, convergence)}
+    session = main.sessions.create(scaled_personas(main.personas, personas_count), main.observer_specs, session_config)
+
+    async def run():
+        stop = asyncio.Event()
+        lag_task = asyncio.create_task(measure_loop_lag(stop))
+        start = time.perf_counter()
+        await main.run_simulation(session, BENCH_POLICY)
+        elapsed = time.perf_counter() - start
+        stop.set()
+        return elapsed, await lag_task
+
+    elapsed, lags = asyncio.run(run())
+    events = session.events.since(0)
+    citizen_messages = sum(1 for e in events if e["type"] == "general" and e["agent"] != "System")
+    phases = phase_timings(events)
+    from core import llm
+
+    return {
+        "kind": "simulation",
+        "personas": personas_count,
+        "max_exchanges": max_exchanges,
+        "convergence": convergence,
+        "latency_ms": latency_ms,
+        "iterations": session.current_iteration,
+        **debate_stats(session),
+        "wall_time_s": round(elapsed, 4),
+        "citizen_messages": citizen_messages,
+        "exchanges_per_s": round(citizen_messages / phases["citizens"], 2) if phases["citizens"] else None,
+        "phase_wall_time_s": phases,
+        "llm_calls": llm.get_mock_llm().calls,
+        "loop_lag_ms": {
+            "p50": round(percentile(lags, 50), 3),
+            "p99": round(percentile(lags, 99), 3),
+            "max": round(max(lags, default=0.0), 3)
+        },
+        "peak_rss_mb": round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1)
+    }
+
+def api_scenario(personas_count: int, max_exchanges: int, convergence: bool, latency_ms: float, seed: int,
+                 pollers: int, poll_interval_ms: float) -> dict:
+    """Run a simulation behind uvicorn while `pollers` clients hammer /logs"""
+    configure_mock(latency_ms, seed)
+    import builtins
+    builtins.print = lambda *args, **kwargs: None
+    import httpx
+    import uvicorn
+    import main
+
+    main.personas[:] = scaled_personas(main.personas, personas_count)
+    main.config.update(session_overrides(main.config, max_exchanges, convergence))
+
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        port = sock.getsockname()[1]
+    server = uvicorn.Server(uvicorn.Config(main.app, host="127.0.0.1", port=port, log_level="error"))
+    threading.Thread(target=server.run, daemon=True).start()
+    while not server.started:
+        time.sleep(0.05)
+    base_url = f"http://127.0.0.1:{port}"
+
+    async def run():
+        latencies = []
+        async with httpx.AsyncClient(base_url=base_url, timeout=60) as client:
+            session_id = (await client.post("/api/submit-policy", params={"policy": BENCH_POLICY})).json()["session_id"]
+            done = asyncio.Event()
+
+            async def poll():
+                while not done.is_set():
+                    start = time.perf_counter()
+                    await client.get("/logs", params={"session_id": session_id})
+                    latencies.append((time.perf_counter() - start) * 1000)
+                    await asyncio.sleep(poll_interval_ms / 1000)
+
+            async def watch():
+                while not (await client.get("/status", params={"session_id": session_id})).json()["complete"]:
+                    await asyncio.sleep(0.1)
+                done.set()
+
+            start = time.perf_counter()
+            await asyncio.gather(watch(), *[poll() for _ in range(pollers)])
+            return time.perf_counter() - start, latencies, session_id
+
+    elapsed, latencies, session_id = asyncio.run(run())
+    server.should_exit = True
+    return {
+        "kind": "api",
+        "personas": personas_count,
+        "max_exchanges": max_exchanges,
+        "convergence": convergence,
+        "latency_ms": latency_ms,
+        "pollers": pollers,
+        **debate_stats(main.sessions.get(session_id)),
+        "wall_time_s": round(elapsed, 4),
+        "requests": len(latencies),
+        "logs_latency_ms": {
+            "p50": round(percentile(latencies, 50), 3),
+            "p99": round(percentile(latencies, 99), 3),
+            "mean": round(statistics.fmean(latencies), 3) if latencies else 0.0
+        },
+        "peak_rss_mb": round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1)
+    }
+
+def _run_isolated(target, *args) -> dict:
+    """Run a scenario in a fresh interpreter so RSS and module state are clean"""
+    ctx = multiprocessing.get_context("spawn")
+    with ctx.Pool(1) as pool:
+        return pool.apply(target, args)
+
+def git_revision() -> str:
+    try:
+        return subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], text=True, stderr=subprocess.DEVNULL).strip()
+    except Exception:
+        return "unknown"
+
+def main():
+    parser = argparse.ArgumentParser(description="PolicySwarm end-to-end benchmarks")
+    parser.add_argument("--personas", type=int, nargs="+", default=[10])
+    parser.add_argument("--max-exchanges", type=int, nargs="+", default=[25, 100])
+    parser.add_argument("--convergence", choices=["off", "on"], nargs="+", default=["off"],
+                        help="Early termination of the citizen debate (each value is a separate scenario)")
+    parser.add_argument("--latency-ms", type=float, default=20)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--pollers", type=int, default=8, help="Concurrent /logs pollers for the API scenario")
+    parser.add_argument("--poll-interval-ms", type=float, default=50)
+    parser.add_argument("--skip-api", action="store_true")
+    parser.add_argument("--output", help="Write JSON results here instead of stdout")
+    args = parser.parse_args()
+
+    scenarios = []
+    for personas_count in args.personas:
+        for max_exchanges in args.max_exchanges:
+            for convergence in args.convergence:
+                label = f"personas={personas_count} max_exchanges={max_exchanges} convergence={convergence}"
+                enabled = convergence == "on"
+                print(f"simulation: {label}", file=sys.stderr)
+                scenarios.append(_run_isolated(
+                    simulation_scenario, personas_count, max_exchanges, enabled, args.latency_ms, args.seed
+                ))
+                if not args.skip_api:
+                    print(f"api: {label}", file=sys.stderr)
+                    scenarios.append(_run_isolated(
+                        api_scenario, personas_count, max_exchanges, enabled, args.latency_ms, args.seed,
+                        args.pollers, args.poll_interval_ms
+                    ))
+
+    results = {
+        "meta": {
+            "timestamp": datetime.now(timezone.utc).isoformat(),
+            "git_revision": git_revision(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "latency_ms": args.latency_ms,
+            "seed": args.seed
+        },
+        "scenarios": scenarios
+    }
+    output = json.dumps(results, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(output + "\n")
+    else:
+        print(output)
+
+if __name__ == "__main__":
+    main()
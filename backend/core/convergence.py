@@ -0,0 +1,90 @@
+"""
+PolicySwarm Debate Convergence
+Tracks how much new information each citizen message adds, so the debate can
+end once it is only repeating itself instead of always running to max_exchanges.
+
+A message counts as novel when it brings enough terms not used earlier in the
+debate (or the model flags introduces_new_point) and it isn't a near-copy of a
+recent message. The debate has saturated when, after min_exchanges, the share
+of novel messages over the last `window` exchanges falls below min_novelty.
+"""
+import re
+from collections import deque
+
+WORD_PATTERN = re.compile(r"[a-z][a-z']+")
+STOPWORDS = frozenset("""
+a about after again all also am an and any are as at be because been before being but by can could did do does
+doing don't for from had has have having he her here him his how i i'm if in into is it it's its just like me
+more most my no not now of on once only or other our out over own really same she should so some such than that
+the their them then there these they this those to too under until up very was we were what when where which while
+who why will with would you your yes yeah well still even much many one thing things think know going get got
+""".split())
+
+def content_terms(text: str) -> set:
+    return {w for w in WORD_PATTERN.findall(text.lower()) if len(w) > 2 and w not in STOPWORDS}
+
+def jaccard(a: set, b: set) -> float:
+    if not a or not b:
+        return 0.0
+    return len(a & b) / len(a | b)
+
+class ConvergenceDetector:
+    def __init__(self, min_exchanges: int = 20, window: int = 12, min_novelty: float = 0.25,
+                 new_term_ratio: float = 0.3, max_similarity: float = 0.6, compare_last: int = 30):
+        self.min_exchanges = min_exchanges
+        self.window = window
+        self.min_novelty = min_novelty
+        self.new_term_ratio = new_term_ratio  # Share of a message's terms that must be new
+        self.max_similarity = max_similarity  # Jaccard above this = repeating a recent message
+        self._vocabulary = set()
+        self._recent = deque(maxlen=compare_last)  # Term sets of the latest messages
+        self._novel = deque(maxlen=window)
+        self.exchanges = 0
+        self.novel_messages = 0
+        self.new_points = 0
+        self.references = 0
+
+    def seed(self, message: str):
+        """Known content (initial reactions) that later messages are compared against"""
+        terms = content_terms(message)
+        self._vocabulary |= terms
+        self._recent.append(terms)
+
+    def observe(self, message: str, introduces_new_point: bool = False, references_other: str = "") -> bool:
+        """Record one debate message; returns whether it added new information"""
+        terms = content_terms(message)
+        new_terms = terms - self._vocabulary
+        similarity = max((jaccard(terms, earlier) for earlier in self._recent), default=0.0)
+        novel = similarity < self.max_similarity and (
+            introduces_new_point or (bool(terms) and len(new_terms) / len(terms) >= self.new_term_ratio)
+        )
+
+        self._vocabulary |= terms
+        self._recent.append(terms)
+        self._novel.append(novel)
+        self.exchanges += 1
+        self.novel_messages += novel
+        self.new_points += bool(introduces_new_point)
+        self.references += bool(references_other)
+        return novel
+
+    @property
+    def novelty(self) -> float:
+        """Share of novel messages over the recent window"""
+        return sum(self._novel) / len(self._novel) if self._novel else 1.0
+
+    def saturated(self) -> bool:
+        return (
+            self.exchanges >= self.min_exchanges
+            and len(self._novel) == self.window
+            and self.novelty < self.min_novelty
+        )
+
+    def summary(self) -> dict:
+        return {
+            "exchanges": self.exchanges,
+            "novel_messages": self.novel_messages,
+            "new_points": self.new_points,
+            "references": self.references,
+            "recent_novelty": round(self.novelty, 2)
+        }
@@ -0,0 +1,142 @@
+"""
+PolicySwarm Debate Digest
+Running summary of the citizen debate for the Senate and the Architect:
+each citizen's latest stance, how often each concern comes up, satisfaction
+scores across iterations and representative quotes.
+
+Every message updates it in time proportional to the message's length, so
+the whole debate is covered (not just its first messages). The text that
+prompts read is rebuilt only after something changed.
+"""
+from collections import Counter
+from core.convergence import content_terms
+
+QUOTE_WORDS = 30  # Words kept per quoted message
+
+def clip_words(text: str, words: int = QUOTE_WORDS) -> str:
+    parts = text.split()
+    return text if len(parts) <= words else " ".join(parts[:words]) + "…"
+
+class DebateDigest:
+    def __init__(self):
+        self.trajectory = {}  # agent -> [[iteration, score], ...] over the whole run
+        self.start_iteration(0)
+
+    def start_iteration(self, iteration: int):
+        """Clear the per-debate parts; score trajectories carry over"""
+        self.iteration = iteration
+        self.stances = {}  # agent -> latest {"role", "message", "emotional_state", "score", "left"}
+        self.concerns = Counter()  # Key concerns named in reactions
+        self.topics = Counter()  # Content terms across every message
+        self.quotes = {}  # term -> [agent, message]: latest message using it
+        self.messages = 0
+        self._version = 0
+        self._rendered = (-1, "")
+
+    # ============ UPDATE ============
+    def add_reaction(self, reaction: dict):
+        """An initial reaction: stance, score and key concern"""
+        if reaction.get("key_concern"):
+            self.concerns[reaction["key_concern"].strip().lower()] += 1
+        if reaction.get("score") is not None:
+            history = self.trajectory.setdefault(reaction["agent"], [])
+            if history and history[-1][0] == self.iteration:
+                history[-1][1] = reaction["score"]
+            else:
+                history.append([self.iteration, reaction["score"]])
+        self.add_message(reaction["agent"], reaction["role"], reaction["message"],
+                         reaction.get("emotional_state"), score=reaction.get("score"))
+
+    def add_message(self, agent: str, role: str, message: str, emotional_state: str = None, score=None,
+                    left: bool = False):
+        stance = self.stances.setdefault(agent, {"role": role, "emotional_state": "neutral", "score": None, "left": False})
+        stance["message"] = message
+        if emotional_state:
+            stance["emotional_state"] = emotional_state
+        if score is not None:
+            stance["score"] = score
+        stance["left"] = stance["left"] or left
+        terms = content_terms(message)
+        self.topics.update(terms)
+        for term in terms:
+            self.quotes[term] = [agent, message]
+        self.messages += 1
+        self._version += 1
+
+    # ============ READ ============
+    def iteration_means(self) -> dict:
+        """Mean citizen score per iteration"""
+        totals = {}
+        for history in self.trajectory.values():
+            for iteration, score in history:
+                total = totals.setdefault(iteration, [0.0, 0])
+                total[0] += score
+                total[1] += 1
+        return {iteration: total / count for iteration, (total, count) in sorted(totals.items())}
+
+    def top_concerns(self, n: int = 5) -> list:
+        return self.concerns.most_common(n)
+
+    def headline(self) -> str:
+        """One line for observer memory"""
+        concerns = ", ".join(concern for concern, _ in self.top_concerns(3)) or "no clear concerns"
+        means = self.iteration_means()
+        score = f"; satisfaction {means[self.iteration]:.0f}%" if self.iteration in means else ""
+        return f"Top concerns: {concerns}{score}"
+
+    def render(self) -> str:
+        """Digest text for prompts (cached until the next update)"""
+        if self._rendered[0] == self._version:
+            return self._rendered[1]
+
+        left = sum(1 for stance in self.stances.values() if stance["left"])
+        lines = [f"CITIZEN DEBATE DIGEST (iteration {self.iteration}: {self.messages} messages from "
+                 f"{len(self.stances)} citizens{f', {left} left early' if left else ''})"]
+        means = self.iteration_means()
+        if means:
+            lines.append("Satisfaction by iteration: " + " -> ".join(f"{i}: {m:.0f}%" for i, m in means.items()))
+        if self.concerns:
+            lines.append("Key concerns: " + ", ".join(f"{c} ({n})" for c, n in self.top_concerns()))
+        topics = self.topics.most_common(8)
+        if topics:
+            lines.append("Recurring topics: " + ", ".join(f"{t} ({n})" for t, n in topics))
+            lines.append("Representative quotes:")
+            seen = set()
+            for term, _ in topics[:4]:
+                agent, message = self.quotes[term]
+                if message not in seen:
+                    seen.add(message)
+                    lines.append(f'- {agent} on "{term}": "{clip_words(message)}"')
+        lines.append("Where each citizen stands:")
+        for agent, stance in self.stances.items():
+            history = self.trajectory.get(agent, [])
+            score = f", {history[-1][1]}%" if history and history[-1][0] == self.iteration else ""
+            if len(history) > 1 and history[-1][0] == self.iteration:
+                score += f" (was {history[-2][1]}%)"
+            status = ", left" if stance["left"] else ""
+            lines.append(f'- {agent} ({stance["role"]}, {stance["emotional_state"]}{score}{status}): "{clip_words(stance["message"])}"')
+
+        text = "\n".join(lines)
+        self._rendered = (self._version, text)
+        return text
+
+    def snapshot(self) -> dict:
+        return {
+            "iteration": self.iteration,
+            "trajectory": self.trajectory,
+            "stances": self.stances,
+            "concerns": dict(self.concerns),
+            "topics": dict(self.topics),
+            # Quotes are only ever shown for the top topics
+            "quotes": {term: self.quotes[term] for term, _ in self.topics.most_common(20)},
+            "messages": self.messages
+        }
+
+    def restore(self, snapshot: dict):
+        self.start_iteration(snapshot["iteration"])
+        self.trajectory = {agent: [list(point) for point in history] for agent, history in snapshot["trajectory"].items()}
+        self.stances = {agent: dict(stance) for agent, stance in snapshot["stances"].items()}
+        self.concerns = Counter(snapshot["concerns"])
+        self.topics = Counter(snapshot["topics"])
+        self.quotes = {term: list(quote) for term, quote in snapshot["quotes"].items()}
+        self.messages = snapshot["messages"]
@@ -0,0 +1,148 @@
+"""
+PolicySwarm Event Log
+Append-only, sequence-numbered log of simulation events.
+
+- Every entry gets a monotonically increasing `seq`
+- Entries are indexed by `type` (general/senate/architect) and by `agent`
+- Reading the tail since a seq costs O(returned entries), not O(run length)
+- Memory is bounded by a ring buffer; evicted entries can spill to a JSONL file
+  (with the byte offset of each line kept, so reading them back seeks instead of scanning)
+"""
+import json
+import os
+from bisect import bisect_left
+from collections import defaultdict
+
+class _SeqIndex:
+    """Sorted seq numbers for one index key, trimmed as the ring evicts"""
+    __slots__ = ("seqs", "offset")
+
+    def __init__(self):
+        self.seqs = []
+        self.offset = 0  # Leading seqs already evicted from the ring
+
+    def append(self, seq: int):
+        self.seqs.append(seq)
+
+    def trim(self, first_live_seq: int):
+        # Advance past evicted seqs; compact the list once half of it is dead
+        while self.offset < len(self.seqs) and self.seqs[self.offset] < first_live_seq:
+            self.offset += 1
+        if self.offset and self.offset * 2 >= len(self.seqs):
+            del self.seqs[:self.offset]
+            self.offset = 0
+
+    def since(self, seq: int) -> list:
+        start = bisect_left(self.seqs, seq, lo=self.offset)
+        return self.seqs[start:]
+
+    def __len__(self):
+        return len(self.seqs) - self.offset
+
+class EventLog:
+    def __init__(self, capacity: int = 5000, spill_path: str = None):
+        self.capacity = capacity
+        self.spill_path = spill_path
+        self.next_seq = 0
+        self._ring = [None] * capacity
+        self._by_type = defaultdict(_SeqIndex)
+        self._by_agent = defaultdict(_SeqIndex)
+        self._spill_file = None
+        self._spill_start = 0  # Seq of the first entry this log spilled
+        self._spill_offsets = []  # Byte offset of each spilled entry, from _spill_start on
+
+    # ============ WRITE ============
+    def append(self, entry: dict) -> dict:
+        """Assign the next seq to entry and store it"""
+        seq = self.next_seq
+        slot = seq % self.capacity
+        evicted = self._ring[slot]
+        if evicted is not None:
+            self._spill(evicted)
+
+        entry["seq"] = seq
+        self._ring[slot] = entry
+        self.next_seq += 1
+
+        self._by_type[entry.get("type", "general")].append(seq)
+        self._by_agent[entry.get("agent", "System")].append(seq)
+        if evicted is not None:
+            self._trim_index(evicted)
+        return entry
+
+    def _trim_index(self, evicted: dict):
+        first_live = self.first_seq
+        self._by_type[evicted.get("type", "general")].trim(first_live)
+        self._by_agent[evicted.get("agent", "System")].trim(first_live)
+
+    def _spill(self, entry: dict):
+        if not self.spill_path:
+            return
+        if self._spill_file is None:
+            os.makedirs(os.path.dirname(self.spill_path) or ".", exist_ok=True)
+            self._spill_file = open(self.spill_path, "ab")
+            self._spill_start = entry["seq"]
+        self._spill_offsets.append(self._spill_file.tell())
+        self._spill_file.write((json.dumps(entry) + "\n").encode("utf-8"))
+        self._spill_file.flush()
+
+    def close(self):
+        if self._spill_file is not None:
+            self._spill_file.close()
+            self._spill_file = None
+
+    # ============ READ ============
+    @property
+    def first_seq(self) -> int:
+        """Oldest seq still held in memory"""
+        return max(0, self.next_seq - self.capacity)
+
+    def __len__(self):
+        return self.next_seq
+
+    def get(self, seq: int):
+        if self.first_seq <= seq < self.next_seq:
+            return self._ring[seq % self.capacity]
+        return None
+
+    def since(self, seq: int = 0, limit: int = None) -> list:
+        """Entries with seq >= `seq`, reading spilled entries from disk if needed"""
+        seq = max(seq, 0)
+        entries = []
+        if seq < self.first_seq:
+            entries = self._read_spilled(seq, self.first_seq)
+            seq = self.first_seq
+        end = self.next_seq if limit is None else min(self.next_seq, seq + limit - len(entries))
+        entries.extend(self._ring[s % self.capacity] for s in range(seq, end))
+        return entries if limit is None else entries[:limit]
+
+    def by_type(self, log_type: str, since: int = 0) -> list:
+        """In-memory entries of one type with seq >= since"""
+        return [self._ring[s % self.capacity] for s in self._by_type[log_type].since(since)]
+
+    def by_agent(self, agent: str, since: int = 0) -> list:
+        """In-memory entries from one agent with seq >= since"""
+        return [self._ring[s % self.capacity] for s in self._by_agent[agent].since(since)]
+
+    def first_of_type(self, log_type: str, count: int, since: int = 0, exclude_agent: str = None) -> list:
+        """First `count` entries of a type, stopping as soon as enough are found"""
+        index = self._by_type[log_type]
+        found = []
+        for pos in range(bisect_left(index.seqs, since, lo=index.offset), len(index.seqs)):
+            entry = self._ring[index.seqs[pos] % self.capacity]
+            if exclude_agent is None or entry.get("agent") != exclude_agent:
+                found.append(entry)
+                if len(found) >= count:
+                    break
+        return found
+
+    def _read_spilled(self, start: int, end: int) -> list:
+        start = max(start, self._spill_start)
+        if not self._spill_offsets or start >= end or not os.path.exists(self.spill_path):
+            return []
+        entries = []
+        with open(self.spill_path, "rb") as f:
+            f.seek(self._spill_offsets[start - self._spill_start])
+            for _ in range(end - start):
+                entries.append(json.loads(f.readline()))
+        return entries
@@ -0,0 +1,326 @@
+"""
+PolicySwarm Simulation Jobs
+Runs simulations in a pool of worker processes instead of the API event loop.
+The API keeps a mirror SimulationSession per job: workers stream log entries,
+tokens and run state back over a multiprocessing queue, and pause/stop
+requests travel the other way through a shared control dict. Workers record
+each job they dequeue in a shared assignment dict, so the jobs of a worker
+that dies before starting them aren't left queued forever.
+"""
+import asyncio
+import importlib
+import multiprocessing
+import os
+import queue
+import threading
+import time
+import traceback
+from collections import OrderedDict
+from core import llm, telemetry
+
+STATE_SYNC_SECONDS = 0.25  # How often a worker checks controls and pushes run state
+TELEMETRY_PUSH_SECONDS = 2.0  # How often a worker sends its metrics and new LLM calls
+
+# ============ WORKER PROCESS ============
+def _resolve(runner: str):
+    module_name, _, attribute = runner.partition(":")
+    return getattr(importlib.import_module(module_name), attribute)
+
+def _state_signature(session) -> tuple:
+    return (
+        session.current_iteration, len(session.metrics), len(session.final_report),
+        len(session.revised_policy), session.cycle_complete, session.senate_since, session.architect_since
+    )
+
+def _push_trace(session, job_id: str, results, shipped: dict, final: bool = False):
+    """Send the spans recorded since the last push (and, at the end, the profile)"""
+    if session.trace is None or (len(session.trace.spans) == shipped["spans"] and not final):
+        return
+    results.put(("trace", job_id, session.trace.since(shipped["spans"])))
+    shipped["spans"] = len(session.trace.spans)
+
+async def _sync_state(session, job_id: str, results, controls, shipped: dict):
+    """Apply pause/stop requests and push run state and new trace spans whenever they change"""
+    last = None
+    while True:
+        control = controls.get(job_id) or {}
+        session.simulation_paused = control.get("paused", False)
+        if control.get("stopped"):
+            session.cycle_complete = True
+        signature = _state_signature(session)
+        if signature != last:
+            results.put(("state", job_id, session.run_state()))
+            last = signature
+        _push_trace(session, job_id, results, shipped)
+        await asyncio.sleep(STATE_SYNC_SECONDS)
+
+async def _run_job(job: dict, worker_id: int, results, controls, run_simulation):
+    from agents.citizen_agent import CitizenPersona
+    from core.session import SimulationSession
+
+    job_id = job["job_id"]
+    if (controls.get(job_id) or {}).get("stopped"):
+        results.put(("done", job_id, {"status": "cancelled"}))
+        return
+
+    # Use the API process's LLM settings, which may differ from config.json at runtime
+    if job["llm_config"] != llm.config:
+        llm.use_config(job["llm_config"])
+
+    session = SimulationSession(job_id, [CitizenPersona(**p) for p in job["personas"]], job["observer_specs"], job["config"])
+    session.population, session.population_sample = job.get("population"), job.get("population_sample")
+    session.policy_document = job.get("policy_document")
+    if job.get("checkpoint") is not None:
+        session.restore_checkpoint(job["checkpoint"], job["events"])
+    session.event_sinks.append(lambda entry: results.put(("event", job_id, entry)))
+    if job["config"].get("stream_tokens"):
+        session.token_sinks.append(lambda token: results.put(("token", job_id, token)))
+
+    results.put(("started", job_id, {"worker": worker_id, "pid": os.getpid()}))
+    shipped = {"spans": 0}
+    sync = asyncio.create_task(_sync_state(session, job_id, results, controls, shipped))
+    outcome = {"status": "complete"}
+    try:
+        await run_simulation(session, job["policy"], job.get("checkpoint"))
+        if (controls.get(job_id) or {}).get("stopped"):
+            outcome = {"status": "cancelled"}
+    except Exception as e:
+        print(f"Job {job_id[:8]} failed: {e}")
+        outcome = {"status": "failed", "error": "".join(traceback.format_exception_only(type(e), e)).strip()}
+    finally:
+        sync.cancel()
+        session.cycle_complete = True
+        _push_trace(session, job_id, results, shipped, final=True)
+        results.put(("state", job_id, session.run_state()))
+        results.put(("done", job_id, outcome))
+        session.events.close()
+
+async def _push_telemetry(source: str, results):
+    """Send this worker's metric totals and LLM calls since the last push to the API process"""
+    sent = 0
+    while True:
+        await asyncio.sleep(TELEMETRY_PUSH_SECONDS)
+        snapshot = telemetry.registry.snapshot(calls_since=sent)
+        sent = snapshot["call_seq"]
+        results.put(("telemetry", source, snapshot))
+
+async def _worker_loop(worker_id: int, jobs, results, controls, assignments, runner: str, concurrency: int):
+    from core.llm import aclose_clients
+
+    run_simulation = _resolve(runner)
+    source = f"worker-{worker_id}"
+    monitors = [
+        asyncio.create_task(telemetry.monitor_loop_lag(source)),
+        asyncio.create_task(_push_telemetry(source, results))
+    ]
+    loop = asyncio.get_running_loop()
+    slots = asyncio.Semaphore(concurrency)
+    running = set()
+    while True:
+        await slots.acquire()
+        job = await loop.run_in_executor(None, jobs.get)
+        if job is None:  # Shutdown sentinel
+            break
+        assignments[job["job_id"]] = worker_id  # Before anything that can crash the worker
+        task = asyncio.create_task(_run_job(job, worker_id, results, controls, run_simulation))
+        running.add(task)
+        task.add_done_callback(lambda t: (running.discard(t), slots.release()))
+    await asyncio.gather(*running, return_exceptions=True)
+    for task in monitors:
+        task.cancel()
+    await aclose_clients()
+
+def worker_main(worker_id: int, jobs, results, controls, assignments, runner: str, concurrency: int):
+    """Entry point of each worker process"""
+    asyncio.run(_worker_loop(worker_id, jobs, results, controls, assignments, runner, concurrency))
+
+# ============ API SIDE ============
+class JobManager:
+    """Pool of simulation worker processes plus the API-side job table"""
+    def __init__(self, processes: int = 2, concurrency_per_worker: int = 1, runner: str = "main:run_simulation",
+                 max_jobs: int = 500, on_done=None):
+        self.processes = max(1, processes)
+        self.concurrency_per_worker = max(1, concurrency_per_worker)
+        self.runner = runner
+        self.max_jobs = max_jobs
+        self.on_done = on_done  # Called with the mirror session when a job finishes
+        self._ctx = multiprocessing.get_context("spawn")
+        self._jobs_queue = self._ctx.Queue()
+        self._results = self._ctx.Queue()
+        self._manager = None
+        self._controls = None
+        self._assignments = None  # job_id -> worker_id, written by the worker that dequeued the job
+        self._workers = {}  # worker_id -> Process
+        self.jobs: "OrderedDict[str, dict]" = OrderedDict()
+        self._sessions = {}  # job_id -> mirror SimulationSession
+        self._loop = None
+        self._listener = None
+        self._stopping = False
+
+    def start(self, loop: asyncio.AbstractEventLoop):
+        self._loop = loop
+        self._manager = self._ctx.Manager()
+        self._controls = self._manager.dict()
+        self._assignments = self._manager.dict()
+        for worker_id in range(self.processes):
+            self._spawn(worker_id)
+        self._listener = threading.Thread(target=self._listen, name="job-results", daemon=True)
+        self._listener.start()
+
+    def _spawn(self, worker_id: int):
+        process = self._ctx.Process(
+            target=worker_main,
+            args=(worker_id, self._jobs_queue, self._results, self._controls, self._assignments, self.runner,
+                  self.concurrency_per_worker),
+            name=f"policyswarm-worker-{worker_id}",
+            daemon=True
+        )
+        process.start()
+        self._workers[worker_id] = process
+
+    def submit(self, session, policy: str, checkpoint: dict = None) -> dict:
+        """Queue a run for `session` (which becomes the API-side mirror), optionally resuming a checkpoint"""
+        job_id = session.session_id
+        self._controls[job_id] = {"paused": False, "stopped": False}
+        job = {
+            "job_id": job_id,
+            "status": "queued",
+            "submitted_at": time.time(),
+            "started_at": None,
+            "finished_at": None,
+            "worker": None,
+            "pid": None,
+            "error": None
+        }
+        self.jobs[job_id] = job
+        self._sessions[job_id] = session
+        self._jobs_queue.put({
+            "job_id": job_id,
+            "policy": policy,
+            "personas": [p.model_dump() for p in session.personas],
+            "observer_specs": [dict(spec) for spec in session.observer_specs],
+            "config": session.config,
+            "population": session.population,
+            "population_sample": session.population_sample,
+            "policy_document": session.policy_document,
+            "checkpoint": checkpoint,
+            "events": session.events.since(0) if checkpoint is not None else [],  # Restored log up to the checkpoint
+            "llm_config": llm.config
+        })
+        self._evict()
+        return dict(job)
+
+    def has(self, job_id: str) -> bool:
+        return job_id in self.jobs
+
+    def update_control(self, job_id: str, paused: bool = None, stopped: bool = None):
+        if job_id not in self.jobs or self._controls is None:
+            return
+        control = dict(self._controls.get(job_id) or {})
+        if paused is not None:
+            control["paused"] = paused
+        if stopped is not None:
+            control["stopped"] = stopped
+        self._controls[job_id] = control
+
+    def cancel(self, job_id: str):
+        self.update_control(job_id, stopped=True)
+        job = self.jobs.get(job_id)
+        if job and job["status"] == "queued":
+            job["status"] = "cancelled"  # The worker skips it when it's dequeued
+
+    def get(self, job_id: str):
+        job = self.jobs.get(job_id)
+        return dict(job) if job else None
+
+    def all(self) -> list[dict]:
+        return [dict(job) for job in self.jobs.values()]
+
+    def workers(self) -> list[dict]:
+        return [
+            {"worker": worker_id, "pid": process.pid, "alive": process.is_alive()}
+            for worker_id, process in self._workers.items()
+        ]
+
+    def _evict(self):
+        finished = ("complete", "failed", "cancelled")
+        for job_id in list(self.jobs):
+            if len(self.jobs) <= self.max_jobs:
+                break
+            if self.jobs[job_id]["status"] in finished:
+                del self.jobs[job_id]
+                self._sessions.pop(job_id, None)
+                self._controls.pop(job_id, None)
+                self._assignments.pop(job_id, None)
+
+    # Results are read on a thread and applied on the event loop
+    def _listen(self):
+        while not self._stopping:
+            try:
+                message = self._results.get(timeout=1)
+            except queue.Empty:
+                self._check_workers()
+                continue
+            except (EOFError, OSError):
+                break
+            self._loop.call_soon_threadsafe(self._apply, message)
+
+    def _check_workers(self):
+        """Fail the jobs of a crashed worker (started or only dequeued) and replace it"""
+        for worker_id, process in list(self._workers.items()):
+            if process.is_alive() or self._stopping:
+                continue
+            print(f"Worker {worker_id} (pid {process.pid}) exited with code {process.exitcode}; restarting")
+            for job_id, job in list(self.jobs.items()):
+                if job["status"] not in ("queued", "running"):
+                    continue
+                worker = job["worker"] if job["worker"] is not None else self._assignments.get(job_id)
+                if worker == worker_id:
+                    self._loop.call_soon_threadsafe(
+                        self._apply, ("done", job_id, {"status": "failed", "error": "worker process exited"})
+                    )
+            self._spawn(worker_id)
+
+    def _apply(self, message):
+        kind, job_id, payload = message
+        if kind == "telemetry":  # From a worker, not a job: job_id is the worker's name
+            telemetry.registry.merge_remote(job_id, payload)
+            return
+        job = self.jobs.get(job_id)
+        session = self._sessions.get(job_id)
+        if job is None or session is None:
+            return
+        if kind == "event":
+            session.events.append(payload)
+            session.notify_listeners()
+        elif kind == "token":
+            session.publish_token(payload)
+        elif kind == "state":
+            session.apply_run_state(payload)
+        elif kind == "trace":
+            if session.trace is not None:
+                session.trace.merge(payload)
+        elif kind == "started":
+            job.update(status="running", started_at=time.time(), **payload)
+        elif kind == "done":
+            if job["status"] in ("complete", "failed", "cancelled") and job["finished_at"]:
+                return
+            job.update(status=payload["status"], error=payload.get("error"), finished_at=time.time())
+            self._assignments.pop(job_id, None)
+            session.cycle_complete = True
+            session.run_pending = False
+            session.notify_listeners()
+            if self.on_done is not None and payload["status"] != "failed":
+                self.on_done(session)
+
+    def shutdown(self, timeout: float = 5.0):
+        self._stopping = True
+        for _ in self._workers:
+            self._jobs_queue.put(None)
+        deadline = time.time() + timeout
+        for process in self._workers.values():
+            process.join(max(0.0, deadline - time.time()))
+            if process.is_alive():
+                process.terminate()
+        if self._manager is not None:
+            self._manager.shutdown()
@@ -0,0 +1,65 @@
+"""
+PolicySwarm Incremental JSON Field Extractor
+Surfaces the text of one string field (e.g. "message") from a JSON object
+while the model is still generating it, so the UI can show tokens early.
+"""
+import re
+
+_ESCAPES = {'"': '"', '\\': '\\', '/': '/', 'b': '\b', 'f': '\f', 'n': '\n', 'r': '\r', 't': '\t'}
+
+class IncrementalJSONField:
+    def __init__(self, field: str = "message"):
+        self.field = field
+        self._key_pattern = re.compile(r'"' + re.escape(field) + r'"\s*:\s*"')
+        self._buffer = ""
+        self._pos = None  # Index just past the opening quote of the value
+        self.value = ""
+        self.done = False
+
+    def feed(self, chunk: str) -> str:
+        """Add raw model output; return newly decoded text of the field"""
+        self._buffer += chunk
+        if self.done:
+            return ""
+        if self._pos is None:
+            match = self._key_pattern.search(self._buffer)
+            if not match:
+                return ""
+            self._pos = match.end()
+
+        decoded = []
+        buf, i = self._buffer, self._pos
+        while i < len(buf):
+            ch = buf[i]
+            if ch == '"':
+                self.done = True
+                i += 1
+                break
+            if ch != '\\':
+                decoded.append(ch)
+                i += 1
+                continue
+            # Escape sequence: wait for the rest of it if it's split across chunks
+            if i + 1 >= len(buf):
+                break
+            esc = buf[i + 1]
+            if esc == 'u':
+                if i + 6 > len(buf):
+                    break
+                try:
+                    decoded.append(chr(int(buf[i + 2:i + 6], 16)))
+                except ValueError:
+                    pass
+                i += 6
+            else:
+                decoded.append(_ESCAPES.get(esc, esc))
+                i += 2
+        self._pos = i
+        delta = "".join(decoded)
+        self.value += delta
+        return delta
+
+    @property
+    def text(self) -> str:
+        """Everything fed so far"""
+        return self._buffer
@@ -1,10 +1,26 @@
 """
 PolicySwarm LLM Interface
-Supports: Ollama (default), OpenAI, Gemini, Blaxel
+Supports: Ollama (default), OpenAI, Gemini, Blaxel, Mock (offline benchmarking)
+
+Sync helpers (get_*_response) are kept for scripts; the agents use the async
+interface (aget_llm_response / aget_json_response), which shares one pooled
+keep-alive HTTP client per provider and caps in-flight requests per provider.
+Async calls run under core.resilience (deadlines, retries, circuit breaker,
+hedging); a call that still fails comes back as a "<Provider> error: ..." string.
 """
+import asyncio
 import json
 import os
+import re
+import httpx
 import requests
+from core import prompts, telemetry, tracing
+from core.resilience import ProviderError, Resilience
+from core.llm_cache import LLMCache, make_cache_key
+from core.mock_llm import MockLLM
+from core.json_stream import IncrementalJSONField
+from core.schemas import SCHEMAS, json_schema as schema_for, describe_errors
+from pydantic import ValidationError
 
 # Load configuration
 CONFIG_PATH = os.path.join(os.path.dirname(__file__), '..', 'config.json')
@@ -20,6 +36,9 @@ def load_config():
 config = load_config()
 PROVIDER = config.get("llm_provider", "ollama")
 
+# Sampling settings shared by every provider call (also part of the cache key)
+GENERATION_OPTIONS = {"temperature": 0.7, "max_tokens": 500}
+
 # ============ OLLAMA (Local - Default) ============
 def get_ollama_response(prompt: str) -> str:
     """Local Ollama for maximum privacy"""
@@ -30,7 +49,8 @@ def get_ollama_response(prompt: str) -> str:
         "model": ollama_config.get("model", "gemma3:12b"),
         "prompt": prompt,
         "stream": False,
-        "options": {"temperature": 0.7, "num_predict": 500}
+        "keep_alive": ollama_config.get("keep_alive", "30m"),
+        "options": {"temperature": GENERATION_OPTIONS["temperature"], "num_predict": GENERATION_OPTIONS["max_tokens"]}
     }
     
     try:
@@ -56,8 +76,8 @@ def get_openai_response(prompt: str) -> str:
         response = client.chat.completions.create(
             model=openai_config.get("model", "gpt-4o-mini"),
             messages=[{"role": "user", "content": prompt}],
-            max_tokens=500,
-            temperature=0.7
+            max_tokens=GENERATION_OPTIONS["max_tokens"],
+            temperature=GENERATION_OPTIONS["temperature"]
         )
         return response.choices[0].message.content
     except ImportError:
@@ -108,11 +128,63 @@ def get_blaxel_response(prompt: str) -> str:
     except Exception as e:
         return f"Blaxel error: {str(e)}"
 
+# ============ MOCK (Offline) ============
+_mock = None
+
+def get_mock_llm() -> MockLLM:
+    """Shared mock provider built from the "mock" config section"""
+    global _mock
+    if _mock is None:
+        _mock = MockLLM.from_config(config.get("mock", {}))
+    return _mock
+
+def get_mock_response(prompt: str) -> str:
+    """Schema-valid canned reply with synthetic latency"""
+    return get_mock_llm().generate(prompt)
+
+# ============ RESPONSE CACHE ============
+_cache = None
+
+def get_response_cache():
+    """Shared LLMCache, or None unless "cache.enabled" is set in config"""
+    global _cache
+    cache_config = config.get("cache", {})
+    if not cache_config.get("enabled", False):
+        return None
+    if _cache is None:
+        path = cache_config.get("path")
+        if path and not os.path.isabs(path):
+            path = os.path.join(os.path.dirname(CONFIG_PATH), path)
+        _cache = LLMCache(
+            path=path,
+            memory_entries=cache_config.get("memory_entries", 1024),
+            max_disk_entries=cache_config.get("max_disk_entries", 100000),
+            ttl_seconds=cache_config.get("ttl_seconds", 7 * 24 * 3600),
+            flush_every=cache_config.get("flush_every", 32)
+        )
+    return _cache
+
+def _cache_key(provider: str, prompt: str, json_schema: dict = None) -> str:
+    model = config.get(provider, {}).get("model", "")
+    return make_cache_key(provider, model, GENERATION_OPTIONS, prompt, json_schema)
+
+def is_error_response(response: str) -> bool:
+    """Provider failures come back as "Error: ..." / "<Provider> error: ..." strings"""
+    return bool(re.match(r"^(\w+ )?[Ee]rror: ", response or ""))
+
+def describe_exception(e: Exception) -> str:
+    """Exception class and message, for provider error strings"""
+    return f"{type(e).__name__}: {e}"
+
+def error_class(response: str):
+    """Exception class named in a provider error string (ProviderError if none), or None if it isn't one"""
+    if not is_error_response(response):
+        return None
+    match = re.match(r"^(?:\w+ )?[Ee]rror: (\w+): ", response)
+    return match.group(1) if match else "ProviderError"
+
 # ============ UNIFIED INTERFACE ============
-def get_llm_response(prompt: str) -> str:
-    """Get response from configured LLM provider"""
-    provider = config.get("llm_provider", "ollama")
-    
+def _dispatch_llm_response(provider: str, prompt: str) -> str:
     if provider == "ollama":
         return get_ollama_response(prompt)
     elif provider == "openai":
@@ -121,22 +193,592 @@ def get_llm_response(prompt: str) -> str:
         return get_gemini_response(prompt)
     elif provider == "blaxel":
         return get_blaxel_response(prompt)
+    elif provider == "mock":
+        return get_mock_response(prompt)
     else:
         return get_ollama_response(prompt)  # Fallback to Ollama
 
+def get_llm_response(prompt: str) -> str:
+    """Get response from configured LLM provider"""
+    provider = config.get("llm_provider", "ollama")
+    cache = get_response_cache()
+    if cache is not None:
+        key = _cache_key(provider, prompt)
+        cached = cache.get(key)
+        if cached is not None:
+            return cached
+    
+    response = _dispatch_llm_response(provider, prompt)
+    if cache is not None and not is_error_response(response):
+        cache.set(key, response)
+    return response
+
+def extract_json_object(response: str) -> dict:
+    """First JSON object in a raw LLM reply (raises ValueError if there is none).
+
+    Native JSON modes return the bare object, so that's tried first; otherwise
+    the first balanced {...} span is scanned out, skipping braces in strings.
+    """
+    text = (response or "").strip()
+    if text.startswith("{"):
+        try:
+            data = json.loads(text)
+            if isinstance(data, dict):
+                return data
+        except json.JSONDecodeError:
+            pass
+    
+    start = text.find("{")
+    while start != -1:
+        depth, in_string, escaped = 0, False, False
+        for i in range(start, len(text)):
+            ch = text[i]
+            if in_string:
+                if escaped:
+                    escaped = False
+                elif ch == "\\":
+                    escaped = True
+                elif ch == '"':
+                    in_string = False
+            elif ch == '"':
+                in_string = True
+            elif ch == "{":
+                depth += 1
+            elif ch == "}":
+                depth -= 1
+                if depth == 0:
+                    try:
+                        data = json.loads(text[start:i + 1])
+                        if isinstance(data, dict):
+                            return data
+                    except json.JSONDecodeError:
+                        pass
+                    break
+        start = text.find("{", start + 1)
+    raise ValueError("no JSON object found")
+
+def parse_json_response(response: str) -> dict:
+    """Extract the JSON object from a raw LLM reply"""
+    if is_error_response(response):
+        # Not something the model said: don't let it stand in as a message or score
+        return {"parse_failed": True, "error": response[:200]}
+    try:
+        return extract_json_object(response)
+    except ValueError:
+        return {"message": response, "score": 50}
+
 def get_json_response(prompt: str) -> dict:
     """Get JSON response from LLM"""
-    response = get_llm_response(prompt)
+    return parse_json_response(get_llm_response(prompt))
+
+# ============ ASYNC CLIENT POOL ============
+DEFAULT_MAX_CONCURRENCY = 4
+DEFAULT_TIMEOUT = 120
+
+_async_clients: dict[str, httpx.AsyncClient] = {}
+_semaphores: dict[str, asyncio.Semaphore] = {}
+_pool_loop = None
+_pool_closer = None  # Task closing the pool when its loop shuts down
+
+def get_provider_concurrency(provider: str) -> int:
+    """Max in-flight requests allowed against a provider"""
+    return int(config.get(provider, {}).get("max_concurrency", DEFAULT_MAX_CONCURRENCY))
+
+def _check_pool_loop():
+    """Clients and semaphores are bound to the loop that created them"""
+    global _pool_loop, _pool_closer
+    loop = asyncio.get_running_loop()
+    if _pool_loop is not loop:
+        # A new event loop (e.g. a fresh worker); the old pool can't be reused, but its connections must be closed
+        stale = list(_async_clients.values())
+        _async_clients.clear()
+        _semaphores.clear()
+        for client in stale:
+            if _pool_loop is not None and _pool_loop.is_running():
+                asyncio.run_coroutine_threadsafe(_aclose_stale_client(client), _pool_loop)
+            else:
+                loop.create_task(_aclose_stale_client(client))
+        _pool_loop = loop
+        _pool_closer = loop.create_task(_close_pool_with_loop(loop))
+
+async def _close_pool_with_loop(loop):
+    """Waits for the loop to shut down (asyncio.run cancels leftover tasks), then closes its clients
+    while their connections can still be closed properly"""
+    try:
+        await loop.create_future()
+    finally:
+        if _pool_loop is loop:
+            await aclose_clients()
+
+async def _aclose_stale_client(client: httpx.AsyncClient):
+    """Close a client left over from another event loop (if that loop is gone, only the client state is closed)"""
+    try:
+        await client.aclose()
+    except Exception as e:
+        print(f"Could not close stale HTTP client: {describe_exception(e)}")
+
+def get_async_client(provider: str) -> httpx.AsyncClient:
+    """Shared keep-alive HTTP client for a provider"""
+    _check_pool_loop()
+    client = _async_clients.get(provider)
+    if client is None or client.is_closed:
+        limit = get_provider_concurrency(provider)
+        provider_config = config.get(provider, {})
+        client = httpx.AsyncClient(
+            timeout=provider_config.get("timeout", DEFAULT_TIMEOUT),
+            limits=httpx.Limits(
+                max_connections=limit,
+                max_keepalive_connections=limit,
+                keepalive_expiry=provider_config.get("keepalive_expiry", 60)
+            )
+        )
+        _async_clients[provider] = client
+    return client
+
+def get_provider_semaphore(provider: str) -> asyncio.Semaphore:
+    """Concurrency limiter for a provider"""
+    _check_pool_loop()
+    if provider not in _semaphores:
+        _semaphores[provider] = asyncio.Semaphore(get_provider_concurrency(provider))
+    return _semaphores[provider]
+
+_resilience = None
+
+def get_resilience() -> Resilience:
+    """Shared deadlines / retries / breakers, built from the "resilience" config section"""
+    global _resilience
+    if _resilience is None:
+        _resilience = Resilience(config.get("resilience", {}))
+    return _resilience
+
+def get_resilience_stats() -> dict:
+    return get_resilience().summary()
+
+def _endpoint(provider: str) -> str:
+    """Circuit breakers are per endpoint: the provider plus its base URL, if configured"""
+    base_url = config.get(provider, {}).get("base_url")
+    return f"{provider} {base_url}" if base_url else provider
+
+async def aclose_clients():
+    """Close pooled HTTP clients and flush cache writes (call on shutdown)"""
+    if _cache is not None:
+        await asyncio.to_thread(_cache.flush)
+    for client in list(_async_clients.values()):
+        await client.aclose()
+    _async_clients.clear()
+    _semaphores.clear()
+
+# ============ ASYNC PROVIDERS ============
+def _chat_messages(prompt: str, system: str = None) -> list:
+    """Stable system prefix first, variable content last"""
+    messages = [{"role": "system", "content": system}] if system else []
+    messages.append({"role": "user", "content": prompt})
+    return messages
+
+def join_prompt(prompt: str, system: str = None) -> str:
+    """Single-string form for providers without a system role"""
+    return f"{system}\n\n{prompt}" if system else prompt
+
+
+async def aget_ollama_response(prompt: str, system: str = None, json_schema: dict = None) -> str:
+    """Local Ollama over the pooled client.
+
+    Uses /api/chat with the stable system prefix first and keep_alive set, so
+    the server keeps the model loaded and can reuse the cached prefix.
+    """
+    ollama_config = config.get("ollama", {})
+    url = f"{ollama_config.get('base_url', 'http://localhost:11434')}/api/chat"
+    
+    payload = {
+        "model": ollama_config.get("model", "gemma3:12b"),
+        "messages": _chat_messages(prompt, system),
+        "stream": False,
+        "keep_alive": ollama_config.get("keep_alive", "30m"),
+        "options": {"temperature": GENERATION_OPTIONS["temperature"], "num_predict": GENERATION_OPTIONS["max_tokens"]}
+    }
+    if json_schema:
+        payload["format"] = json_schema  # Grammar-constrained decoding to the schema
+    
+    response = await get_async_client("ollama").post(url, json=payload)
+    response.raise_for_status()
+    return response.json().get("message", {}).get("content", "")
+
+async def aget_openai_response(prompt: str, system: str = None, json_schema: dict = None) -> str:
+    """OpenAI chat completions over the pooled client"""
+    openai_config = config.get("openai", {})
+    api_key = openai_config.get("api_key") or os.getenv("OPENAI_API_KEY")
+    
+    if not api_key:
+        raise ProviderError("OpenAI API key not configured")
     
+    url = f"{openai_config.get('base_url', 'https://api.openai.com/v1')}/chat/completions"
+    payload = {
+        "model": openai_config.get("model", "gpt-4o-mini"),
+        "messages": _chat_messages(prompt, system),
+        "max_tokens": GENERATION_OPTIONS["max_tokens"],
+        "temperature": GENERATION_OPTIONS["temperature"]
+    }
+    if json_schema:
+        payload["response_format"] = {"type": "json_object"}  # JSON mode (prompts already mention JSON)
+    
+    response = await get_async_client("openai").post(
+        url, json=payload, headers={"Authorization": f"Bearer {api_key}"}
+    )
+    response.raise_for_status()
+    return response.json()["choices"][0]["message"]["content"]
+
+async def aget_gemini_response(prompt: str, system: str = None, json_schema: dict = None) -> str:
+    """Google Gemini REST API over the pooled client"""
+    gemini_config = config.get("gemini", {})
+    api_key = gemini_config.get("api_key") or os.getenv("GOOGLE_API_KEY")
+    
+    if not api_key:
+        raise ProviderError("Gemini API key not configured")
+    
+    model = gemini_config.get("model", "gemini-1.5-flash")
+    base_url = gemini_config.get("base_url", "https://generativelanguage.googleapis.com/v1beta")
+    url = f"{base_url}/models/{model}:generateContent"
+    payload = {"contents": [{"parts": [{"text": prompt}]}]}
+    if system:
+        payload["systemInstruction"] = {"parts": [{"text": system}]}
+    if json_schema:
+        payload["generationConfig"] = {"responseMimeType": "application/json"}
+    
+    response = await get_async_client("gemini").post(url, json=payload, params={"key": api_key})
+    response.raise_for_status()
+    parts = response.json()["candidates"][0]["content"]["parts"]
+    return "".join(p.get("text", "") for p in parts)
+
+async def aget_blaxel_response(prompt: str, system: str = None, json_schema: dict = None) -> str:
+    """Blaxel only ships a sync SDK, so it still runs in a worker thread"""
+    response = await asyncio.to_thread(get_blaxel_response, join_prompt(prompt, system))
+    if is_error_response(response):
+        raise ProviderError(response.split(": ", 1)[1], transient=not response.startswith("Error: "))
+    return response
+
+async def aget_mock_response(prompt: str, system: str = None, json_schema: dict = None) -> str:
+    """Mock provider; latency is an asyncio.sleep, so it costs no threads"""
+    return await get_mock_llm().agenerate(join_prompt(prompt, system))
+
+ASYNC_PROVIDERS = {  # Each raises on failure
+    "ollama": aget_ollama_response,
+    "openai": aget_openai_response,
+    "gemini": aget_gemini_response,
+    "blaxel": aget_blaxel_response,
+    "mock": aget_mock_response,
+}
+
+PROVIDER_LABELS = {"ollama": "Ollama", "openai": "OpenAI", "gemini": "Gemini", "blaxel": "Blaxel", "mock": "Mock"}
+
+def provider_error(provider: str, error: Exception) -> str:
+    """The string a call that failed for good returns (see is_error_response)"""
+    message = f"{PROVIDER_LABELS.get(provider, provider)} error: {describe_exception(error)}"
+    print(message)
+    return message
+
+# ============ ASYNC UNIFIED INTERFACE ============
+def _start_call(provider: str, prompt: str, system: str = None) -> telemetry.LLMCall:
+    """Telemetry record for one provider call (tagged by core.telemetry.tagged)"""
+    full_prompt = join_prompt(prompt, system)
+    model = config.get(provider, {}).get("model") or provider
+    return telemetry.start_call(provider, model, prompts.count_tokens(full_prompt), len(full_prompt))
+
+def _finish_call(call: telemetry.LLMCall, response: str, span_args: dict, cached: bool = False):
+    failure = error_class(response)
+    call.finish(response, 0 if failure else prompts.count_tokens(response or ""), failure, cached)
+    record = call.record
+    span_args.update(outcome=record["outcome"], queue_wait=record["queue_wait"], prompt_tokens=record["prompt_tokens"],
+                     response_tokens=record["response_tokens"], attempts=record["attempts"], hedged=record["hedged"])
+
+def _call_span(call: telemetry.LLMCall) -> tracing.span:
+    return tracing.span(call.record["prompt_type"], "llm", agent=call.record["agent"], provider=call.record["provider"])
+
+async def aget_llm_response(prompt: str, system: str = None, json_schema: dict = None) -> str:
+    """Async response from configured LLM provider, bounded per provider.
+
+    `system` is the stable per-agent prefix; `prompt` is the per-call suffix.
+    `json_schema` switches on the provider's native JSON mode where it has one.
+    """
+    provider = config.get("llm_provider", "ollama")
+    if provider not in ASYNC_PROVIDERS:
+        provider = "ollama"  # Fallback to Ollama
+    
+    call = _start_call(provider, prompt, system)
+    with _call_span(call) as span_args:
+        cache = get_response_cache()
+        if cache is not None:
+            key = _cache_key(provider, join_prompt(prompt, system), json_schema)
+            cached = await cache.aget(key)
+            if cached is not None:
+                _finish_call(call, cached, span_args, cached=True)
+                return cached
+        
+        try:
+            response = await get_resilience().call(
+                _endpoint(provider), provider, call.record["prompt_type"],
+                lambda: ASYNC_PROVIDERS[provider](prompt, system, json_schema),
+                get_provider_semaphore(provider), call.record, on_slot=call.queued
+            )
+        except Exception as e:
+            response = provider_error(provider, e)
+        _finish_call(call, response, span_args)
+    if cache is not None and not is_error_response(response):
+        await cache.aset(key, response)
+    return response
+
+# ============ STRUCTURED OUTPUT ============
+STRUCTURED_COUNTERS = ("calls", "valid_first_try", "repaired", "repair_calls", "failed")
+_structured_stats = {}
+
+def _count(schema: str, counter: str):
+    stats = _structured_stats.setdefault(schema, dict.fromkeys(STRUCTURED_COUNTERS, 0))
+    stats[counter] += 1
+
+def get_structured_output_stats() -> dict:
+    """Parse/repair counters, in total and per prompt type"""
+    totals = dict.fromkeys(STRUCTURED_COUNTERS, 0)
+    for stats in _structured_stats.values():
+        for counter, value in stats.items():
+            totals[counter] += value
+    return {**totals, "by_schema": {name: dict(stats) for name, stats in _structured_stats.items()}}
+
+def validate_json_response(response: str, schema: str):
+    """(validated dict, None) or (None, reason the reply can't be used)"""
     try:
-        # Extract JSON from response
-        import re
-        json_match = re.search(r'\{[\s\S]*\}', response)
-        if json_match:
-            return json.loads(json_match.group())
-        return {"message": response, "score": 50}
-    except json.JSONDecodeError:
-        return {"message": response, "score": 50}
+        data = extract_json_object(response)
+    except ValueError as e:
+        return None, str(e)
+    try:
+        return SCHEMAS[schema].model_validate(data).model_dump(), None
+    except ValidationError as e:
+        return None, describe_errors(e)
+
+def build_repair_prompt(prompt: str, schema: str, response: str, error: str) -> str:
+    """Re-ask with the specific validation problem rather than a blind retry"""
+    fields = ", ".join(SCHEMAS[schema].model_fields)
+    return f"""{prompt}
+
+Your previous reply could not be used ({error}):
+{response[:500]}
+
+Reply again with ONLY a JSON object with the fields: {fields}."""
+
+async def aget_json_response(prompt: str, system: str = None, schema: str = None, on_token=None,
+                             stream_field: str = "message", agent: str = None) -> dict:
+    """Async JSON response from LLM.
+
+    With `schema` (a key of core.schemas.SCHEMAS) the reply is validated
+    against that model, the provider's native JSON mode is used where
+    available, and an invalid reply is repaired up to
+    structured_output.max_repairs times. A reply that never validates comes
+    back as {"parse_failed": True, "error": ...} instead of made-up values.
+
+    With `on_token`, the first attempt is streamed and on_token(text) is
+    called with each newly generated piece of the `stream_field` string.
+    `agent` names the caller in call telemetry.
+    """
+    tags = {"prompt_type": schema or "raw", **({"agent": agent} if agent else {})}
+    with telemetry.tagged(**tags):
+        return await _aget_json_response(prompt, system, schema, on_token, stream_field)
+
+async def _aget_json_response(prompt: str, system: str, schema: str, on_token, stream_field: str) -> dict:
+    options = config.get("structured_output", {})
+    native_schema = schema_for(schema) if schema and options.get("native_format", True) else None
+    
+    if on_token is None:
+        response = await aget_llm_response(prompt, system, native_schema)
+    else:
+        extractor = IncrementalJSONField(stream_field)
+        try:
+            async for chunk in astream_llm_response(prompt, system, native_schema):
+                delta = extractor.feed(chunk)
+                if delta:
+                    on_token(delta)
+            response = extractor.text
+        except ProviderError as e:
+            response = str(e)  # The "<Provider> error: ..." string, so it isn't repaired
+    
+    if schema is None:
+        return parse_json_response(response)
+    
+    _count(schema, "calls")
+    with tracing.span("parse", "parse", schema=schema):
+        data, error = validate_json_response(response, schema)
+    telemetry.record_parse(data is not None)
+    if data is not None:
+        _count(schema, "valid_first_try")
+        return data
+    
+    # Provider failures aren't malformed output; re-asking won't fix them
+    repairs = options.get("max_repairs", 1)
+    if is_error_response(response):
+        repairs, error = 0, response[:200]
+    for _ in range(repairs):
+        _count(schema, "repair_calls")
+        response = await aget_llm_response(build_repair_prompt(prompt, schema, response, error), system, native_schema)
+        with tracing.span("parse", "parse", schema=schema, repair=True):
+            data, error = validate_json_response(response, schema)
+        telemetry.record_parse(data is not None)
+        if data is not None:
+            _count(schema, "repaired")
+            return data
+        if is_error_response(response):
+            break
+    
+    _count(schema, "failed")
+    print(f"Structured output failed ({schema}): {error}")
+    return {"parse_failed": True, "error": error}
+
+# ============ STREAMING ============
+async def astream_ollama_response(prompt: str, system: str = None, json_schema: dict = None):
+    """Ollama /api/chat with stream=True (NDJSON chunks)"""
+    ollama_config = config.get("ollama", {})
+    url = f"{ollama_config.get('base_url', 'http://localhost:11434')}/api/chat"
+    payload = {
+        "model": ollama_config.get("model", "gemma3:12b"),
+        "messages": _chat_messages(prompt, system),
+        "stream": True,
+        "keep_alive": ollama_config.get("keep_alive", "30m"),
+        "options": {"temperature": GENERATION_OPTIONS["temperature"], "num_predict": GENERATION_OPTIONS["max_tokens"]}
+    }
+    if json_schema:
+        payload["format"] = json_schema
+    
+    async with get_async_client("ollama").stream("POST", url, json=payload) as response:
+        response.raise_for_status()
+        async for line in response.aiter_lines():
+            if not line:
+                continue
+            data = json.loads(line)
+            chunk = data.get("message", {}).get("content", "")
+            if chunk:
+                yield chunk
+            if data.get("done"):
+                break
+
+async def _iter_sse_data(response):
+    """JSON payloads from a `data: ...` event stream"""
+    async for line in response.aiter_lines():
+        if not line.startswith("data:"):
+            continue
+        data = line[len("data:"):].strip()
+        if data == "[DONE]":
+            break
+        yield json.loads(data)
+
+async def astream_openai_response(prompt: str, system: str = None, json_schema: dict = None):
+    """OpenAI chat completions with stream=True"""
+    openai_config = config.get("openai", {})
+    api_key = openai_config.get("api_key") or os.getenv("OPENAI_API_KEY")
+    
+    if not api_key:
+        raise ProviderError("OpenAI API key not configured")
+    
+    url = f"{openai_config.get('base_url', 'https://api.openai.com/v1')}/chat/completions"
+    payload = {
+        "model": openai_config.get("model", "gpt-4o-mini"),
+        "messages": _chat_messages(prompt, system),
+        "max_tokens": GENERATION_OPTIONS["max_tokens"],
+        "temperature": GENERATION_OPTIONS["temperature"],
+        "stream": True
+    }
+    if json_schema:
+        payload["response_format"] = {"type": "json_object"}
+    
+    async with get_async_client("openai").stream(
+        "POST", url, json=payload, headers={"Authorization": f"Bearer {api_key}"}
+    ) as response:
+        response.raise_for_status()
+        async for data in _iter_sse_data(response):
+            choices = data.get("choices") or [{}]
+            chunk = choices[0].get("delta", {}).get("content")
+            if chunk:
+                yield chunk
+
+async def astream_gemini_response(prompt: str, system: str = None, json_schema: dict = None):
+    """Gemini streamGenerateContent over SSE"""
+    gemini_config = config.get("gemini", {})
+    api_key = gemini_config.get("api_key") or os.getenv("GOOGLE_API_KEY")
+    
+    if not api_key:
+        raise ProviderError("Gemini API key not configured")
+    
+    model = gemini_config.get("model", "gemini-1.5-flash")
+    base_url = gemini_config.get("base_url", "https://generativelanguage.googleapis.com/v1beta")
+    url = f"{base_url}/models/{model}:streamGenerateContent"
+    payload = {"contents": [{"parts": [{"text": prompt}]}]}
+    if system:
+        payload["systemInstruction"] = {"parts": [{"text": system}]}
+    if json_schema:
+        payload["generationConfig"] = {"responseMimeType": "application/json"}
+    
+    async with get_async_client("gemini").stream(
+        "POST", url, json=payload, params={"key": api_key, "alt": "sse"}
+    ) as response:
+        response.raise_for_status()
+        async for data in _iter_sse_data(response):
+            for candidate in data.get("candidates", [])[:1]:
+                for part in candidate.get("content", {}).get("parts", []):
+                    if part.get("text"):
+                        yield part["text"]
+
+async def _astream_whole_response(provider: str, prompt: str, system: str, json_schema: dict):
+    """Providers without a streaming API: the whole response as one chunk"""
+    yield await ASYNC_PROVIDERS[provider](prompt, system, json_schema)
+
+ASYNC_STREAM_PROVIDERS = {  # Each raises on failure
+    "ollama": astream_ollama_response,
+    "openai": astream_openai_response,
+    "gemini": astream_gemini_response,
+}
+
+async def astream_llm_response(prompt: str, system: str = None, json_schema: dict = None):
+    """Yield text chunks from the configured provider as they're generated.
+
+    Providers without a streaming API (Blaxel, mock) and cache hits yield the
+    whole response as a single chunk. A call that fails, even after partial
+    output, raises ProviderError carrying the "<Provider> error: ..." string
+    rather than yielding it as if the model had written it.
+    """
+    provider = config.get("llm_provider", "ollama")
+    if provider not in ASYNC_PROVIDERS:
+        provider = "ollama"  # Fallback to Ollama
+    
+    call = _start_call(provider, prompt, system)
+    with _call_span(call) as span_args:
+        cache = get_response_cache()
+        if cache is not None:
+            key = _cache_key(provider, join_prompt(prompt, system), json_schema)
+            cached = await cache.aget(key)
+            if cached is not None:
+                _finish_call(call, cached, span_args, cached=True)
+                yield cached
+                return
+        
+        if provider in ASYNC_STREAM_PROVIDERS:
+            open_stream = lambda: ASYNC_STREAM_PROVIDERS[provider](prompt, system, json_schema)
+        else:
+            open_stream = lambda: _astream_whole_response(provider, prompt, system, json_schema)
+        chunks, failed = [], None
+        stream = get_resilience().stream(
+            _endpoint(provider), provider, call.record["prompt_type"], open_stream,
+            get_provider_semaphore(provider), call.record, on_slot=call.queued
+        )
+        try:
+            async for chunk in stream:
+                call.first_chunk()
+                chunks.append(chunk)
+                yield chunk
+        except Exception as e:
+            failed = provider_error(provider, e)
+        finally:
+            await stream.aclose()
+        _finish_call(call, failed or "".join(chunks), span_args)
+        span_args["first_chunk"] = call.record["first_chunk"]
+    if failed is not None:
+        raise ProviderError(failed)
+    if cache is not None:
+        await cache.aset(key, "".join(chunks))
 
 def get_current_provider() -> str:
     """Get the current LLM provider name"""
@@ -144,6 +786,18 @@ def get_current_provider() -> str:
 
 def reload_config():
     """Reload configuration from file"""
-    global config, PROVIDER
-    config = load_config()
+    use_config(load_config())
+
+def use_config(new_config: dict):
+    """Switch to another configuration (e.g. the API's, inside a worker process)"""
+    global config, PROVIDER, _cache, _mock, _resilience
+    config = new_config
     PROVIDER = config.get("llm_provider", "ollama")
+    # New concurrency limits apply to the next semaphores created
+    _semaphores.clear()
+    _mock = None
+    _resilience = None
+    # Rebuild the cache from the new settings on next use
+    if _cache is not None:
+        _cache.close()
+        _cache = None
@@ -0,0 +1,178 @@
+"""
+PolicySwarm LLM Response Cache
+Opt-in two-tier cache for prompt -> response:
+- In-memory LRU for hot prompts within a process
+- SQLite on disk so identical prompts are replayed across restarts; writes are
+  batched (flush_every) and the async helpers do disk I/O off the event loop
+Keys hash (provider, model, options, prompt, native JSON schema); entries expire after a TTL.
+"""
+import asyncio
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+def make_cache_key(provider: str, model: str, options: dict, prompt: str, json_schema: dict = None) -> str:
+    """`json_schema` is the native JSON mode requested, if any: it changes the request, so it's part of the key"""
+    payload = json.dumps(
+        {"provider": provider, "model": model, "options": options or {}, "prompt": prompt, "json_schema": json_schema},
+        sort_keys=True
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+class LLMCache:
+    def __init__(self, path: str = None, memory_entries: int = 1024, max_disk_entries: int = 100000,
+                 ttl_seconds: float = 7 * 24 * 3600, flush_every: int = 32):
+        self.path = path
+        self.memory_entries = memory_entries
+        self.max_disk_entries = max_disk_entries
+        self.ttl_seconds = ttl_seconds
+        self.flush_every = max(1, flush_every)
+        self._memory: "OrderedDict[str, tuple[float, str]]" = OrderedDict()
+        self._pending = {}  # key -> (created_at, response) not yet written to disk
+        self._lock = threading.Lock()  # Memory tier, pending writes and stats
+        self._db_lock = threading.Lock()  # The SQLite connection (held during disk I/O only)
+        self._db = None
+        self._writes_since_prune = 0
+        self.stats = {"memory_hits": 0, "disk_hits": 0, "misses": 0, "stores": 0, "evictions": 0, "expired": 0}
+        if path:
+            self._open_db()
+
+    def _open_db(self):
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        self._db = sqlite3.connect(self.path, check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS responses (key TEXT PRIMARY KEY, response TEXT NOT NULL, created_at REAL NOT NULL)"
+        )
+        self._db.execute("CREATE INDEX IF NOT EXISTS responses_created ON responses(created_at)")
+        self._db.commit()
+
+    def _is_expired(self, created_at: float) -> bool:
+        return bool(self.ttl_seconds) and time.time() - created_at > self.ttl_seconds
+
+    def _get_memory(self, key: str):
+        """(found, response): found is False when the disk tier still has to be checked"""
+        with self._lock:
+            hit = self._memory.get(key) or self._pending.get(key)
+            if hit is not None:
+                if not self._is_expired(hit[0]):
+                    if key in self._memory:
+                        self._memory.move_to_end(key)
+                    self.stats["memory_hits"] += 1
+                    return True, hit[1]
+                self._memory.pop(key, None)
+                self._pending.pop(key, None)  # Not worth writing to disk any more
+                self.stats["expired"] += 1
+            if self._db is None:
+                self.stats["misses"] += 1
+                return True, None
+            return False, None
+
+    def _get_disk(self, key: str):
+        with self._db_lock:
+            row = self._db.execute("SELECT response, created_at FROM responses WHERE key = ?", (key,)).fetchone()
+        with self._lock:
+            if row is not None:
+                response, created_at = row
+                if not self._is_expired(created_at):
+                    self._remember(key, created_at, response)
+                    self.stats["disk_hits"] += 1
+                    return response
+                self.stats["expired"] += 1  # Expired rows are deleted by the next prune
+            self.stats["misses"] += 1
+            return None
+
+    def get(self, key: str):
+        """Cached response for key, or None"""
+        found, response = self._get_memory(key)
+        return response if found else self._get_disk(key)
+
+    async def aget(self, key: str):
+        """get() for the event loop: memory hits return at once, disk lookups run on a thread"""
+        found, response = self._get_memory(key)
+        return response if found else await asyncio.to_thread(self._get_disk, key)
+
+    def _store(self, key: str, response: str) -> bool:
+        """Remember `response` and queue its disk write; True once a batch is due"""
+        with self._lock:
+            created_at = time.time()
+            self._remember(key, created_at, response)
+            self.stats["stores"] += 1
+            if self._db is None:
+                return False
+            self._pending[key] = (created_at, response)
+            return len(self._pending) >= self.flush_every
+
+    def set(self, key: str, response: str):
+        if self._store(key, response):
+            self.flush()
+
+    async def aset(self, key: str, response: str):
+        """set() for the event loop: the batched disk write runs on a thread"""
+        if self._store(key, response):
+            await asyncio.to_thread(self.flush)
+
+    def flush(self):
+        """Write pending entries to disk in one transaction"""
+        with self._lock:
+            pending, self._pending = self._pending, {}
+        if not pending:
+            return
+        with self._db_lock:
+            if self._db is None:
+                return
+            self._db.executemany(
+                "INSERT OR REPLACE INTO responses (key, response, created_at) VALUES (?, ?, ?)",
+                [(key, response, created_at) for key, (created_at, response) in pending.items()]
+            )
+            self._db.commit()
+            self._writes_since_prune += len(pending)
+            if self._writes_since_prune >= 100:
+                self._prune_disk()
+
+    def _remember(self, key: str, created_at: float, response: str):
+        self._memory[key] = (created_at, response)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.memory_entries:
+            self._memory.popitem(last=False)
+            self.stats["evictions"] += 1
+
+    def _prune_disk(self):
+        """Drop expired rows and the oldest rows beyond max_disk_entries"""
+        self._writes_since_prune = 0
+        if self.ttl_seconds:
+            self._db.execute("DELETE FROM responses WHERE created_at < ?", (time.time() - self.ttl_seconds,))
+        self._db.execute(
+            "DELETE FROM responses WHERE key IN (SELECT key FROM responses ORDER BY created_at DESC LIMIT -1 OFFSET ?)",
+            (self.max_disk_entries,)
+        )
+        self._db.commit()
+
+    def clear(self):
+        with self._lock:
+            self._memory.clear()
+            self._pending.clear()
+        with self._db_lock:
+            if self._db is not None:
+                self._db.execute("DELETE FROM responses")
+                self._db.commit()
+
+    def summary(self) -> dict:
+        with self._db_lock:
+            disk_entries = 0
+            if self._db is not None:
+                disk_entries = self._db.execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+        with self._lock:
+            return {**self.stats, "memory_entries": len(self._memory), "disk_entries": disk_entries,
+                    "pending_writes": len(self._pending)}
+
+    def close(self):
+        self.flush()
+        with self._db_lock:
+            if self._db is not None:
+                self._db.close()
+                self._db = None
@@ -0,0 +1,203 @@
+"""
+PolicySwarm Mock LLM Provider
+Offline stand-in for benchmarking the orchestration engine: recognises each
+prompt type by the JSON fields it asks for and returns a schema-valid reply
+after a synthetic, seeded latency. No network or GPU needed.
+"""
+import asyncio
+import hashlib
+import json
+import random
+import re
+import time
+from collections import OrderedDict
+
+MOCK_CONCERNS = [
+    "rising cost of living", "job security", "implementation delays", "corruption risk",
+    "access for rural areas", "pension protection", "digital exclusion", "tax burden"
+]
+MOCK_RISKS = ["funding shortfall", "legal challenge", "public backlash", "weak enforcement"]
+MOCK_PHRASES = [
+    "I'm not sure this helps people like me.", "Honestly, this could work if done right.",
+    "We have heard these promises before.", "The details matter more than the headline.",
+    "My family would feel this directly.", "Who is going to pay for all of this?"
+]
+
+BATCH_NAMES_PATTERN = re.compile(r"Reply for exactly these names: (\[.*?\])")
+
+def detect_prompt_type(prompt: str) -> str:
+    """Identify the agent prompt by the JSON keys it requests"""
+    markers = [
+        ('"reactions"', "citizen_reaction_batch"),
+        ('"should_exit"', "conversation_reply"),
+        ('"main_points"', "debate_summary"),
+        ('"satisfaction_score"', "citizen_reaction"),
+        ('"final_message"', "verdict"),
+        ('"agrees_with"', "senate_reply"),
+        ('"key_risk"', "senate_analysis"),
+        ('"top_3_concerns"', "architect_citizens"),
+        ('"consensus_areas"', "architect_senate"),
+        ('"impossible_to_reconcile"', "architect_conflicts"),
+        ('"revised_policy"', "architect_revision"),
+        ('"removed"', "architect_diff"),
+    ]
+    for marker, prompt_type in markers:
+        if marker in prompt:
+            return prompt_type
+    return "generic"
+
+MAX_TRACKED_PROMPTS = 10000  # Repeat counts kept for this many distinct prompts (least recently used dropped)
+
+class MockLLM:
+    def __init__(self, seed: int = 42, latency: dict = None, score_range=(30, 90), exit_probability: float = 0.03,
+                 max_tracked_prompts: int = MAX_TRACKED_PROMPTS):
+        self.seed = seed
+        self.latency = latency or {"distribution": "fixed", "mean_ms": 0}
+        self.score_range = tuple(score_range)
+        self.exit_probability = exit_probability
+        self.max_tracked_prompts = max_tracked_prompts
+        self._prompt_counts: "OrderedDict[str, int]" = OrderedDict()
+        self.calls = 0
+
+    @classmethod
+    def from_config(cls, mock_config: dict) -> "MockLLM":
+        return cls(
+            seed=mock_config.get("seed", 42),
+            latency=mock_config.get("latency"),
+            score_range=mock_config.get("score_range", (30, 90)),
+            exit_probability=mock_config.get("exit_probability", 0.03),
+            max_tracked_prompts=mock_config.get("max_tracked_prompts", MAX_TRACKED_PROMPTS)
+        )
+
+    def _rng_for(self, prompt: str) -> random.Random:
+        # Seeded per (prompt, repeat count) so replies don't depend on call interleaving
+        digest = hashlib.sha256(prompt.encode("utf-8")).hexdigest()[:16]
+        count = self._prompt_counts.get(digest, 0)
+        self._prompt_counts[digest] = count + 1
+        self._prompt_counts.move_to_end(digest)
+        if len(self._prompt_counts) > self.max_tracked_prompts:
+            self._prompt_counts.popitem(last=False)  # A prompt seen again after this starts its count over
+        return random.Random(f"{self.seed}:{digest}:{count}")
+
+    def sample_latency(self, rng: random.Random) -> float:
+        """Synthetic latency in seconds"""
+        dist = self.latency.get("distribution", "fixed")
+        mean = self.latency.get("mean_ms", 0) / 1000
+        if dist == "uniform":
+            low = self.latency.get("min_ms", 0) / 1000
+            high = self.latency.get("max_ms", self.latency.get("mean_ms", 0) * 2) / 1000
+            return rng.uniform(low, high)
+        if dist == "normal":
+            return max(0.0, rng.gauss(mean, self.latency.get("stddev_ms", 0) / 1000))
+        if dist == "lognormal":
+            # sigma controls the tail; scale so the median equals mean_ms
+            if mean <= 0:
+                return 0.0
+            return mean * rng.lognormvariate(0, self.latency.get("sigma", 0.5))
+        return mean
+
+    def _score(self, rng: random.Random) -> int:
+        return rng.randint(*self.score_range)
+
+    def build_response(self, prompt_type: str, rng: random.Random, prompt: str = "") -> dict:
+        if prompt_type == "citizen_reaction_batch":
+            match = BATCH_NAMES_PATTERN.search(prompt)
+            names = json.loads(match.group(1)) if match else []
+            return {"reactions": [
+                {"name": name, **self.build_response("citizen_reaction", rng)} for name in names
+            ]}
+        if prompt_type == "citizen_reaction":
+            return {
+                "satisfaction_score": self._score(rng),
+                "message": rng.choice(MOCK_PHRASES),
+                "key_concern": rng.choice(MOCK_CONCERNS),
+                "emotional_reaction": rng.choice(["angry", "frustrated", "neutral", "hopeful", "excited"])
+            }
+        if prompt_type == "conversation_reply":
+            should_exit = rng.random() < self.exit_probability
+            return {
+                "message": rng.choice(MOCK_PHRASES),
+                "should_exit": should_exit,
+                "exit_reason": "Need to get back to work" if should_exit else "",
+                "references_other": "",
+                "introduces_new_point": rng.random() < 0.3
+            }
+        if prompt_type == "debate_summary":
+            concerns = rng.sample(MOCK_CONCERNS, 2)
+            return {
+                "summary": f"Citizens keep returning to {concerns[0]} and {concerns[1]}; opinion is split.",
+                "main_points": concerns
+            }
+        if prompt_type == "senate_analysis":
+            return {
+                "viability_score": self._score(rng),
+                "message": f"The main issue is {rng.choice(MOCK_RISKS)}.",
+                "key_risk": rng.choice(MOCK_RISKS),
+                "recommendation": rng.choice(["approve", "modify", "reject"])
+            }
+        if prompt_type == "senate_reply":
+            return {
+                "message": f"Operationally speaking, {rng.choice(MOCK_RISKS)} worries me.",
+                "agrees_with": "",
+                "disagrees_with": "",
+                "new_insight": rng.choice(MOCK_CONCERNS)
+            }
+        if prompt_type == "verdict":
+            return {
+                "viability_score": self._score(rng),
+                "final_message": "Viable with safeguards.",
+                "recommendation": rng.choice(["approve", "modify"]),
+                "condition": f"Only if {rng.choice(MOCK_CONCERNS)} is addressed"
+            }
+        if prompt_type == "architect_citizens":
+            return {
+                "top_3_concerns": rng.sample(MOCK_CONCERNS, 3),
+                "emotional_temperature": rng.choice(["angry", "frustrated", "mixed", "hopeful"]),
+                "key_affected_groups": ["low-income families", "small businesses"],
+                "suggested_fixes": ["phase the rollout", "add a grievance mechanism"]
+            }
+        if prompt_type == "architect_senate":
+            return {
+                "consensus_areas": ["need for safeguards"],
+                "disagreement_areas": ["funding model"],
+                "implementation_risks": rng.sample(MOCK_RISKS, 2),
+                "political_feasibility": rng.choice(["high", "medium", "low"])
+            }
+        if prompt_type == "architect_conflicts":
+            return {
+                "conflicts": [{"citizen_want": "lower costs", "government_concern": "budget", "resolution_approach": "phased subsidy"}],
+                "aligned_areas": ["transparency"],
+                "impossible_to_reconcile": []
+            }
+        if prompt_type == "architect_revision":
+            return {
+                "revised_policy": "Revised policy: phased rollout with targeted subsidies, a 30-day grievance process and annual public review.",
+                "changes_summary": ["Added phased rollout", "Added grievance mechanism", "Added annual review"],
+                "expected_citizen_improvement": f"+{rng.randint(3, 15)}%",
+                "expected_senate_improvement": f"+{rng.randint(3, 15)}%"
+            }
+        if prompt_type == "architect_diff":
+            return {
+                "removed": ["Immediate nationwide rollout"],
+                "added": ["Phased rollout", "Grievance mechanism"],
+                "modified": ["Flat fee -> income-linked fee"],
+                "summary": "Rollout phased and safeguards added."
+            }
+        return {"message": rng.choice(MOCK_PHRASES), "score": self._score(rng)}
+
+    def _prepare(self, prompt: str):
+        self.calls += 1
+        rng = self._rng_for(prompt)
+        return json.dumps(self.build_response(detect_prompt_type(prompt), rng, prompt)), self.sample_latency(rng)
+
+    def generate(self, prompt: str) -> str:
+        response, delay = self._prepare(prompt)
+        if delay:
+            time.sleep(delay)
+        return response
+
+    async def agenerate(self, prompt: str) -> str:
+        response, delay = self._prepare(prompt)
+        if delay:
+            await asyncio.sleep(delay)
+        return response
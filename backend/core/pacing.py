@@ -0,0 +1,54 @@
+"""
+PolicySwarm Presentation Pacing
+The simulation engine runs at full speed; human-paced playback is produced
+here by replaying a session's recorded event log with per-event delays.
+"""
+import asyncio
+import json
+
+# Seconds to hold each kind of event (the old in-engine sleeps)
+DEFAULT_PACING = {
+    "reaction": 0.1,   # Initial citizen reactions
+    "citizen": 0.3,    # Citizen conversation messages
+    "senate": 0.4,     # Senate discussion and verdicts
+    "architect": 0.2,  # Architect analysis steps
+    "system": 0.0      # Phase banners and status lines
+}
+
+def event_kind(entry: dict) -> str:
+    """Map a log entry to a pacing bucket"""
+    log_type = entry.get("type", "general")
+    if log_type in ("senate", "architect"):
+        return log_type
+    if entry.get("role") == "System" or entry.get("agent") == "System":
+        return "system"
+    # Initial reactions are tagged with an emotional state, e.g. "[ANGRY] ..."
+    if entry.get("message", "").startswith("[") and "(Score:" in entry.get("message", ""):
+        return "reaction"
+    return "citizen"
+
+def event_delay(entry: dict, pacing: dict = None, speed: float = 1.0) -> float:
+    pacing = {**DEFAULT_PACING, **(pacing or {})}
+    if speed <= 0:
+        return 0.0
+    return pacing.get(event_kind(entry), 0.0) / speed
+
+async def paced_events(events, pacing: dict = None, speed: float = 1.0, start: int = 0):
+    """Yield recorded events one by one at human pace.
+
+    Reads the live EventLog by seq, so a replay started mid-run keeps up with
+    new events until it reaches the end of what has been recorded.
+    """
+    cursor = start
+    while cursor < events.next_seq:
+        for entry in events.since(cursor, limit=100):
+            yield entry
+            cursor = entry["seq"] + 1
+            delay = event_delay(entry, pacing, speed)
+            if delay:
+                await asyncio.sleep(delay)
+
+async def ndjson_replay(events, pacing: dict = None, speed: float = 1.0, start: int = 0):
+    """Newline-delimited JSON stream of a paced replay"""
+    async for entry in paced_events(events, pacing, speed, start):
+        yield json.dumps(entry) + "\n"
@@ -17,6 +17,99 @@ from datetime import datetime
 # A4: 21.2cm x 29.7cm, Matter: 17cm x 24cm
 # Margins: Top/Bottom 3cm, Left/Right 2cm
 
+# ============ STYLES ============
+# Built once per process: getSampleStyleSheet() and the custom styles are the
+# same for every report, so rendering only lays out the story
+def _build_styles() -> dict:
+    styles = getSampleStyleSheet()
+    
+    # Custom styles matching government documents
+    govt_header = ParagraphStyle(
+        'GovtHeader',
+        parent=styles['Heading1'],
+        fontName='Times-Bold',
+        fontSize=14,
+        alignment=TA_CENTER,
+        spaceAfter=6,
+        textColor=HexColor('#1a365d')
+    )
+    
+    return {
+        "govt_header": govt_header,
+        "sub_header": ParagraphStyle('SubHeader', parent=govt_header, fontSize=10),
+        "gazette_title": ParagraphStyle(
+            'GazetteTitle',
+            parent=styles['Heading1'],
+            fontName='Times-Bold',
+            fontSize=12,
+            alignment=TA_CENTER,
+            spaceAfter=12,
+            spaceBefore=6
+        ),
+        "section_header": ParagraphStyle(
+            'SectionHeader',
+            parent=styles['Heading2'],
+            fontName='Times-Bold',
+            fontSize=11,
+            alignment=TA_LEFT,
+            spaceAfter=6,
+            spaceBefore=12,
+            textColor=HexColor('#2c5282')
+        ),
+        "subsection": ParagraphStyle(
+            'Subsection',
+            parent=styles['Heading3'],
+            fontName='Times-Bold',
+            fontSize=10,
+            alignment=TA_LEFT,
+            spaceAfter=4,
+            spaceBefore=8
+        ),
+        "body_text": ParagraphStyle(
+            'BodyText',
+            parent=styles['Normal'],
+            fontName='Times-Roman',
+            fontSize=10,
+            alignment=TA_JUSTIFY,
+            spaceAfter=6,
+            leading=14
+        ),
+        "quote_text": ParagraphStyle(
+            'QuoteText',
+            parent=styles['Normal'],
+            fontName='Times-Italic',
+            fontSize=9,
+            alignment=TA_LEFT,
+            leftIndent=20,
+            rightIndent=20,
+            spaceAfter=6,
+            textColor=HexColor('#4a5568')
+        ),
+        "footer_text": ParagraphStyle(
+            'FooterText',
+            parent=styles['Normal'],
+            fontName='Times-Roman',
+            fontSize=8,
+            alignment=TA_CENTER,
+            textColor=grey
+        )
+    }
+
+STYLES = _build_styles()
+
+STATUS_TABLE_STYLE = TableStyle([
+    ('BACKGROUND', (0, 0), (-1, 0), HexColor('#2c5282')),
+    ('TEXTCOLOR', (0, 0), (-1, 0), colors.white),
+    ('FONTNAME', (0, 0), (-1, 0), 'Times-Bold'),
+    ('FONTSIZE', (0, 0), (-1, -1), 9),
+    ('ALIGN', (1, 0), (-1, -1), 'CENTER'),
+    ('GRID', (0, 0), (-1, -1), 0.5, grey),
+    ('BACKGROUND', (0, 1), (-1, -1), HexColor('#f7fafc')),
+    ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
+    ('TOPPADDING', (0, 0), (-1, -1), 6),
+    ('BOTTOMPADDING', (0, 0), (-1, -1), 6),
+])
+
 def create_policy_pdf(
     policy_title: str,
     original_policy: str,
@@ -43,89 +136,20 @@ def create_policy_pdf(
         bottomMargin=3*cm
     )
     
-    # Define styles
-    styles = getSampleStyleSheet()
-    
-    # Custom styles matching government documents
-    govt_header = ParagraphStyle(
-        'GovtHeader',
-        parent=styles['Heading1'],
-        fontName='Times-Bold',
-        fontSize=14,
-        alignment=TA_CENTER,
-        spaceAfter=6,
-        textColor=HexColor('#1a365d')
-    )
-    
-    gazette_title = ParagraphStyle(
-        'GazetteTitle',
-        parent=styles['Heading1'],
-        fontName='Times-Bold',
-        fontSize=12,
-        alignment=TA_CENTER,
-        spaceAfter=12,
-        spaceBefore=6
-    )
-    
-    section_header = ParagraphStyle(
-        'SectionHeader',
-        parent=styles['Heading2'],
-        fontName='Times-Bold',
-        fontSize=11,
-        alignment=TA_LEFT,
-        spaceAfter=6,
-        spaceBefore=12,
-        textColor=HexColor('#2c5282')
-    )
-    
-    subsection = ParagraphStyle(
-        'Subsection',
-        parent=styles['Heading3'],
-        fontName='Times-Bold',
-        fontSize=10,
-        alignment=TA_LEFT,
-        spaceAfter=4,
-        spaceBefore=8
-    )
-    
-    body_text = ParagraphStyle(
-        'BodyText',
-        parent=styles['Normal'],
-        fontName='Times-Roman',
-        fontSize=10,
-        alignment=TA_JUSTIFY,
-        spaceAfter=6,
-        leading=14
-    )
-    
-    quote_text = ParagraphStyle(
-        'QuoteText',
-        parent=styles['Normal'],
-        fontName='Times-Italic',
-        fontSize=9,
-        alignment=TA_LEFT,
-        leftIndent=20,
-        rightIndent=20,
-        spaceAfter=6,
-        textColor=HexColor('#4a5568')
-    )
-    
-    footer_text = ParagraphStyle(
-        'FooterText',
-        parent=styles['Normal'],
-        fontName='Times-Roman',
-        fontSize=8,
-        alignment=TA_CENTER,
-        textColor=grey
-    )
+    govt_header = STYLES["govt_header"]
+    gazette_title = STYLES["gazette_title"]
+    section_header = STYLES["section_header"]
+    subsection = STYLES["subsection"]
+    body_text = STYLES["body_text"]
+    quote_text = STYLES["quote_text"]
+    footer_text = STYLES["footer_text"]
     
     # Build document content
     story = []
     
     # === HEADER SECTION ===
     story.append(Paragraph("GOVERNMENT OF INDIA", govt_header))
-    story.append(Paragraph("MINISTRY OF POLICY & PROGRAMME IMPLEMENTATION", 
-                          ParagraphStyle('SubHeader', parent=govt_header, fontSize=10)))
+    story.append(Paragraph("MINISTRY OF POLICY & PROGRAMME IMPLEMENTATION", STYLES["sub_header"]))
     story.append(Spacer(1, 0.3*cm))
     
     # Horizontal line
@@ -161,18 +185,7 @@ def create_policy_pdf(
     ]
     
     status_table = Table(status_data, colWidths=[5*cm, 3*cm, 3*cm, 4*cm])
-    status_table.setStyle(TableStyle([
-        ('BACKGROUND', (0, 0), (-1, 0), HexColor('#2c5282')),
-        ('TEXTCOLOR', (0, 0), (-1, 0), colors.white),
-        ('FONTNAME', (0, 0), (-1, 0), 'Times-Bold'),
-        ('FONTSIZE', (0, 0), (-1, -1), 9),
-        ('ALIGN', (1, 0), (-1, -1), 'CENTER'),
-        ('GRID', (0, 0), (-1, -1), 0.5, grey),
-        ('BACKGROUND', (0, 1), (-1, -1), HexColor('#f7fafc')),
-        ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
-        ('TOPPADDING', (0, 0), (-1, -1), 6),
-        ('BOTTOMPADDING', (0, 0), (-1, -1), 6),
-    ]))
+    status_table.setStyle(STATUS_TABLE_STYLE)
     story.append(status_table)
     story.append(Spacer(1, 0.5*cm))
     
@@ -242,6 +255,10 @@ def create_policy_pdf(
     buffer.seek(0)
     return buffer
 
+def render_policy_pdf(inputs: dict) -> bytes:
+    """create_policy_pdf(**inputs) as bytes (picklable entry point for render workers)"""
+    return create_policy_pdf(**inputs).getvalue()
+
 
 def generate_test_pdf():
     """Generate a test PDF with sample data"""
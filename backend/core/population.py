@@ -0,0 +1,226 @@
+"""
+PolicySwarm Citizen Population
+Samples a synthetic population from demographic distributions (region,
+occupation, income, age) into compact NumPy code arrays. Only a stratified
+sample of it is voiced by LLM agents; their scores are weighted back up to
+population-level and per-segment satisfaction estimates.
+"""
+import numpy as np
+
+# Marginal distributions: label -> share of the population
+DEFAULT_DISTRIBUTIONS = {
+    "region": {
+        "North": 0.28, "South": 0.21, "East": 0.22, "West": 0.18, "Central": 0.07, "Northeast": 0.04
+    },
+    "occupation": {
+        "Farmer": 0.20, "Daily Wage Labourer": 0.14, "Homemaker": 0.12, "Small Shop Owner": 0.08,
+        "Factory Worker": 0.08, "Student": 0.08, "Retired": 0.07, "Government Employee": 0.05,
+        "Auto Driver": 0.04, "Teacher": 0.04, "IT Professional": 0.04, "Health Worker": 0.03,
+        "Business Owner": 0.03
+    },
+    "income": {
+        "Below poverty line": 0.20, "Low": 0.34, "Middle": 0.30, "Upper middle": 0.12, "High": 0.04
+    },
+    "age": {"18-25": 0.20, "26-40": 0.34, "41-60": 0.31, "60+": 0.15}
+}
+
+# Sample allocation and score weighting cells
+DEFAULT_STRATA = ("region", "income")
+
+# Occupations that pin the age band, so we don't generate retired 20-year-olds
+OCCUPATION_AGE = {"Student": "18-25", "Retired": "60+"}
+
+OCCUPATION_TRAITS = {
+    "Farmer": ["Worried about input costs", "Depends on the monsoon"],
+    "Daily Wage Labourer": ["Lives day to day", "No social security"],
+    "Homemaker": ["Manages the household budget", "Focused on children's future"],
+    "Small Shop Owner": ["Cash business", "Stressed about competition"],
+    "Factory Worker": ["Values job security", "Union member"],
+    "Student": ["Anxious about jobs", "Active on social media"],
+    "Retired": ["Depends on pension", "Healthcare is priority"],
+    "Government Employee": ["Values stability", "Knows how schemes get implemented"],
+    "Auto Driver": ["Hates sudden rule changes", "Street smart but cynical"],
+    "Teacher": ["Cares about education", "Skeptical of promises"],
+    "IT Professional": ["Pro-digital", "Frustrated by housing costs"],
+    "Health Worker": ["Overworked", "Critical of health infrastructure"],
+    "Business Owner": ["Dislikes bureaucracy", "Focused on growth"]
+}
+INCOME_TRAITS = {
+    "Below poverty line": "Relies on welfare schemes",
+    "Low": "Struggling with inflation",
+    "Middle": "Saving for the future",
+    "Upper middle": "Pays most of the taxes, feels it",
+    "High": "Worried about regulation"
+}
+FIRST_NAMES = [
+    "Aarti", "Abdul", "Anil", "Asha", "Babita", "Deepak", "Farida", "Gopal", "Harpreet", "Imran",
+    "Jyoti", "Kiran", "Lalit", "Meena", "Mohan", "Nandini", "Pooja", "Rahul", "Rekha", "Salim",
+    "Sanjay", "Savitri", "Sunita", "Suresh", "Tenzin", "Usha", "Vijay", "Yamuna", "Zoya", "Biren"
+]
+SURNAMES = [
+    "Sharma", "Khan", "Reddy", "Das", "Patel", "Singh", "Nair", "Yadav", "Iyer", "Gogoi",
+    "Mehta", "Ansari", "Kumar", "Bose", "Pillai", "Verma", "Chauhan", "Sheikh", "Rao", "Gill"
+]
+
+class Population:
+    """Array-backed population: one small integer code per attribute per person"""
+    def __init__(self, codes: dict, labels: dict):
+        self.codes = codes  # attribute -> np.ndarray of label indices
+        self.labels = labels  # attribute -> list of labels
+        self.size = len(next(iter(codes.values())))
+        self.scores = np.full(self.size, np.nan, dtype=np.float32)  # Latest score for sampled people
+        self._strata_cache = {}
+
+    @classmethod
+    def generate(cls, size: int, distributions: dict = None, seed: int = 42) -> "Population":
+        distributions = distributions or DEFAULT_DISTRIBUTIONS
+        rng = np.random.default_rng(seed)
+        codes, labels = {}, {}
+        for attribute, shares in distributions.items():
+            labels[attribute] = list(shares)
+            p = np.asarray(list(shares.values()), dtype=np.float64)
+            codes[attribute] = rng.choice(len(p), size=size, p=p / p.sum()).astype(np.uint8)
+
+        if "occupation" in codes and "age" in codes:
+            for occupation, age in OCCUPATION_AGE.items():
+                if occupation in labels["occupation"] and age in labels["age"]:
+                    mask = codes["occupation"] == labels["occupation"].index(occupation)
+                    codes["age"][mask] = labels["age"].index(age)
+        return cls(codes, labels)
+
+    def stratum_ids(self, strata) -> np.ndarray:
+        """One combined integer id per person for the given attributes"""
+        ids = np.zeros(self.size, dtype=np.int64)
+        for attribute in strata:
+            ids = ids * len(self.labels[attribute]) + self.codes[attribute]
+        return ids
+
+    def _strata(self, strata):
+        """(stratum of each person, size of each stratum), computed once per strata"""
+        key = tuple(strata or DEFAULT_STRATA)
+        if key not in self._strata_cache:
+            _, inverse, counts = np.unique(self.stratum_ids(key), return_inverse=True, return_counts=True)
+            self._strata_cache[key] = (inverse, counts)
+        return self._strata_cache[key]
+
+    def stratified_sample(self, n: int, strata=None, seed: int = 42) -> np.ndarray:
+        """Indices of `n` people, allocated to strata in proportion to their size"""
+        n = min(n, self.size)
+        rng = np.random.default_rng(seed)
+        inverse, counts = self._strata(strata)
+
+        # Largest-remainder proportional allocation
+        quotas = counts / self.size * n
+        allocation = np.floor(quotas).astype(np.int64)
+        remaining = n - allocation.sum()
+        if remaining:
+            allocation[np.argsort(quotas - allocation)[::-1][:remaining]] += 1
+
+        order = np.argsort(inverse, kind="stable")
+        starts = np.concatenate(([0], np.cumsum(counts)[:-1]))
+        chosen = [
+            rng.choice(order[start:start + count], size=take, replace=False)
+            for start, count, take in zip(starts, counts, allocation) if take
+        ]
+        return np.sort(np.concatenate(chosen)) if chosen else np.empty(0, dtype=np.int64)
+
+    def describe(self, index: int) -> dict:
+        return {attribute: self.labels[attribute][self.codes[attribute][index]] for attribute in self.codes}
+
+    def personas_for(self, indices) -> list[dict]:
+        """CitizenPersona fields for sampled people (names are unique within the sample)"""
+        personas, used = [], set()
+        for index in indices:
+            index = int(index)
+            person = self.describe(index)
+            name = f"{FIRST_NAMES[index % len(FIRST_NAMES)]} {SURNAMES[(index // len(FIRST_NAMES)) % len(SURNAMES)]}"
+            if name in used:
+                name = f"{name} ({index})"
+            used.add(name)
+            occupation = person.get("occupation", "Citizen")
+            income = person.get("income", "")
+            traits = list(OCCUPATION_TRAITS.get(occupation, []))
+            if income in INCOME_TRAITS:
+                traits.append(INCOME_TRAITS[income])
+            personas.append({
+                "name": name,
+                "role": occupation,
+                "background": (
+                    f"Age {person.get('age', 'unknown')}, {occupation.lower()} from {person.get('region', 'India')} India. "
+                    f"{income} income household."
+                ),
+                "traits": traits or ["Ordinary citizen"]
+            })
+        return personas
+
+    def record_scores(self, indices, scores):
+        """Store the latest satisfaction scores (None = no valid reply)"""
+        values = np.array([np.nan if s is None else s for s in scores], dtype=np.float32)
+        self.scores[np.asarray(indices, dtype=np.int64)] = values
+
+    def _design_weights(self, indices: np.ndarray, strata):
+        """(indices with a score, weight = stratum size / scored sample in stratum)"""
+        indices = np.asarray(indices, dtype=np.int64)
+        indices = indices[~np.isnan(self.scores[indices])]
+        inverse, population_counts = self._strata(strata)
+        sample_counts = np.bincount(inverse[indices], minlength=len(population_counts))
+        weights = population_counts[inverse[indices]] / sample_counts[inverse[indices]]
+        return indices, weights, inverse, population_counts, sample_counts
+
+    def estimate(self, indices, strata=None) -> dict:
+        """Stratified mean satisfaction with standard error and population coverage"""
+        scored, weights, inverse, population_counts, sample_counts = self._design_weights(indices, strata)
+        if len(scored) == 0:
+            return {"mean": None, "stderr": None, "scored": 0, "population": self.size, "coverage": 0.0}
+
+        scores = self.scores[scored].astype(np.float64)
+        mean = float(np.sum(weights * scores) / np.sum(weights))
+
+        # Var = sum_h W_h^2 s_h^2 / n_h over covered strata (W renormalised to them);
+        # strata with one voiced person add no variance, so tiny samples understate it
+        stratum = inverse[scored]
+        sums = np.bincount(stratum, weights=scores, minlength=len(population_counts))
+        squares = np.bincount(stratum, weights=scores ** 2, minlength=len(population_counts))
+        covered = sample_counts > 0
+        n_h = sample_counts[covered]
+        means = sums[covered] / n_h
+        variances = np.where(n_h > 1, (squares[covered] - n_h * means ** 2) / np.maximum(n_h - 1, 1), 0.0)
+        shares = population_counts[covered] / population_counts[covered].sum()
+        stderr = float(np.sqrt(np.sum(shares ** 2 * np.maximum(variances, 0.0) / n_h)))
+
+        return {
+            "mean": round(mean, 2),
+            "stderr": round(stderr, 2),
+            "scored": int(len(scored)),
+            "population": self.size,
+            "coverage": round(float(population_counts[covered].sum() / self.size), 4)
+        }
+
+    def segment_scores(self, attribute: str, indices, strata=None) -> list[dict]:
+        """Weighted mean satisfaction per label of one attribute"""
+        scored, weights, *_ = self._design_weights(indices, strata)
+        labels = self.labels[attribute]
+        segment = self.codes[attribute][scored]
+        scores = self.scores[scored].astype(np.float64)
+        weight_sums = np.bincount(segment, weights=weights, minlength=len(labels))
+        score_sums = np.bincount(segment, weights=weights * scores, minlength=len(labels))
+        sampled = np.bincount(segment, minlength=len(labels))
+        population_share = np.bincount(self.codes[attribute], minlength=len(labels)) / self.size
+        return [
+            {
+                "segment": label,
+                "population_share": round(float(population_share[i]), 4),
+                "sampled": int(sampled[i]),
+                "mean": round(float(score_sums[i] / weight_sums[i]), 2) if weight_sums[i] else None
+            }
+            for i, label in enumerate(labels)
+        ]
+
+    def summary(self, indices, strata=None) -> dict:
+        return {
+            "size": self.size,
+            "sampled": int(len(indices)),
+            "strata": list(strata or DEFAULT_STRATA),
+            "estimate": self.estimate(indices, strata),
+            "segments": {attribute: self.segment_scores(attribute, indices, strata) for attribute in self.labels}
+        }
@@ -0,0 +1,158 @@
+"""
+PolicySwarm Prompt Assembly
+Keeps each agent prompt inside a token budget per prompt type and section
+(policy text, recent messages, feedback lists...), so prompt size stays flat
+however long the policy or the debate gets.
+
+- Lengths are counted with tiktoken when it's installed, otherwise with a
+  word-piece estimate (~4 characters per token)
+- Policies and summaries are cut to their budget; message lists keep as many
+  whole lines as fit, newest or oldest first
+- A RollingSummary condenses the older part of the citizen debate every few
+  exchanges, in the background, so replies see it all at a fixed cost
+Budgets can be overridden per prompt type in config.json "prompt_budgets".
+"""
+import asyncio
+import re
+from core import llm
+
+# Tokens per section, by prompt type (core.schemas names)
+DEFAULT_BUDGETS = {
+    "citizen_reaction": {"policy": 1500},
+    "citizen_reaction_batch": {"policy": 1500},
+    "conversation_reply": {"policy": 120, "summary": 250, "recent": 300},
+    "debate_summary": {"summary": 250, "messages": 1200},
+    "senate_analysis": {"policy": 250, "feedback": 900},
+    "senate_reply": {"policy": 200, "conversation": 300, "recent": 300},
+    "verdict": {"policy": 200, "recent": 350},
+    "architect_citizens": {"feedback": 900},
+    "architect_senate": {"reports": 900},
+    "architect_revision": {"policy": 2000},
+    "architect_diff": {"policy": 500},
+}
+
+TRUNCATION_MARKER = " …[truncated]"
+WORD_PIECE = re.compile(r"\w{1,4}|[^\w\s]")
+
+_encoding = None
+_encoding_checked = False
+
+def _get_encoding():
+    """tiktoken's cl100k encoding if available (optional dependency)"""
+    global _encoding, _encoding_checked
+    if not _encoding_checked:
+        _encoding_checked = True
+        try:
+            import tiktoken
+            _encoding = tiktoken.get_encoding("cl100k_base")
+        except Exception:
+            _encoding = None
+    return _encoding
+
+def count_tokens(text: str) -> int:
+    encoding = _get_encoding()
+    if encoding is not None:
+        return len(encoding.encode(text, disallowed_special=()))
+    return len(WORD_PIECE.findall(text))
+
+def budget(prompt_type: str, section: str) -> int:
+    overrides = llm.config.get("prompt_budgets", {}).get(prompt_type, {})
+    return overrides.get(section, DEFAULT_BUDGETS.get(prompt_type, {}).get(section, 500))
+
+def truncate(text: str, max_tokens: int) -> str:
+    """text cut to at most max_tokens (plus a marker when anything was dropped)"""
+    encoding = _get_encoding()
+    if encoding is not None:
+        tokens = encoding.encode(text, disallowed_special=())
+        if len(tokens) <= max_tokens:
+            return text
+        return encoding.decode(tokens[:max_tokens]).rstrip() + TRUNCATION_MARKER
+    end = None
+    for count, piece in enumerate(WORD_PIECE.finditer(text), 1):
+        if count > max_tokens:
+            return text[:end].rstrip() + TRUNCATION_MARKER
+        end = piece.end()
+    return text
+
+def fit(text: str, prompt_type: str, section: str) -> str:
+    return truncate(text, budget(prompt_type, section))
+
+def fit_lines(lines: list[str], prompt_type: str, section: str, newest: bool = False) -> str:
+    """Whole lines that fit the budget: the first ones, or the last ones with newest=True (kept in order)"""
+    remaining = budget(prompt_type, section)
+    kept = []
+    for line in (reversed(lines) if newest else lines):
+        cost = count_tokens(line) + 1
+        if cost > remaining:
+            if not kept:  # Always show something, even if one line is over budget
+                kept.append(truncate(line, remaining))
+            break
+        kept.append(line)
+        remaining -= cost
+    return "\n".join(reversed(kept) if newest else kept)
+
+# ============ ROLLING SUMMARY ============
+SUMMARY_SYSTEM_PROMPT = """
+You keep running minutes of a public debate about a government policy.
+Be neutral and specific: who holds which position, and what concerns keep coming up.
+Always reply with a single JSON object in the format you are asked for.
+"""
+
+class RollingSummary:
+    """Summary of a conversation's older messages, refreshed every `every` new ones.
+
+    Refreshes run as background tasks, so the debate never waits on them;
+    prompts use the latest finished summary plus the messages after it.
+    """
+    def __init__(self, every: int = 10):
+        self.every = every
+        self.text = ""
+        self.covered = 0  # Messages already folded into text
+        self.updates = 0
+        self._task = None
+
+    def update(self, messages: list[dict]):
+        """Start a refresh when enough messages have arrived since the last one"""
+        if self.every <= 0 or (self._task is not None and not self._task.done()):
+            return
+        if len(messages) - self.covered < self.every:
+            return
+        end = len(messages)
+        self._task = asyncio.create_task(self._refresh(messages[self.covered:end], end))
+
+    async def _refresh(self, new_messages: list[dict], end: int):
+        lines = [f"{m['agent']}: {m['message']}" for m in new_messages]
+        prompt = f"""
+        Minutes so far:
+        {self.text or "(none yet)"}
+
+        New messages:
+        {fit_lines(lines, "debate_summary", "messages", newest=True)}
+
+        Update the minutes to cover the new messages (under 120 words). Keep earlier
+        points that still matter; drop repetition.
+
+        Return JSON:
+        {{
+            "summary": "Updated minutes",
+            "main_points": ["point 1", "point 2"]
+        }}
+        """
+        try:
+            response = await llm.aget_json_response(prompt, system=SUMMARY_SYSTEM_PROMPT, schema="debate_summary", agent="Debate minutes")
+        except Exception as e:
+            print(f"Debate summary update failed: {e}")
+            return
+        if response.get("parse_failed"):
+            return
+        self.text = fit(response["summary"], "debate_summary", "summary")
+        self.covered = end
+        self.updates += 1
+
+    def context(self, messages: list[dict]) -> tuple[str, list[dict]]:
+        """(summary text, messages it doesn't cover yet)"""
+        return self.text, messages[self.covered:]
+
+    def close(self):
+        if self._task is not None and not self._task.done():
+            self._task.cancel()
@@ -0,0 +1,114 @@
+"""
+PolicySwarm Report Cache
+Rendered PDF reports keyed by a hash of their inputs. Rendering runs on a
+background executor (a worker process by default) so the API event loop never
+lays out a document; a finished run's report is pre-rendered, and identical
+downloads share one render. The key doubles as the HTTP ETag.
+"""
+import asyncio
+import hashlib
+import json
+import multiprocessing
+import threading
+from collections import OrderedDict
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor
+from core.pdf_generator import render_policy_pdf
+
+def report_key(inputs: dict) -> str:
+    payload = json.dumps(inputs, sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+class ReportCache:
+    def __init__(self, max_entries: int = 32, render_processes: int = 1):
+        self.max_entries = max_entries
+        self.render_processes = render_processes  # 0 renders on a thread in this process
+        self._entries: "OrderedDict[str, bytes]" = OrderedDict()
+        self._pending: dict[str, Future] = {}  # key -> render in progress
+        self._lock = threading.Lock()
+        self._executor = None
+        self.stats = {"hits": 0, "misses": 0, "joined": 0, "renders": 0, "prerenders": 0, "failures": 0}
+
+    def _get_executor(self):
+        # Created on first use so importing the API doesn't start a process
+        if self._executor is None:
+            if self.render_processes > 0:
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.render_processes, mp_context=multiprocessing.get_context("spawn")
+                )
+            else:
+                self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="pdf-render")
+        return self._executor
+
+    def get(self, key: str):
+        with self._lock:
+            pdf = self._entries.get(key)
+            if pdf is not None:
+                self._entries.move_to_end(key)
+            return pdf
+
+    def submit(self, key: str, inputs: dict) -> Future:
+        """Future for the PDF bytes: cached, already rendering, or newly queued"""
+        with self._lock:
+            pdf = self._entries.get(key)
+            if pdf is not None:
+                self._entries.move_to_end(key)
+                self.stats["hits"] += 1
+                done = Future()
+                done.set_result(pdf)
+                return done
+            if key in self._pending:
+                self.stats["joined"] += 1
+                return self._pending[key]
+            self.stats["misses"] += 1
+            future = self._get_executor().submit(render_policy_pdf, inputs)
+            self._pending[key] = future
+        future.add_done_callback(lambda f: self._store(key, f))
+        return future
+
+    def _store(self, key: str, future: Future):
+        with self._lock:
+            self._pending.pop(key, None)
+            if future.cancelled() or future.exception() is not None:
+                self.stats["failures"] += 1
+                return
+            self.stats["renders"] += 1
+            self._entries[key] = future.result()
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def prerender(self, inputs: dict) -> str:
+        """Start rendering in the background (no-op if cached); returns the key"""
+        key = report_key(inputs)
+        with self._lock:
+            queued = key in self._entries or key in self._pending
+        if not queued:
+            self.stats["prerenders"] += 1
+            future = self.submit(key, inputs)
+            future.add_done_callback(self._log_failure)
+        return key
+
+    @staticmethod
+    def _log_failure(future: Future):
+        if not future.cancelled() and future.exception() is not None:
+            print(f"Report pre-render failed: {future.exception()}")
+
+    async def render(self, inputs: dict) -> tuple[str, bytes]:
+        """(key, PDF bytes), waiting on the background render if needed"""
+        key = report_key(inputs)
+        pdf = await asyncio.wrap_future(self.submit(key, inputs))
+        return key, pdf
+
+    def summary(self) -> dict:
+        with self._lock:
+            return {
+                **self.stats,
+                "entries": len(self._entries),
+                "bytes": sum(len(pdf) for pdf in self._entries.values()),
+                "rendering": len(self._pending)
+            }
+
+    def shutdown(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
@@ -0,0 +1,348 @@
+"""
+PolicySwarm Provider Resilience
+Keeps one slow or failing model call from stalling a debate or leaking error
+text into the scores:
+
+- Deadlines per prompt type (a reply that isn't back in time is abandoned)
+- Retries with full-jitter exponential backoff, for transient errors only
+  (timeouts, connection failures, HTTP 429 and 5xx)
+- A circuit breaker per endpoint: after repeated failures calls fail fast
+  until a probe succeeds
+- Optional hedging: when a call is slower than the recent p95 (streams: no
+  first chunk by then) and a concurrency slot is free, a duplicate is sent and
+  the first answer wins
+
+Settings come from config.json "resilience"; see DEFAULT_SETTINGS.
+"""
+import asyncio
+import random
+import time
+from collections import deque
+import httpx
+from core import telemetry
+
+DEFAULT_DEADLINES = {
+    "default": 60,
+    "citizen_reaction": 45,
+    "citizen_reaction_batch": 90,
+    "conversation_reply": 30,
+    "debate_summary": 30,
+    "senate_analysis": 60,
+    "senate_reply": 45,
+    "verdict": 45,
+    "architect_revision": 180,
+}
+
+DEFAULT_SETTINGS = {
+    "deadlines": {},  # Seconds per prompt type, over DEFAULT_DEADLINES
+    "max_retries": 2,
+    "backoff_base": 0.5,  # Seconds; attempt n waits up to base * 2^n
+    "backoff_max": 8.0,
+    "breaker_failures": 5,  # Consecutive transient failures that open the circuit
+    "breaker_reset": 30.0,  # Seconds before an open circuit lets a probe through
+    "hedge": {"enabled": False, "percentile": 0.95, "min_delay": 1.0, "min_samples": 20}
+}
+
+class ProviderError(Exception):
+    """A failed provider call; `transient` failures are worth retrying"""
+    def __init__(self, message: str, transient: bool = False):
+        super().__init__(message)
+        self.transient = transient
+
+class DeadlineExceeded(ProviderError):
+    def __init__(self, seconds: float):
+        super().__init__(f"no reply within {seconds:g}s", transient=True)
+
+class CircuitOpenError(ProviderError):
+    def __init__(self, endpoint: str, retry_in: float):
+        super().__init__(f"{endpoint} is failing; circuit open for another {retry_in:.0f}s")
+
+def is_transient(error: Exception) -> bool:
+    if isinstance(error, ProviderError):
+        return error.transient
+    if isinstance(error, httpx.HTTPStatusError):
+        return error.response.status_code == 429 or error.response.status_code >= 500
+    return isinstance(error, (httpx.TransportError, asyncio.TimeoutError, ConnectionError))
+
+def backoff_delay(attempt: int, base: float, cap: float) -> float:
+    """Full jitter: uniform between 0 and the capped exponential step"""
+    return random.uniform(0, min(cap, base * 2 ** attempt))
+
+class CircuitBreaker:
+    """closed -> (breaker_failures in a row) -> open -> (breaker_reset) -> half-open probe -> closed or open"""
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 30.0):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = "closed"
+        self.failures = 0
+        self.opened_at = 0.0
+        self.times_opened = 0
+        self._probing = False
+
+    def allow(self) -> bool:
+        if self.state == "closed":
+            return True
+        if self.state == "open" and time.monotonic() - self.opened_at >= self.reset_timeout:
+            self.state = "half_open"
+            self._probing = False
+        if self.state == "half_open" and not self._probing:
+            self._probing = True  # One call at a time finds out if the endpoint is back
+            return True
+        return False
+
+    def retry_in(self) -> float:
+        return max(0.0, self.reset_timeout - (time.monotonic() - self.opened_at))
+
+    def release(self):
+        """The probe ended without telling us anything (cancelled, or a non-HTTP error)"""
+        self._probing = False
+
+    def record_success(self):
+        self.state, self.failures, self._probing = "closed", 0, False
+
+    def record_failure(self):
+        self.failures += 1
+        self._probing = False
+        if self.state == "half_open" or self.failures >= self.failure_threshold:
+            if self.state != "open":
+                self.times_opened += 1
+            self.state, self.opened_at = "open", time.monotonic()
+
+    def summary(self) -> dict:
+        return {"state": self.state, "consecutive_failures": self.failures, "times_opened": self.times_opened,
+                "retry_in": round(self.retry_in(), 1) if self.state == "open" else 0.0}
+
+class LatencyTracker:
+    """Recent successful latencies of one kind of call"""
+    def __init__(self, size: int = 200):
+        self.samples = deque(maxlen=size)
+
+    def add(self, seconds: float):
+        self.samples.append(seconds)
+
+    def percentile(self, q: float):
+        if not self.samples:
+            return None
+        ordered = sorted(self.samples)
+        return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+BREAKER_STATES = {"closed": 0, "half_open": 1, "open": 2}
+
+class Resilience:
+    def __init__(self, settings: dict = None):
+        settings = settings or {}
+        self.settings = {**DEFAULT_SETTINGS, **settings, "hedge": {**DEFAULT_SETTINGS["hedge"], **settings.get("hedge", {})}}
+        self.breakers = {}  # endpoint -> CircuitBreaker
+        self.latency = {}  # (endpoint, prompt type) -> LatencyTracker
+        self.stats = {"calls": 0, "retries": 0, "deadline_exceeded": 0, "short_circuited": 0,
+                      "hedges": 0, "hedges_won": 0, "failed": 0}
+
+    def deadline(self, prompt_type: str) -> float:
+        deadlines = {**DEFAULT_DEADLINES, **self.settings["deadlines"]}
+        return deadlines.get(prompt_type, deadlines["default"])
+
+    def breaker(self, endpoint: str) -> CircuitBreaker:
+        if endpoint not in self.breakers:
+            self.breakers[endpoint] = CircuitBreaker(self.settings["breaker_failures"], self.settings["breaker_reset"])
+        return self.breakers[endpoint]
+
+    def _tracker(self, endpoint: str, prompt_type: str) -> LatencyTracker:
+        return self.latency.setdefault((endpoint, prompt_type), LatencyTracker())
+
+    def hedge_delay(self, tracker: LatencyTracker):
+        """Seconds to wait before hedging, or None (hedging off or too few samples)"""
+        hedge = self.settings["hedge"]
+        if not hedge["enabled"] or len(tracker.samples) < hedge["min_samples"]:
+            return None
+        return max(hedge["min_delay"], tracker.percentile(hedge["percentile"]))
+
+    # ============ ATTEMPTS ============
+    def _admit(self, breaker: CircuitBreaker, endpoint: str):
+        if not breaker.allow():
+            self.stats["short_circuited"] += 1
+            raise CircuitOpenError(endpoint, breaker.retry_in())
+
+    def _failed(self, error: Exception, breaker: CircuitBreaker, endpoint: str, provider: str, prompt_type: str,
+                attempt: int) -> bool:
+        """Record a failed attempt; returns whether to retry"""
+        transient = is_transient(error)
+        if isinstance(error, DeadlineExceeded):
+            self.stats["deadline_exceeded"] += 1
+        if transient:
+            breaker.record_failure()
+        elif isinstance(error, httpx.HTTPStatusError) and 400 <= error.response.status_code < 500:
+            breaker.record_success()  # The endpoint answered; the request itself was refused
+        else:
+            breaker.release()  # Says nothing about the endpoint's health
+        telemetry.registry.set("policyswarm_llm_circuit_state", (endpoint,), BREAKER_STATES[breaker.state])
+        if not transient or attempt >= self.settings["max_retries"] or breaker.state == "open":
+            self.stats["failed"] += 1
+            return False
+        self.stats["retries"] += 1
+        telemetry.registry.inc("policyswarm_llm_retries_total", (provider, prompt_type, type(error).__name__))
+        return True
+
+    def _succeeded(self, breaker: CircuitBreaker, endpoint: str):
+        breaker.record_success()
+        telemetry.registry.set("policyswarm_llm_circuit_state", (endpoint,), 0)
+
+    async def _race(self, start, delay, can_hedge, stats: dict, provider: str, discard=None):
+        """Result of start(); after `delay` a duplicate may run and the first success wins"""
+        first = asyncio.ensure_future(start())
+        tasks, winner = [first], first
+        try:
+            if delay is None:
+                return await first
+            done, _ = await asyncio.wait(tasks, timeout=delay)
+            if done or not can_hedge():
+                return await first
+            tasks.append(asyncio.ensure_future(start()))
+            stats["hedged"] = True
+            self.stats["hedges"] += 1
+            telemetry.registry.inc("policyswarm_llm_hedges_total", (provider, "sent"))
+            pending, error = set(tasks), None
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        winner = task
+                        if task is not first:
+                            self.stats["hedges_won"] += 1
+                            telemetry.registry.inc("policyswarm_llm_hedges_total", (provider, "won"))
+                        return task.result()
+                    error = task.exception()
+            raise error
+        finally:
+            for task in tasks:
+                if not task.done():
+                    task.cancel()
+                elif task is not winner and discard is not None and not task.cancelled() and task.exception() is None:
+                    await discard(task.result())  # A loser that finished too (e.g. a stream left open)
+
+    async def call(self, endpoint: str, provider: str, prompt_type: str, attempt_fn, slot: asyncio.Semaphore,
+                   stats: dict, on_slot=None):
+        """Result of `attempt_fn()` (one provider request) under deadline, retries, breaker and hedging.
+
+        Each attempt holds a `slot` of the provider's semaphore; the deadline
+        starts once it has one. `stats` gets "attempts" and "hedged".
+        """
+        breaker = self.breaker(endpoint)
+        tracker = self._tracker(endpoint, prompt_type)
+        deadline = self.deadline(prompt_type)
+        self.stats["calls"] += 1
+
+        async def start():
+            async with slot:
+                if on_slot is not None:
+                    on_slot()
+                try:
+                    return await asyncio.wait_for(attempt_fn(), deadline)
+                except asyncio.TimeoutError:
+                    raise DeadlineExceeded(deadline) from None
+
+        for attempt in range(self.settings["max_retries"] + 1):
+            self._admit(breaker, endpoint)
+            stats["attempts"] = attempt + 1
+            started = time.perf_counter()
+            try:
+                result = await self._race(start, self.hedge_delay(tracker), lambda: not slot.locked(), stats, provider)
+            except asyncio.CancelledError:
+                breaker.release()
+                raise
+            except Exception as e:
+                if not self._failed(e, breaker, endpoint, provider, prompt_type, attempt):
+                    raise
+                await asyncio.sleep(backoff_delay(attempt, self.settings["backoff_base"], self.settings["backoff_max"]))
+                continue
+            self._succeeded(breaker, endpoint)
+            tracker.add(time.perf_counter() - started)
+            return result
+
+    async def stream(self, endpoint: str, provider: str, prompt_type: str, open_stream, slot: asyncio.Semaphore,
+                     stats: dict, on_slot=None):
+        """Chunks of `open_stream()` (a new async generator per attempt), as for call().
+
+        Retries and hedging only happen before the first chunk: once output
+        has been passed on, a failure ends the stream with the error.
+        The deadline covers the whole stream.
+        """
+        breaker = self.breaker(endpoint)
+        tracker = self._tracker(endpoint, prompt_type)
+        deadline = self.deadline(prompt_type)
+        self.stats["calls"] += 1
+
+        async def close(stream):
+            try:
+                await stream.aclose()
+            finally:
+                slot.release()
+
+        async def start():
+            """(stream, first chunk or None, when the slot was acquired); the slot is held until close()"""
+            await slot.acquire()
+            acquired = time.perf_counter()
+            if on_slot is not None:
+                on_slot()
+            stream = open_stream()
+            try:
+                return stream, await asyncio.wait_for(stream.__anext__(), deadline), acquired
+            except StopAsyncIteration:
+                return stream, None, acquired
+            except asyncio.TimeoutError:
+                await close(stream)
+                raise DeadlineExceeded(deadline) from None
+            except BaseException:
+                await close(stream)
+                raise
+
+        async def discard(opened):
+            await close(opened[0])
+
+        for attempt in range(self.settings["max_retries"] + 1):
+            self._admit(breaker, endpoint)
+            stats["attempts"] = attempt + 1
+            started = time.perf_counter()
+            try:
+                stream, first, acquired = await self._race(start, self.hedge_delay(tracker), lambda: not slot.locked(),
+                                                           stats, provider, discard)
+            except asyncio.CancelledError:
+                breaker.release()
+                raise
+            except Exception as e:
+                if not self._failed(e, breaker, endpoint, provider, prompt_type, attempt):
+                    raise
+                await asyncio.sleep(backoff_delay(attempt, self.settings["backoff_base"], self.settings["backoff_max"]))
+                continue
+            tracker.add(time.perf_counter() - started)  # Time to first chunk
+            break
+
+        try:
+            if first is not None:
+                yield first
+                while True:
+                    remaining = deadline - (time.perf_counter() - acquired)
+                    try:
+                        chunk = await asyncio.wait_for(stream.__anext__(), max(remaining, 0.001))
+                    except StopAsyncIteration:
+                        break
+                    except asyncio.TimeoutError:
+                        raise DeadlineExceeded(deadline) from None
+                    yield chunk
+        except (asyncio.CancelledError, GeneratorExit):
+            breaker.release()
+            raise
+        except Exception as e:
+            self._failed(e, breaker, endpoint, provider, prompt_type, self.settings["max_retries"])
+            raise
+        else:
+            self._succeeded(breaker, endpoint)
+        finally:
+            await close(stream)
+
+    def summary(self) -> dict:
+        return {
+            **self.stats,
+            "breakers": {endpoint: breaker.summary() for endpoint, breaker in self.breakers.items()},
+            "p95_seconds": {f"{endpoint} {prompt_type}": round(tracker.percentile(0.95), 3)
+                            for (endpoint, prompt_type), tracker in self.latency.items() if tracker.samples}
+        }
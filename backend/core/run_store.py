@@ -0,0 +1,314 @@
+"""
+PolicySwarm Run Store
+SQLite (WAL) record of every run: its inputs, event log, per-agent scores,
+per-iteration metrics and a checkpoint at the end of each phase. A run cut
+short by a restart can be resumed from its last checkpoint.
+Log entries are buffered and written in batches by a writer thread, so
+recording one never touches the disk on the event loop; a checkpoint always
+flushes them first, so the stored log is complete up to every checkpoint.
+The other writes are blocking: async callers run them with asyncio.to_thread.
+Relative paths are resolved against the backend directory (like config.json's).
+"""
+import json
+import os
+import sqlite3
+import threading
+import time
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    run_id TEXT PRIMARY KEY, status TEXT NOT NULL, policy TEXT NOT NULL, config TEXT NOT NULL,
+    personas TEXT NOT NULL, observer_specs TEXT NOT NULL, policy_document TEXT, population TEXT,
+    iteration INTEGER NOT NULL DEFAULT 0, phase TEXT, final_report TEXT NOT NULL DEFAULT '',
+    created_at REAL NOT NULL, updated_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS events (
+    run_id TEXT NOT NULL, seq INTEGER NOT NULL, type TEXT NOT NULL, agent TEXT NOT NULL, entry TEXT NOT NULL,
+    PRIMARY KEY (run_id, seq)
+);
+CREATE TABLE IF NOT EXISTS scores (
+    run_id TEXT NOT NULL, iteration INTEGER NOT NULL, phase TEXT NOT NULL, agent TEXT NOT NULL,
+    role TEXT NOT NULL, score REAL
+);
+CREATE INDEX IF NOT EXISTS scores_run ON scores(run_id, iteration);
+CREATE TABLE IF NOT EXISTS metrics (
+    run_id TEXT NOT NULL, iteration INTEGER NOT NULL, data TEXT NOT NULL,
+    PRIMARY KEY (run_id, iteration)
+);
+CREATE TABLE IF NOT EXISTS checkpoints (
+    id INTEGER PRIMARY KEY AUTOINCREMENT, run_id TEXT NOT NULL, iteration INTEGER NOT NULL, phase TEXT NOT NULL,
+    event_seq INTEGER NOT NULL, state TEXT NOT NULL, agents TEXT NOT NULL, created_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS checkpoints_run ON checkpoints(run_id, id);
+"""
+
+RUN_TABLES = ("events", "scores", "metrics", "checkpoints")
+BASE_DIR = os.path.join(os.path.dirname(__file__), '..')
+
+class RunStore:
+    def __init__(self, path: str, flush_every: int = 50, keep_checkpoints: int = 3):
+        self.path = path
+        self.flush_every = flush_every
+        self.keep_checkpoints = keep_checkpoints  # Per run; older ones are pruned
+        self._lock = threading.Lock()  # Pending log entries (never held during disk I/O)
+        self._db_lock = threading.Lock()  # The SQLite connection
+        self._pending = []  # (run_id, entry) not yet written
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        # Worker processes share the file, so wait on their write locks instead of failing
+        self._db = sqlite3.connect(path, check_same_thread=False, timeout=30)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.executescript(SCHEMA)
+        self._db.commit()
+        self._wake = threading.Event()
+        self._writer = threading.Thread(target=self._write_loop, name="run-store-writer", daemon=True)
+        self._writer.start()
+
+    def _write_loop(self):
+        while True:
+            self._wake.wait()
+            self._wake.clear()
+            with self._db_lock:
+                if self._db is None:
+                    return
+                self._flush()
+                self._db.commit()
+
+    def mark_interrupted(self) -> int:
+        """Runs left "running" by a process that died mid-run become "interrupted" (resumable).
+        Call once at startup, before any worker process could have a run in flight."""
+        with self._db_lock:
+            cursor = self._db.execute(
+                "UPDATE runs SET status = 'interrupted', updated_at = ? WHERE status = 'running'", (time.time(),)
+            )
+            self._db.commit()
+        return cursor.rowcount
+
+    # ============ WRITE ============
+    def start_run(self, session, policy: str):
+        """Record a new run (replacing any earlier run with the same id)"""
+        population = None
+        if session.population is not None:
+            population_config = session.config.get("population", {})
+            population = {
+                "size": session.population.size,
+                "seed": population_config.get("seed", 42),
+                "sample": [int(i) for i in session.population_sample]
+            }
+        now = time.time()
+        with self._db_lock:
+            self._drop_pending(session.session_id)
+            for table in RUN_TABLES:
+                self._db.execute(f"DELETE FROM {table} WHERE run_id = ?", (session.session_id,))
+            self._db.execute(
+                "INSERT OR REPLACE INTO runs (run_id, status, policy, config, personas, observer_specs, policy_document, "
+                "population, created_at, updated_at) VALUES (?, 'running', ?, ?, ?, ?, ?, ?, ?, ?)",
+                (
+                    session.session_id, policy, json.dumps(session.config),
+                    json.dumps([p.model_dump() for p in session.personas]), json.dumps(session.observer_specs),
+                    json.dumps(session.policy_document), json.dumps(population), now, now
+                )
+            )
+            self._db.commit()
+
+    def resume_run(self, run_id: str, event_seq: int):
+        """Mark a run running again and drop log entries written after its checkpoint"""
+        with self._db_lock:
+            self._drop_pending(run_id)
+            self._db.execute("DELETE FROM events WHERE run_id = ? AND seq >= ?", (run_id, event_seq))
+            self._db.execute("UPDATE runs SET status = 'running', updated_at = ? WHERE run_id = ?", (time.time(), run_id))
+            self._db.commit()
+
+    def record_event(self, run_id: str, entry: dict):
+        """Buffer a log entry (an event sink: no disk I/O here, the writer thread batches them)"""
+        with self._lock:
+            self._pending.append((run_id, dict(entry)))
+            due = len(self._pending) >= self.flush_every
+        if due:
+            self._wake.set()
+
+    def _drop_pending(self, run_id: str):
+        with self._lock:
+            self._pending = [(rid, entry) for rid, entry in self._pending if rid != run_id]
+
+    def _flush(self):
+        """Write buffered log entries (caller holds _db_lock and commits)"""
+        with self._lock:
+            pending, self._pending = self._pending, []
+        if not pending:
+            return
+        self._db.executemany(
+            "INSERT OR REPLACE INTO events (run_id, seq, type, agent, entry) VALUES (?, ?, ?, ?, ?)",
+            [
+                (run_id, entry["seq"], entry.get("type", "general"), entry.get("agent", "System"), json.dumps(entry))
+                for run_id, entry in pending
+            ]
+        )
+
+    def checkpoint(self, run_id: str, checkpoint: dict, scores: list = (), metrics: list = None):
+        """Store a phase checkpoint with the scores it produced, in one transaction"""
+        iteration, phase = checkpoint["iteration"], checkpoint["phase"]
+        now = time.time()
+        with self._db_lock:
+            self._flush()
+            self._db.executemany(
+                "INSERT INTO scores (run_id, iteration, phase, agent, role, score) VALUES (?, ?, ?, ?, ?, ?)",
+                [(run_id, iteration, phase, s["agent"], s["role"], s["score"]) for s in scores]
+            )
+            if metrics is not None:
+                self._db.executemany(
+                    "INSERT OR REPLACE INTO metrics (run_id, iteration, data) VALUES (?, ?, ?)",
+                    [(run_id, m["iteration"], json.dumps(m)) for m in metrics]
+                )
+            state = {key: value for key, value in checkpoint.items() if key != "agents"}
+            self._db.execute(
+                "INSERT INTO checkpoints (run_id, iteration, phase, event_seq, state, agents, created_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (run_id, iteration, phase, checkpoint["event_seq"], json.dumps(state), json.dumps(checkpoint["agents"]), now)
+            )
+            self._db.execute(
+                "DELETE FROM checkpoints WHERE run_id = ? AND id NOT IN "
+                "(SELECT id FROM checkpoints WHERE run_id = ? ORDER BY id DESC LIMIT ?)",
+                (run_id, run_id, self.keep_checkpoints)
+            )
+            self._db.execute(
+                "UPDATE runs SET iteration = ?, phase = ?, final_report = ?, updated_at = ? WHERE run_id = ?",
+                (iteration, phase, checkpoint["run"]["final_report"], now, run_id)
+            )
+            self._db.commit()
+
+    def finish_run(self, run_id: str, status: str, final_report: str = None, metrics: list = None):
+        """status: complete, stopped or failed"""
+        with self._db_lock:
+            self._flush()
+            if metrics is not None:
+                self._db.executemany(
+                    "INSERT OR REPLACE INTO metrics (run_id, iteration, data) VALUES (?, ?, ?)",
+                    [(run_id, m["iteration"], json.dumps(m)) for m in metrics]
+                )
+            self._db.execute(
+                "UPDATE runs SET status = ?, final_report = COALESCE(?, final_report), updated_at = ? WHERE run_id = ?",
+                (status, final_report, time.time(), run_id)
+            )
+            self._db.commit()
+
+    def delete_run(self, run_id: str):
+        with self._db_lock:
+            self._drop_pending(run_id)
+            for table in (*RUN_TABLES, "runs"):
+                self._db.execute(f"DELETE FROM {table} WHERE run_id = ?", (run_id,))
+            self._db.commit()
+
+    # ============ READ ============
+    def _run_row(self, row) -> dict:
+        run_id, status, policy, config, personas, observer_specs, policy_document, population, \
+            iteration, phase, final_report, created_at, updated_at = row
+        return {
+            "run_id": run_id, "status": status, "policy": policy, "config": json.loads(config),
+            "personas": json.loads(personas), "observer_specs": json.loads(observer_specs),
+            "policy_document": json.loads(policy_document) if policy_document else None,
+            "population": json.loads(population) if population else None,
+            "iteration": iteration, "phase": phase, "final_report": final_report,
+            "created_at": created_at, "updated_at": updated_at
+        }
+
+    def get_run(self, run_id: str):
+        with self._db_lock:
+            row = self._db.execute("SELECT * FROM runs WHERE run_id = ?", (run_id,)).fetchone()
+        return self._run_row(row) if row else None
+
+    def list_runs(self, limit: int = 50, status: str = None) -> list[dict]:
+        """Newest first, without the bulky columns"""
+        query = "SELECT run_id, status, iteration, phase, policy_document, created_at, updated_at FROM runs"
+        params = []
+        if status:
+            query += " WHERE status = ?"
+            params.append(status)
+        query += " ORDER BY created_at DESC LIMIT ?"
+        params.append(limit)
+        with self._db_lock:
+            rows = self._db.execute(query, params).fetchall()
+        return [
+            {
+                "run_id": run_id, "status": run_status, "iteration": iteration, "phase": phase,
+                "filename": (json.loads(policy_document) or {}).get("filename") if policy_document else None,
+                "created_at": created_at, "updated_at": updated_at
+            }
+            for run_id, run_status, iteration, phase, policy_document, created_at, updated_at in rows
+        ]
+
+    def events(self, run_id: str, since: int = 0, until: int = None, limit: int = None) -> list[dict]:
+        """Stored log entries with since <= seq < until"""
+        query = "SELECT entry FROM events WHERE run_id = ? AND seq >= ?"
+        params = [run_id, since]
+        if until is not None:
+            query += " AND seq < ?"
+            params.append(until)
+        query += " ORDER BY seq"
+        if limit is not None:
+            query += " LIMIT ?"
+            params.append(limit)
+        with self._db_lock:
+            self._flush()
+            self._db.commit()
+            rows = self._db.execute(query, params).fetchall()
+        return [json.loads(entry) for (entry,) in rows]
+
+    def scores(self, run_id: str) -> list[dict]:
+        with self._db_lock:
+            rows = self._db.execute(
+                "SELECT iteration, phase, agent, role, score FROM scores WHERE run_id = ? ORDER BY rowid", (run_id,)
+            ).fetchall()
+        return [{"iteration": i, "phase": p, "agent": a, "role": r, "score": s} for i, p, a, r, s in rows]
+
+    def metrics(self, run_id: str) -> list[dict]:
+        with self._db_lock:
+            rows = self._db.execute("SELECT data FROM metrics WHERE run_id = ? ORDER BY iteration", (run_id,)).fetchall()
+        return [json.loads(data) for (data,) in rows]
+
+    def checkpoints(self, run_id: str) -> list[dict]:
+        """Checkpoint headers (no state), oldest first"""
+        with self._db_lock:
+            rows = self._db.execute(
+                "SELECT id, iteration, phase, event_seq, created_at FROM checkpoints WHERE run_id = ? ORDER BY id",
+                (run_id,)
+            ).fetchall()
+        return [{"id": c, "iteration": i, "phase": p, "event_seq": e, "created_at": t} for c, i, p, e, t in rows]
+
+    def latest_checkpoint(self, run_id: str):
+        with self._db_lock:
+            row = self._db.execute(
+                "SELECT state, agents FROM checkpoints WHERE run_id = ? ORDER BY id DESC LIMIT 1", (run_id,)
+            ).fetchone()
+        if row is None:
+            return None
+        return {**json.loads(row[0]), "agents": json.loads(row[1])}
+
+    def close(self):
+        with self._db_lock:
+            if self._db is not None:
+                self._flush()
+                self._db.commit()
+                self._db.close()
+                self._db = None
+        self._wake.set()  # Lets the writer thread exit
+
+_stores = {}
+
+def get_run_store(settings: dict = None):
+    """Shared store for config.run_store in this process, or None when disabled"""
+    if not settings or not settings.get("enabled"):
+        return None
+    path = settings.get("path", "cache/runs.sqlite")
+    if not os.path.isabs(path):
+        path = os.path.join(BASE_DIR, path)
+    path = os.path.abspath(path)
+    if path not in _stores:
+        _stores[path] = RunStore(path, flush_every=settings.get("flush_every", 50),
+                                 keep_checkpoints=settings.get("keep_checkpoints", 3))
+    return _stores[path]
+
+def close_run_stores():
+    for store in _stores.values():
+        store.close()
+    _stores.clear()
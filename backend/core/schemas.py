@@ -0,0 +1,136 @@
+"""
+PolicySwarm Structured Output Schemas
+One Pydantic model per agent prompt type. They validate parsed replies and
+double as the JSON schema sent to providers with a native JSON/format mode.
+Names match the prompt types in core.mock_llm.
+"""
+from typing import Literal
+from pydantic import BaseModel, Field, field_validator
+
+def _coerce_score(value):
+    """Accept 72, 72.4, "72" and "72%" from the model"""
+    if isinstance(value, str):
+        value = value.strip().rstrip("%").strip()
+    if isinstance(value, (str, float)):
+        try:
+            return round(float(value))
+        except ValueError:
+            return value
+    return value
+
+def _coerce_choice(value):
+    return value.strip().lower() if isinstance(value, str) else value
+
+class CitizenReaction(BaseModel):
+    satisfaction_score: int = Field(ge=0, le=100)
+    message: str = Field(min_length=1)
+    key_concern: str = ""
+    emotional_reaction: str = "neutral"
+
+    _score = field_validator("satisfaction_score", mode="before")(_coerce_score)
+
+class PersonaReaction(CitizenReaction):
+    name: str
+
+class CitizenReactionBatch(BaseModel):
+    reactions: list[PersonaReaction] = Field(min_length=1)
+
+class ConversationReply(BaseModel):
+    message: str = Field(min_length=1)
+    should_exit: bool = False
+    exit_reason: str = ""
+    references_other: str = ""
+    introduces_new_point: bool = False
+
+class DebateSummary(BaseModel):
+    summary: str = Field(min_length=1)
+    main_points: list[str] = []
+
+class SenateAnalysis(BaseModel):
+    viability_score: int = Field(ge=0, le=100)
+    message: str = Field(min_length=1)
+    key_risk: str = ""
+    recommendation: Literal["approve", "modify", "reject"] = "modify"
+
+    _score = field_validator("viability_score", mode="before")(_coerce_score)
+    _choice = field_validator("recommendation", mode="before")(_coerce_choice)
+
+class SenateReply(BaseModel):
+    message: str = Field(min_length=1)
+    agrees_with: str = ""
+    disagrees_with: str = ""
+    new_insight: str = ""
+
+class Verdict(BaseModel):
+    viability_score: int = Field(ge=0, le=100)
+    final_message: str = Field(min_length=1)
+    recommendation: Literal["approve", "modify", "reject"] = "modify"
+    condition: str = ""
+
+    _score = field_validator("viability_score", mode="before")(_coerce_score)
+    _choice = field_validator("recommendation", mode="before")(_coerce_choice)
+
+class ArchitectCitizens(BaseModel):
+    top_3_concerns: list[str]
+    emotional_temperature: str = "mixed"
+    key_affected_groups: list[str] = []
+    suggested_fixes: list[str] = []
+
+class ArchitectSenate(BaseModel):
+    consensus_areas: list[str] = []
+    disagreement_areas: list[str] = []
+    implementation_risks: list[str]
+    political_feasibility: str = "medium"
+
+class Conflict(BaseModel):
+    citizen_want: str
+    government_concern: str
+    resolution_approach: str = ""
+
+class ArchitectConflicts(BaseModel):
+    conflicts: list[Conflict]
+    aligned_areas: list[str] = []
+    impossible_to_reconcile: list[str] = []
+
+class ArchitectRevision(BaseModel):
+    revised_policy: str = Field(min_length=1)
+    changes_summary: list[str] = []
+    expected_citizen_improvement: str = "N/A"
+    expected_senate_improvement: str = "N/A"
+
+class ArchitectDiff(BaseModel):
+    removed: list[str] = []
+    added: list[str] = []
+    modified: list[str] = []
+    summary: str = Field(min_length=1)
+
+SCHEMAS = {
+    "citizen_reaction": CitizenReaction,
+    "citizen_reaction_batch": CitizenReactionBatch,
+    "conversation_reply": ConversationReply,
+    "debate_summary": DebateSummary,
+    "senate_analysis": SenateAnalysis,
+    "senate_reply": SenateReply,
+    "verdict": Verdict,
+    "architect_citizens": ArchitectCitizens,
+    "architect_senate": ArchitectSenate,
+    "architect_conflicts": ArchitectConflicts,
+    "architect_revision": ArchitectRevision,
+    "architect_diff": ArchitectDiff,
+}
+
+_json_schemas = {}
+
+def json_schema(name: str) -> dict:
+    """JSON schema for a prompt type (built once)"""
+    if name not in _json_schemas:
+        _json_schemas[name] = SCHEMAS[name].model_json_schema()
+    return _json_schemas[name]
+
+def describe_errors(error) -> str:
+    """Short, model-readable summary of a ValidationError"""
+    problems = []
+    for item in error.errors()[:5]:
+        field = ".".join(str(part) for part in item["loc"]) or "reply"
+        problems.append(f"{field}: {item['msg']}")
+    return "; ".join(problems)
@@ -0,0 +1,307 @@
+"""
+PolicySwarm Simulation Sessions
+Each submitted policy runs in its own session with its own state and agents,
+so concurrent users (or batch jobs) never overwrite each other's runs.
+"""
+import asyncio
+import os
+import time
+import uuid
+from collections import OrderedDict
+from agents.citizen_agent import CitizenAgent
+from agents.observer_agent import ObserverAgent
+from agents.architect_agent import ArchitectAgent
+from core.event_log import EventLog
+from core.digest import DebateDigest
+from core.tracing import Trace
+
+TOKEN_QUEUE_SIZE = 2000  # Per subscriber; a slow client drops tokens, never log entries
+
+class TokenStream:
+    """Routes one agent reply's tokens to the session's live subscribers"""
+    def __init__(self, session, stream_id, agent: str, role: str, log_type: str):
+        self.session = session
+        self.stream_id = stream_id
+        self.agent = agent
+        self.role = role
+        self.log_type = log_type
+
+    @property
+    def on_token(self):
+        """Callback for the agent, or None when token streaming is off"""
+        return self.publish if self.stream_id is not None else None
+
+    def publish(self, delta: str):
+        self.session.publish_token({
+            "stream_id": self.stream_id, "agent": self.agent, "role": self.role,
+            "type": self.log_type, "delta": delta
+        })
+
+class SimulationSession:
+    def __init__(self, session_id: str, personas: list, observer_specs: list[dict], config: dict):
+        self.session_id = session_id
+        self.config = dict(config)  # Snapshot so later /config changes don't alter a live run
+
+        # Run state
+        log_config = self.config.get("event_log", {})
+        spill_dir = log_config.get("spill_dir")
+        self.events = EventLog(
+            capacity=log_config.get("capacity", 5000),
+            spill_path=os.path.join(spill_dir, f"{session_id}.jsonl") if spill_dir else None
+        )
+        self.debate_history = []
+        self.debate_digest = DebateDigest()  # What the Senate and Architect read about the citizen debate
+        tracing_config = self.config.get("tracing", {})
+        self.trace = Trace(session_id, tracing_config.get("max_spans", 20000)) if tracing_config.get("enabled") else None
+        self.observer_reports = []
+        self.final_report = ""
+        self.metrics = []
+        self.policy_document = None
+        self.current_iteration = 0
+        self.simulation_paused = False
+        self.cycle_complete = False
+        self.run_pending = False  # Submitted and not finished yet (a queued worker job hasn't started iterating)
+        self.current_policy = ""
+        self.revised_policy = ""
+        # Senate/architect views only show the current iteration: they start at these seqs
+        self.senate_since = 0
+        self.architect_since = 0
+        # Set when the citizens are a stratified sample of a generated population
+        self.population = None
+        self.population_sample = None
+        self.population_summary = None  # Latest summary, when the run happens in a worker process
+        self._log_signal = asyncio.Event()  # Set (and replaced) whenever a log entry lands
+        self._token_queues = set()
+        self._next_stream_id = 0
+        # Extra consumers of each log entry / token (a worker process forwards them to the API)
+        self.event_sinks = []
+        self.token_sinks = []
+
+        # Per-session agents (memory never leaks between runs)
+        self.personas = list(personas)
+        self.observer_specs = list(observer_specs)
+        self.citizens = [CitizenAgent(p) for p in personas]
+        self.observers = [ObserverAgent(**spec) for spec in observer_specs]
+        self.architect = ArchitectAgent()
+
+    def log_event(self, agent_name: str, message: str, role: str = "System", log_type: str = "general",
+                  stream_id: int = None):
+        print(f"[{self.session_id[:8]}] [{agent_name}] {message}")
+        entry = {"agent": agent_name, "role": role, "message": message, "type": log_type, "ts": time.time()}
+        if stream_id is not None:
+            entry["stream_id"] = stream_id  # Lets clients replace the streamed partial with the final entry
+        self.events.append(entry)
+        for sink in self.event_sinks:
+            sink(entry)
+        self.notify_listeners()
+
+    # ============ TOKEN STREAMING ============
+    def token_stream(self, agent_name: str, role: str = "System", log_type: str = "general") -> TokenStream:
+        """Stream for one upcoming reply (inert when config.stream_tokens is off)"""
+        stream_id = None
+        if self.config.get("stream_tokens"):
+            stream_id = self._next_stream_id
+            self._next_stream_id += 1
+        return TokenStream(self, stream_id, agent_name, role, log_type)
+
+    def subscribe_tokens(self) -> asyncio.Queue:
+        queue = asyncio.Queue(maxsize=TOKEN_QUEUE_SIZE)
+        self._token_queues.add(queue)
+        return queue
+
+    def unsubscribe_tokens(self, queue: asyncio.Queue):
+        self._token_queues.discard(queue)
+
+    def publish_token(self, token: dict):
+        """Fan a partial-reply token out to live streams (not recorded in the log)"""
+        for sink in self.token_sinks:
+            sink(token)
+        if not self._token_queues:
+            return
+        for queue in self._token_queues:
+            try:
+                queue.put_nowait(token)
+            except asyncio.QueueFull:
+                pass
+        self.notify_listeners()
+
+    def start_senate_view(self):
+        """Clear the Senate view for a new iteration"""
+        self.senate_since = self.events.next_seq
+
+    def start_architect_view(self):
+        """Clear the Architect view for a new iteration"""
+        self.architect_since = self.events.next_seq
+
+    @property
+    def senate_chat_logs(self) -> list:
+        return self.events.by_type("senate", since=self.senate_since)
+
+    @property
+    def architect_logs(self) -> list:
+        return self.events.by_type("architect", since=self.architect_since)
+
+    def notify_listeners(self):
+        """Wake every stream waiting on this session"""
+        self._log_signal.set()
+        self._log_signal = asyncio.Event()
+
+    def logs_since(self, since: int = 0) -> list:
+        """Entries with seq >= since"""
+        return self.events.since(since)
+
+    async def wait_for_logs(self, since: int, timeout: float, tokens: asyncio.Queue = None):
+        """Block until there are entries past `since` (or queued tokens), the run ends, or timeout"""
+        if self.events.next_seq > since or self.cycle_complete or (tokens is not None and not tokens.empty()):
+            return
+        signal = self._log_signal
+        try:
+            await asyncio.wait_for(signal.wait(), timeout)
+        except asyncio.TimeoutError:
+            pass
+
+    # ============ RUN STATE ============
+    def run_state(self) -> dict:
+        """Everything the API serves about a run besides the event log"""
+        population = None
+        if self.population is not None:
+            population = self.population.summary(self.population_sample, self.config.get("population", {}).get("strata"))
+        return {
+            "current_iteration": self.current_iteration,
+            "current_policy": self.current_policy,
+            "revised_policy": self.revised_policy,
+            "final_report": self.final_report,
+            "metrics": list(self.metrics),
+            "cycle_complete": self.cycle_complete,
+            "senate_since": self.senate_since,
+            "architect_since": self.architect_since,
+            "population": population
+        }
+
+    def apply_run_state(self, state: dict):
+        """Mirror a run executing elsewhere (pause/stop stay controlled from here)"""
+        self.current_iteration = state["current_iteration"]
+        self.current_policy = state["current_policy"]
+        self.revised_policy = state["revised_policy"]
+        self.final_report = state["final_report"]
+        self.metrics = state["metrics"]
+        self.cycle_complete = self.cycle_complete or state["cycle_complete"]
+        self.senate_since = state["senate_since"]
+        self.architect_since = state["architect_since"]
+        self.population_summary = state["population"]
+        self.notify_listeners()
+
+    # ============ CHECKPOINTS ============
+    def checkpoint_state(self, iteration: int, phase: str, phase_data: dict) -> dict:
+        """JSON-safe state at the end of a phase, enough to resume the run after it"""
+        run = self.run_state()
+        run.pop("population")  # Regenerated from its seed on resume
+        sample_scores = None
+        if self.population is not None:
+            sample_scores = [None if s != s else s for s in self.population.scores[self.population_sample].tolist()]
+        return {
+            "iteration": iteration,
+            "phase": phase,
+            "phase_data": phase_data,
+            "run": run,
+            "debate_history": list(self.debate_history),
+            "observer_reports": list(self.observer_reports),
+            "debate_digest": self.debate_digest.snapshot(),
+            "event_seq": self.events.next_seq,
+            "next_stream_id": self._next_stream_id,
+            "sample_scores": sample_scores,
+            "agents": self.agent_snapshots()
+        }
+
+    def restore_checkpoint(self, checkpoint: dict, events: list):
+        """Load a checkpoint and the log entries before it into this (fresh) session"""
+        for entry in events:
+            self.events.append(dict(entry))  # Stored seqs are contiguous from 0, so they're kept
+        run = checkpoint["run"]
+        self.current_iteration = run["current_iteration"]
+        self.current_policy = run["current_policy"]
+        self.revised_policy = run["revised_policy"]
+        self.final_report = run["final_report"]
+        self.metrics = list(run["metrics"])
+        self.senate_since = run["senate_since"]
+        self.architect_since = run["architect_since"]
+        self.cycle_complete = False
+        self.debate_history = list(checkpoint["debate_history"])
+        self.observer_reports = list(checkpoint["observer_reports"])
+        self.debate_digest.restore(checkpoint["debate_digest"])
+        self._next_stream_id = checkpoint["next_stream_id"]
+        if self.population is not None and checkpoint.get("sample_scores") is not None:
+            self.population.record_scores(self.population_sample, checkpoint["sample_scores"])
+        self.restore_agents(checkpoint["agents"])
+
+    def restore_agents(self, snapshots: dict):
+        for agent, snapshot in zip(self.citizens, snapshots["citizens"]):
+            agent.restore(snapshot)
+        for agent, snapshot in zip(self.observers, snapshots["observers"]):
+            agent.restore(snapshot)
+        self.architect.restore(snapshots["architect"])
+
+    def reset_agents(self):
+        """Clear every agent's memory so a run never sees an earlier run's concerns"""
+        for agent in [*self.citizens, *self.observers, self.architect]:
+            agent.reset()
+        self.debate_digest = DebateDigest()
+
+    def agent_snapshots(self) -> dict:
+        return {
+            "citizens": [c.snapshot() for c in self.citizens],
+            "observers": [o.snapshot() for o in self.observers],
+            "architect": self.architect.snapshot()
+        }
+
+    def is_running(self) -> bool:
+        return self.current_iteration > 0 and not self.cycle_complete
+
+    def summary(self) -> dict:
+        """Short description for session listings"""
+        return {
+            "session_id": self.session_id,
+            "iteration": self.current_iteration,
+            "paused": self.simulation_paused,
+            "complete": self.cycle_complete,
+            "filename": self.policy_document.get("filename") if self.policy_document else None
+        }
+
+class SessionRegistry:
+    """Holds live sessions, evicting the oldest finished ones past max_sessions"""
+    def __init__(self, max_sessions: int = 50):
+        self.max_sessions = max_sessions
+        self._sessions: "OrderedDict[str, SimulationSession]" = OrderedDict()
+
+    def create(self, personas: list, observer_specs: list[dict], config: dict, session_id: str = None) -> SimulationSession:
+        session = SimulationSession(session_id or uuid.uuid4().hex, personas, observer_specs, config)
+        self._sessions[session.session_id] = session
+        self._evict()
+        return session
+
+    def get(self, session_id: str):
+        return self._sessions.get(session_id)
+
+    def latest(self):
+        """Most recently created session, if any"""
+        if not self._sessions:
+            return None
+        return next(reversed(self._sessions.values()))
+
+    def remove(self, session_id: str):
+        session = self._sessions.pop(session_id, None)
+        if session is not None:
+            session.events.close()
+        return session
+
+    def all(self) -> list[SimulationSession]:
+        return list(self._sessions.values())
+
+    def _evict(self):
+        # Only finished (or never-submitted) sessions are dropped; queued and live runs are kept
+        for session_id in list(self._sessions)[:-1]:
+            if len(self._sessions) <= self.max_sessions:
+                break
+            session = self._sessions[session_id]
+            if not session.is_running() and not session.run_pending:
+                self.remove(session_id)
@@ -0,0 +1,261 @@
+"""
+PolicySwarm Telemetry
+Counters, histograms and gauges for every LLM call, plus event-loop lag,
+rendered in the Prometheus text format.
+
+- Calls are tagged with provider, model, phase and prompt type (metric labels)
+  and, in the recent-calls buffer, also with agent, iteration and run
+- Phase, iteration, run and agent come from tagged(), a context manager over a
+  contextvar, so tasks started inside a phase inherit its tags
+- Worker processes push their snapshot to the API process, which adds them up
+"""
+import asyncio
+import contextvars
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+
+LATENCY_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 20, 30, 60, 120)
+TOKEN_BUCKETS = (16, 32, 64, 128, 256, 512, 1024, 2048, 4096, 8192)
+LAG_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5)
+RECENT_CALLS = 500  # Per process
+
+CALL_LABELS = ("provider", "model", "phase", "prompt_type")
+
+# (type, help, label names, buckets)
+METRICS = {
+    "policyswarm_llm_calls_total": ("counter", "LLM calls by outcome (ok, error, cache_hit)", CALL_LABELS + ("outcome",), None),
+    "policyswarm_llm_errors_total": ("counter", "Failed LLM calls by error class", ("provider", "model", "error_class"), None),
+    "policyswarm_llm_call_duration_seconds": ("histogram", "LLM call latency, excluding queueing and cache hits", CALL_LABELS, LATENCY_BUCKETS),
+    "policyswarm_llm_queue_wait_seconds": ("histogram", "Time waiting for a provider concurrency slot", ("provider",), LATENCY_BUCKETS),
+    "policyswarm_llm_time_to_first_token_seconds": ("histogram", "Streamed calls: time until the first chunk", CALL_LABELS, LATENCY_BUCKETS),
+    "policyswarm_llm_prompt_tokens": ("histogram", "Prompt size (system + prompt) in tokens", CALL_LABELS, TOKEN_BUCKETS),
+    "policyswarm_llm_response_tokens": ("histogram", "Response size in tokens", CALL_LABELS, TOKEN_BUCKETS),
+    "policyswarm_llm_parse_total": ("counter", "Schema validation of LLM replies (valid or invalid)", ("phase", "prompt_type", "result"), None),
+    "policyswarm_llm_retries_total": ("counter", "Provider attempts retried after a transient error", ("provider", "prompt_type", "error_class"), None),
+    "policyswarm_llm_hedges_total": ("counter", "Hedged duplicate requests (sent, won)", ("provider", "result"), None),
+    "policyswarm_llm_circuit_state": ("gauge", "Circuit breaker per endpoint (0 closed, 1 half-open, 2 open)", ("endpoint",), None),
+    "policyswarm_event_loop_lag_seconds": ("gauge", "Latest event-loop scheduling delay", ("process",), None),
+    "policyswarm_event_loop_lag": ("histogram", "Event-loop scheduling delay samples, in seconds", ("process",), LAG_BUCKETS),
+    "policyswarm_active_simulations": ("gauge", "Simulations running in the API process or its workers", (), None),
+    "policyswarm_jobs": ("gauge", "Worker jobs by status", ("status",), None),
+}
+
+# ============ CALL TAGS ============
+_tags = contextvars.ContextVar("telemetry_tags", default={})
+_last_call = contextvars.ContextVar("telemetry_last_call", default=None)
+
+@contextmanager
+def tagged(**tags):
+    """Tag every LLM call made inside the block (and in tasks it starts)"""
+    token = _tags.set({**_tags.get(), **tags})
+    try:
+        yield
+    finally:
+        _tags.reset(token)
+
+def current_tags() -> dict:
+    return _tags.get()
+
+# ============ REGISTRY ============
+class Registry:
+    def __init__(self, recent_calls: int = RECENT_CALLS):
+        self._lock = threading.Lock()
+        self._series = {name: {} for name in METRICS}  # name -> {label values: value or [bucket counts..., sum, count]}
+        self.recent = deque(maxlen=recent_calls)
+        self._call_seq = 0
+        self._remote = {}  # source -> latest series snapshot from a worker process
+
+    def inc(self, name: str, labels: tuple, value: float = 1):
+        with self._lock:
+            series = self._series[name]
+            series[labels] = series.get(labels, 0) + value
+
+    def set(self, name: str, labels: tuple, value: float):
+        with self._lock:
+            self._series[name][labels] = value
+
+    def observe(self, name: str, labels: tuple, value: float):
+        buckets = METRICS[name][3]
+        with self._lock:
+            series = self._series[name]
+            counts = series.get(labels)
+            if counts is None:
+                counts = series[labels] = [0] * (len(buckets) + 1) + [0.0, 0]
+            index = next((i for i, bound in enumerate(buckets) if value <= bound), len(buckets))
+            counts[index] += 1
+            counts[-2] += value
+            counts[-1] += 1
+
+    def add_call(self, record: dict):
+        with self._lock:
+            self._call_seq += 1
+            record["seq"] = self._call_seq
+            self.recent.append(record)
+
+    # ============ EXPORT ============
+    def snapshot(self, calls_since: int = 0) -> dict:
+        """Series (JSON-safe) plus the recent calls after seq `calls_since`"""
+        with self._lock:
+            return {
+                "series": {name: [[list(labels), value] for labels, value in series.items()] for name, series in self._series.items()},
+                "calls": [dict(call) for call in self.recent if call["seq"] > calls_since],
+                "call_seq": self._call_seq
+            }
+
+    def merge_remote(self, source: str, snapshot: dict):
+        """Latest totals from a worker process, plus its new calls"""
+        with self._lock:
+            self._remote[source] = snapshot["series"]
+            for call in snapshot["calls"]:
+                self.recent.append({**call, "process": source})
+
+    def _combined(self) -> dict:
+        with self._lock:
+            combined = {name: {labels: (list(value) if isinstance(value, list) else value) for labels, value in series.items()}
+                        for name, series in self._series.items()}
+            remotes = list(self._remote.values())
+        for series_by_name in remotes:
+            for name, entries in series_by_name.items():
+                if name not in combined:
+                    continue
+                series = combined[name]
+                for labels, value in entries:
+                    labels = tuple(labels)
+                    current = series.get(labels)
+                    if current is None or METRICS[name][0] == "gauge":
+                        series[labels] = list(value) if isinstance(value, list) else value
+                    elif isinstance(current, list):
+                        series[labels] = [a + b for a, b in zip(current, value)]
+                    else:
+                        series[labels] = current + value
+        return combined
+
+    def render(self) -> str:
+        """Prometheus text exposition format (version 0.0.4)"""
+        lines = []
+        for name, series in self._combined().items():
+            kind, help_text, label_names, buckets = METRICS[name]
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {kind}")
+            for labels, value in sorted(series.items()):
+                pairs = [f'{key}="{_escape(val)}"' for key, val in zip(label_names, labels)]
+                if kind != "histogram":
+                    lines.append(f"{name}{_label_text(pairs)} {_number(value)}")
+                    continue
+                cumulative = 0
+                for bound, count in zip(list(buckets) + ["+Inf"], value[:-2]):
+                    cumulative += count
+                    bucket_pairs = pairs + ['le="%s"' % bound]
+                    lines.append(f"{name}_bucket{_label_text(bucket_pairs)} {cumulative}")
+                lines.append(f"{name}_sum{_label_text(pairs)} {_number(value[-2])}")
+                lines.append(f"{name}_count{_label_text(pairs)} {value[-1]}")
+        return "\n".join(lines) + "\n"
+
+    def calls(self, run: str = None) -> list:
+        """Recent calls, oldest first (optionally one run's only)"""
+        with self._lock:
+            return [call for call in self.recent if run is None or call.get("run") == run]
+
+    def call_summary(self, run: str = None) -> dict:
+        """Time and calls per phase and per agent over the recent calls"""
+        calls = self.calls(run)
+        by_phase, by_agent = {}, {}
+        for call in calls:
+            for table, key in ((by_phase, call.get("phase") or "none"), (by_agent, call.get("agent") or "none")):
+                entry = table.setdefault(key, {"calls": 0, "seconds": 0.0, "errors": 0, "prompt_tokens": 0, "response_tokens": 0})
+                entry["calls"] += 1
+                entry["seconds"] += call["duration"]
+                entry["errors"] += call["outcome"] == "error"
+                entry["prompt_tokens"] += call["prompt_tokens"]
+                entry["response_tokens"] += call["response_tokens"]
+        for table in (by_phase, by_agent):
+            for entry in table.values():
+                entry["seconds"] = round(entry["seconds"], 3)
+        return {"calls": len(calls), "by_phase": by_phase, "by_agent": by_agent}
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+def _label_text(pairs: list) -> str:
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+def _number(value) -> str:
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+registry = Registry()
+
+# ============ LLM CALLS ============
+class LLMCall:
+    """One provider call: start_call(), then queued() / first_chunk() / finish()"""
+    __slots__ = ("record", "labels", "started", "_clock")
+
+    def __init__(self, provider: str, model: str, prompt_tokens: int, prompt_chars: int):
+        tags = _tags.get()
+        self.record = {
+            "time": time.time(), "provider": provider, "model": model,
+            "agent": tags.get("agent"), "phase": tags.get("phase"), "iteration": tags.get("iteration"),
+            "run": tags.get("run"), "prompt_type": tags.get("prompt_type", "raw"),
+            "prompt_chars": prompt_chars, "prompt_tokens": prompt_tokens, "response_chars": 0, "response_tokens": 0,
+            "queue_wait": None, "duration": 0.0, "first_chunk": None, "outcome": None, "error_class": None, "parse": None,
+            "attempts": 1, "hedged": False
+        }
+        self.labels = (provider, model, self.record["phase"] or "none", self.record["prompt_type"])
+        self.started = self._clock = time.perf_counter()
+        _last_call.set(self)
+
+    def queued(self):
+        """The concurrency slot was acquired: the call itself starts now (retries and hedges don't count)"""
+        if self.record["queue_wait"] is not None:
+            return
+        now = time.perf_counter()
+        self.record["queue_wait"] = round(now - self.started, 4)
+        registry.observe("policyswarm_llm_queue_wait_seconds", (self.labels[0],), now - self.started)
+        self._clock = now
+
+    def first_chunk(self):
+        if self.record["first_chunk"] is None:
+            elapsed = time.perf_counter() - self._clock
+            self.record["first_chunk"] = round(elapsed, 4)
+            registry.observe("policyswarm_llm_time_to_first_token_seconds", self.labels, elapsed)
+
+    def finish(self, response: str, response_tokens: int, error_class: str = None, cached: bool = False):
+        elapsed = time.perf_counter() - self._clock
+        outcome = "cache_hit" if cached else "error" if error_class else "ok"
+        if self.record["queue_wait"] is None:
+            self.record["queue_wait"] = 0.0
+        self.record.update(response_chars=len(response or ""), response_tokens=response_tokens,
+                           duration=round(elapsed, 4), outcome=outcome, error_class=error_class)
+        registry.inc("policyswarm_llm_calls_total", self.labels + (outcome,))
+        registry.observe("policyswarm_llm_prompt_tokens", self.labels, self.record["prompt_tokens"])
+        if not cached:
+            registry.observe("policyswarm_llm_call_duration_seconds", self.labels, elapsed)
+        if error_class:
+            registry.inc("policyswarm_llm_errors_total", (self.labels[0], self.labels[1], error_class))
+        else:
+            registry.observe("policyswarm_llm_response_tokens", self.labels, response_tokens)
+        registry.add_call(self.record)
+
+def start_call(provider: str, model: str, prompt_tokens: int, prompt_chars: int) -> LLMCall:
+    return LLMCall(provider, model, prompt_tokens, prompt_chars)
+
+def record_parse(valid: bool):
+    """Schema validation result of the latest call in this context"""
+    call = _last_call.get()
+    phase = call.labels[2] if call else _tags.get().get("phase") or "none"
+    prompt_type = call.labels[3] if call else _tags.get().get("prompt_type", "raw")
+    if call is not None and call.record["parse"] is None:
+        call.record["parse"] = "valid" if valid else "invalid"
+    registry.inc("policyswarm_llm_parse_total", (phase, prompt_type, "valid" if valid else "invalid"))
+
+# ============ EVENT LOOP ============
+async def monitor_loop_lag(process: str, interval: float = 0.5):
+    """Measure how late the event loop wakes a sleeping task (run as a background task)"""
+    loop = asyncio.get_running_loop()
+    while True:
+        start = loop.time()
+        await asyncio.sleep(interval)
+        lag = max(0.0, loop.time() - start - interval)
+        registry.set("policyswarm_event_loop_lag_seconds", (process,), lag)
+        registry.observe("policyswarm_event_loop_lag", (process,), lag)
@@ -0,0 +1,188 @@
+"""
+PolicySwarm Tracing
+Nested timing spans for one run (iteration -> phase -> exchange -> agent step
+-> LLM call -> JSON parse), exported as Chrome trace JSON for Perfetto
+(ui.perfetto.dev) or chrome://tracing, plus an opt-in sampling profiler.
+
+- A run's Trace is made current with use_trace(); span() records into it and
+  does nothing when there is none, so agents can be called outside a run
+- Each asyncio task gets its own track (named after the agent it works for),
+  so concurrent calls show side by side and nesting follows the call tree
+- The profiler samples the event-loop thread's Python stack every few
+  milliseconds into folded stacks (flamegraph.pl / speedscope format)
+"""
+import asyncio
+import contextvars
+import functools
+import sys
+import threading
+import time
+import weakref
+from collections import Counter
+
+_current = contextvars.ContextVar("trace", default=None)
+
+class Trace:
+    def __init__(self, run_id: str, max_spans: int = 20000):
+        self.run_id = run_id
+        self.max_spans = max_spans
+        self.spans = []  # [name, category, start µs (wall clock), duration µs, track, args]
+        self.dropped = 0
+        self.tracks = {}  # name -> track id
+        self._task_tracks = weakref.WeakKeyDictionary()  # asyncio task -> track id
+        self._open = Counter()  # track id -> spans still running on it
+        self.profile = None  # Folded stack -> samples, when the run was profiled
+
+    def track(self, agent: str = None) -> int:
+        """Track of the current task (assigned on its first span)"""
+        try:
+            task = asyncio.current_task()
+        except RuntimeError:
+            task = None
+        if task is None:
+            return self.tracks.setdefault("main", len(self.tracks) + 1)
+        track = self._task_tracks.get(task)
+        if track is None:
+            # The first task to record anything is the run itself
+            name = base = agent or ("run" if not self.tracks else f"task {len(self.tracks) + 1}")
+            copy = 1
+            while self._open[self.tracks.get(name)]:  # Another task of the same agent is mid-span
+                copy += 1
+                name = f"{base} #{copy}"
+            track = self._task_tracks[task] = self.tracks.setdefault(name, len(self.tracks) + 1)
+        return track
+
+    def enter(self, agent: str = None) -> int:
+        track = self.track(agent)
+        self._open[track] += 1
+        return track
+
+    def add(self, name: str, category: str, start: int, duration: int, track: int, args: dict):
+        self._open[track] -= 1
+        if len(self.spans) >= self.max_spans:
+            self.dropped += 1
+            return
+        self.spans.append([name, category, start, duration, track, args])
+
+    # ============ SHIPPING (worker -> API) ============
+    def since(self, index: int) -> dict:
+        return {"spans": self.spans[index:], "tracks": dict(self.tracks), "dropped": self.dropped, "profile": self.profile}
+
+    def merge(self, update: dict):
+        self.spans.extend(update["spans"])
+        self.tracks.update(update["tracks"])
+        self.dropped = update["dropped"]
+        if update.get("profile"):
+            self.profile = update["profile"]
+
+    # ============ EXPORT ============
+    def chrome_trace(self) -> dict:
+        """Trace Event Format: one complete ("X") event per span, one thread per track"""
+        events = [{"ph": "M", "name": "process_name", "pid": 1, "args": {"name": f"PolicySwarm run {self.run_id[:8]}"}}]
+        for name, track in self.tracks.items():
+            events.append({"ph": "M", "name": "thread_name", "pid": 1, "tid": track, "args": {"name": name}})
+            events.append({"ph": "M", "name": "thread_sort_index", "pid": 1, "tid": track, "args": {"sort_index": track}})
+        for name, category, start, duration, track, args in self.spans:
+            events.append({"ph": "X", "name": name, "cat": category, "ts": start, "dur": duration,
+                           "pid": 1, "tid": track, "args": args})
+        return {
+            "traceEvents": events,
+            "displayTimeUnit": "ms",
+            "otherData": {"run_id": self.run_id, "spans": len(self.spans), "dropped": self.dropped}
+        }
+
+    def summary(self) -> dict:
+        """Total time and count per span category"""
+        totals = {}
+        for _, category, _, duration, _, _ in self.spans:
+            entry = totals.setdefault(category, {"spans": 0, "seconds": 0.0})
+            entry["spans"] += 1
+            entry["seconds"] += duration / 1e6
+        for entry in totals.values():
+            entry["seconds"] = round(entry["seconds"], 3)
+        return {"spans": len(self.spans), "dropped": self.dropped, "tracks": len(self.tracks), "by_category": totals,
+                "profiled": self.profile is not None}
+
+def use_trace(trace):
+    """Record spans of this task (and tasks it starts) into `trace`; returns a token for reset_trace"""
+    return _current.set(trace)
+
+def reset_trace(token):
+    _current.reset(token)
+
+class span:
+    """Context manager timing a block; `with span(...) as args:` lets the block add span args"""
+    __slots__ = ("name", "category", "args", "trace", "track", "start", "clock")
+
+    def __init__(self, name: str, category: str = "run", **args):
+        self.name = name
+        self.category = category
+        self.args = args
+        self.trace = _current.get()
+
+    def __enter__(self) -> dict:
+        if self.trace is not None:
+            self.track = self.trace.enter(self.args.get("agent"))
+            self.start = time.time_ns() // 1000
+            self.clock = time.perf_counter_ns()
+        return self.args
+
+    def __exit__(self, exc_type, exc, tb):
+        if self.trace is not None:
+            duration = (time.perf_counter_ns() - self.clock) // 1000
+            if exc_type is not None:
+                self.args["error"] = exc_type.__name__
+            self.trace.add(self.name, self.category, self.start, duration, self.track, self.args)
+        return False
+
+def traced(name: str, category: str = "agent"):
+    """Decorator: span around an agent's async method, tagged with the agent's name"""
+    def decorate(method):
+        @functools.wraps(method)
+        async def wrapper(self, *args, **kwargs):
+            if _current.get() is None:
+                return await method(self, *args, **kwargs)
+            with span(name, category, agent=getattr(self, "name", None) or getattr(self, "role", None)):
+                return await method(self, *args, **kwargs)
+        return wrapper
+    return decorate
+
+# ============ SAMPLING PROFILER ============
+class SamplingProfiler:
+    """Samples one thread's Python stack on a background thread (opt-in: it costs a little CPU)"""
+    def __init__(self, interval_ms: float = 5.0, max_depth: int = 64):
+        self.interval = interval_ms / 1000
+        self.max_depth = max_depth
+        self.samples = Counter()
+        self._target = None
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        """Profile the calling thread (the event loop's)"""
+        self._target = threading.get_ident()
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="policyswarm-profiler", daemon=True)
+        self._thread.start()
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self._target)
+            if frame is None:
+                break
+            stack = []
+            while frame is not None and len(stack) < self.max_depth:
+                code = frame.f_code
+                stack.append(f"{code.co_name} ({code.co_filename.rsplit('/', 1)[-1]}:{code.co_firstlineno})")
+                frame = frame.f_back
+            self.samples[";".join(reversed(stack))] += 1
+
+    def stop(self) -> dict:
+        """Folded stacks -> sample counts"""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+        return dict(self.samples)
+
+def folded_text(profile: dict) -> str:
+    return "\n".join(f"{stack} {count}" for stack, count in sorted(profile.items(), key=lambda item: -item[1])) + "\n"
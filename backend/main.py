@@ -1,12 +1,24 @@
 import asyncio
-from fastapi import FastAPI, BackgroundTasks
+from fastapi import FastAPI, BackgroundTasks, HTTPException, Request
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import PlainTextResponse, StreamingResponse
-from agents.citizen_agent import CitizenAgent, CitizenPersona
-from agents.observer_agent import ObserverAgent
-from agents.architect_agent import ArchitectAgent
-from core.pdf_generator import create_policy_pdf
+from fastapi.responses import JSONResponse, PlainTextResponse, Response, StreamingResponse
+from typing import Optional
+from agents.citizen_agent import CitizenPersona, react_in_batch
+from core.session import SimulationSession, SessionRegistry
+from core.llm import aclose_clients, get_response_cache, get_structured_output_stats, get_resilience_stats
+from core.pacing import DEFAULT_PACING, ndjson_replay
+from core.population import Population
+from core.convergence import ConvergenceDetector
+from core.prompts import RollingSummary
+from core.jobs import JobManager
+from core.run_store import get_run_store, close_run_stores
+from core.report_cache import ReportCache, report_key
+from core import telemetry, tracing
+from contextlib import contextmanager
+from functools import partial
+import numpy as np
 import json
+import random
 
 app = FastAPI()
 
@@ -18,38 +30,98 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+@app.on_event("startup")
+async def start_workers():
+    global job_manager
+    store = get_run_store(config.get("run_store"))
+    if store is not None:
+        # Before any worker starts: whatever is still "running" was cut short by the last shutdown or crash
+        interrupted = store.mark_interrupted()
+        if interrupted:
+            print(f"Marked {interrupted} unfinished run(s) as interrupted (resume them with /api/sessions/{{id}}/resume)")
+    worker_config = config["workers"]
+    if worker_config.get("processes", 0) > 0:
+        job_manager = JobManager(worker_config["processes"], worker_config.get("concurrency_per_worker", 1),
+                                 on_done=prerender_report)
+        job_manager.start(asyncio.get_running_loop())
+    global loop_lag_monitor
+    loop_lag_monitor = asyncio.create_task(telemetry.monitor_loop_lag("api", config["telemetry"]["loop_lag_interval"]))
+
+@app.on_event("shutdown")
+async def shutdown_llm_clients():
+    if loop_lag_monitor is not None:
+        loop_lag_monitor.cancel()
+    if job_manager is not None:
+        job_manager.shutdown()
+    report_cache.shutdown()
+    await aclose_clients()
+    close_run_stores()
+
 # Configuration
 config = {
     "fast_demo": False,
     "max_exchanges": 100,
-    "max_senate_exchanges": 10
+    "max_senate_exchanges": 10,
+    "debate_mode": "sequential",  # "sequential" (one speaker at a time) or "round"
+    "round_size": 4,  # Citizens replying per round in "round" mode
+    "round_concurrency": 4,  # Max concurrent replies within a round
+    "reaction_mode": "individual",  # "individual" (one call per citizen) or "batched"
+    "reaction_batch_size": 5,  # Citizens per call in "batched" mode
+    "convergence": {
+        "enabled": False,  # End the citizen debate early once it stops producing new information (opt-in)
+        "min_exchanges": 20,  # Never stop before this many exchanges
+        "window": 12,  # Recent exchanges the novelty rate is measured over
+        "min_novelty": 0.25,  # Stop when fewer than this share of them were novel
+        "new_term_ratio": 0.3,  # A message is novel if this share of its terms are new to the debate...
+        "max_similarity": 0.6  # ...and it's not this similar (Jaccard) to a recent message
+    },
+    "debate_summary_every": 10,  # Condense older debate messages every N exchanges for reply prompts (0 = off)
+    "stream_tokens": True,  # Push partial agent replies to /api/stream as "token" events
+    "pacing": dict(DEFAULT_PACING),  # Per-event delays used by /api/replay (the engine itself never sleeps)
+    "population": {
+        "size": 0,  # People to generate; 0 uses the built-in personas instead
+        "sample_size": 30,  # Of those, how many are voiced by LLM agents
+        "strata": ["region", "income"],  # Sample allocation and score weighting
+        "seed": 42
+    },
+    "workers": {
+        "processes": 0,  # Simulation worker processes; 0 runs simulations inside the API process
+        # Note: each worker has its own LLM clients, so provider max_concurrency applies per process
+        "concurrency_per_worker": 1  # Simulations each worker runs at once
+    },
+    "run_store": {
+        "enabled": True,  # Persist runs, events, scores, metrics and phase checkpoints (resumable after a restart)
+        "path": "cache/runs.sqlite",
+        "flush_every": 50,  # Log entries buffered per write (checkpoints always flush)
+        "keep_checkpoints": 3  # Per run; resume only needs the latest
+    },
+    "reports": {
+        "render_processes": 1,  # Background processes rendering PDFs; 0 renders on a thread in the API process
+        "cache_entries": 32  # Rendered PDFs kept in memory, keyed by a hash of their inputs
+    },
+    "tracing": {
+        "enabled": True,  # Record a timing span per iteration, phase, exchange, agent step, LLM call and parse
+        "max_spans": 20000,  # Per run; later spans are counted but dropped
+        "profile": False,  # Sample the event loop's Python stack during runs (per run: submit with profile=true)
+        "profile_interval_ms": 5
+    },
+    "telemetry": {
+        "loop_lag_interval": 0.5  # Seconds between event-loop lag samples in the API process
+    },
+    "event_log": {
+        "capacity": 5000,  # Entries kept in memory per session
+        "spill_dir": None  # Directory for evicted entries (JSONL); None drops them
+    }
 }
 
-# State
-logs = []
-debate_history = []
-observer_reports = []
-final_report = ""
-metrics = []
-policy_document = None
-current_iteration = 0
-simulation_paused = False
-cycle_complete = False
-current_policy = ""
-revised_policy = ""
-architect_logs = []  # Real-time architect analysis logs
-senate_chat_logs = []  # Separate Senate chat logs
-
-def log_event(agent_name: str, message: str, role: str = "System", log_type: str = "general"):
-    print(f"[{agent_name}] {message}")
-    log_entry = {"agent": agent_name, "role": role, "message": message, "type": log_type}
-    logs.append(log_entry)
-    
-    # Route to specific log types
-    if log_type == "senate":
-        senate_chat_logs.append(log_entry)
-    elif log_type == "architect":
-        architect_logs.append(log_entry)
+SSE_KEEPALIVE_SECONDS = 15
+job_manager: Optional[JobManager] = None  # Started at startup when config.workers.processes > 0
+loop_lag_monitor: Optional[asyncio.Task] = None
+
+report_cache = ReportCache(config["reports"]["cache_entries"], config["reports"]["render_processes"])
+
+# Sessions (one per submitted policy)
+sessions = SessionRegistry(max_sessions=50)
 
 # Initialize Agents with realistic Indian personas
 personas = [
@@ -105,268 +177,770 @@ personas = [
     )
 ]
 
-citizens = [CitizenAgent(p) for p in personas]
-
-observers = [
-    ObserverAgent(role="Trend Analyst", focus="Social Sentiment & Public Opinion"),
-    ObserverAgent(role="Economic Advisor", focus="Fiscal Impact & Implementation Cost"),
-    ObserverAgent(role="Constitutional Expert", focus="Legal Validity & Rights Protection")
+observer_specs = [
+    {"role": "Trend Analyst", "focus": "Social Sentiment & Public Opinion"},
+    {"role": "Economic Advisor", "focus": "Fiscal Impact & Implementation Cost"},
+    {"role": "Constitutional Expert", "focus": "Legal Validity & Rights Protection"}
 ]
 
-architect = ArchitectAgent()
+def create_session() -> SimulationSession:
+    """Start a fresh session with its own agents"""
+    population_config = config.get("population", {})
+    if not population_config.get("size"):
+        return sessions.create(personas, observer_specs, config)
+    
+    # Only a stratified sample of the generated population gets an LLM agent
+    seed = population_config.get("seed", 42)
+    population = Population.generate(population_config["size"], seed=seed)
+    sample = population.stratified_sample(population_config.get("sample_size", 30), population_config.get("strata"), seed)
+    sampled_personas = [CitizenPersona(**fields) for fields in population.personas_for(sample)]
+    session = sessions.create(sampled_personas, observer_specs, config)
+    session.population, session.population_sample = population, sample
+    return session
+
+def restore_session(run: dict, checkpoint: Optional[dict], events: list) -> SimulationSession:
+    """Rebuild a stored run's session (agents, population sample, log and state up to the checkpoint)"""
+    run_config = run["config"]
+    session = sessions.create([CitizenPersona(**p) for p in run["personas"]], run["observer_specs"], run_config,
+                              session_id=run["run_id"])
+    session.policy_document = run["policy_document"]
+    if run["population"]:
+        # Same seed, same population: only the sample indices needed storing
+        session.population = Population.generate(run["population"]["size"], seed=run["population"]["seed"])
+        session.population_sample = np.asarray(run["population"]["sample"], dtype=np.int64)
+    if checkpoint is not None:
+        session.restore_checkpoint(checkpoint, events)
+    return session
+
+def start_run(session: SimulationSession, policy: str, background_tasks: BackgroundTasks,
+              checkpoint: Optional[dict] = None) -> dict:
+    """Queue the run on a worker process, or run it in this process when there's no pool"""
+    session.run_pending = True  # Cleared when the run finishes (JobManager clears it for worker jobs)
+    if job_manager is not None:
+        job = job_manager.submit(session, policy, checkpoint)
+        return {"job_id": job["job_id"], "job_status": job["status"]}
+    background_tasks.add_task(run_in_process, session, policy, checkpoint)
+    return {}
+
+async def run_in_process(session: SimulationSession, policy: str, checkpoint: Optional[dict] = None):
+    try:
+        await run_simulation(session, policy, checkpoint)
+    finally:
+        session.run_pending = False
+    prerender_report(session)
 
-async def run_simulation(initial_policy: str):
-    global final_report, current_iteration, simulation_paused, cycle_complete
-    global current_policy, revised_policy, architect_logs, senate_chat_logs
+def enable_profiling(session: SimulationSession):
+    """Opt one run into the sampling profiler (tracing is switched on too: the trace holds the profile)"""
+    tracing_config = {**session.config.get("tracing", {}), "enabled": True, "profile": True}
+    session.config["tracing"] = tracing_config
+    if session.trace is None:
+        session.trace = tracing.Trace(session.session_id, tracing_config.get("max_spans", 20000))
+
+def update_run_control(session: SimulationSession):
+    """Forward pause/stop to the worker running this session, if any"""
+    if job_manager is not None and job_manager.has(session.session_id):
+        job_manager.update_control(session.session_id, paused=session.simulation_paused, stopped=session.cycle_complete)
+
+def get_session(session_id: Optional[str] = None) -> SimulationSession:
+    """Resolve a session by ID, defaulting to the most recent one"""
+    if session_id:
+        session = sessions.get(session_id)
+        if session is None:
+            raise HTTPException(status_code=404, detail=f"Unknown session: {session_id}")
+        return session
+    # No session requested: use the latest run, or an idle placeholder before any run exists
+    return sessions.latest() or idle_session()
+
+_idle_session: Optional[SimulationSession] = None
+
+def idle_session() -> SimulationSession:
+    """Placeholder answering polls before the first run (built once: it creates a full set of agents)"""
+    global _idle_session
+    if _idle_session is None:
+        _idle_session = SimulationSession("idle", personas, observer_specs, config)
+    return _idle_session
+
+async def run_citizen_phase(session: SimulationSession, iteration: int) -> dict:
+    """Level 1: reactions, then the citizen debate. Returns what the later phases need."""
+    log_event = session.log_event
+    citizens, config = session.citizens, session.config
     
-    current_policy = initial_policy
-    cycle_complete = False
+    log_event("System", "Phase 1: Citizen Swarm Debate", log_type="general")
     
-    for iteration in range(1, 4):
-        current_iteration = iteration
-        
-        # Check if paused
-        while simulation_paused:
-            await asyncio.sleep(1)
-        
-        if cycle_complete:
-            break
-            
-        log_event("System", f"═══════════════════════════════════════")
-        log_event("System", f"  ITERATION {iteration}/3 STARTING")
-        log_event("System", f"═══════════════════════════════════════")
-        
-        # LEVEL 1: Citizen Conversation
-        log_event("System", "Phase 1: Citizen Swarm Debate", log_type="general")
-        
-        # Reset citizens for new iteration (but keep memory)
-        if iteration > 1:
-            for c in citizens:
-                c.reset_for_new_iteration(current_policy, iteration)
-        
-        # Initial reactions
-        tasks = [c.react_to_policy(current_policy, iteration) for c in citizens]
-        reactions = await asyncio.gather(*tasks)
-        
-        citizen_scores = []
-        conversation_messages = []
-        citizen_feedback = []
-        
-        for r in reactions:
-            emotional = r.get('emotional_state', 'neutral')
-            msg = f"[{emotional.upper()}] {r['message']} (Score: {r['score']})"
-            log_event(r["agent"], msg, r["role"])
-            conversation_messages.append({"agent": r["agent"], "role": r["role"], "message": r['message']})
-            debate_history.append(r)
+    digest = session.debate_digest
+    digest.start_iteration(iteration)
+    
+    # Reset citizens for new iteration (but keep memory)
+    if iteration > 1:
+        for c in citizens:
+            c.reset_for_new_iteration(session.current_policy, iteration)
+    
+    # Initial reactions
+    streams = [session.token_stream(c.name, c.role) for c in citizens]
+    if config.get("reaction_mode") == "batched":
+        # One call per group shares the policy text; batched replies aren't token-streamed
+        batch_size = max(1, config.get("reaction_batch_size", 5))
+        groups = [citizens[i:i + batch_size] for i in range(0, len(citizens), batch_size)]
+        with tracing.span("reactions", "step", citizens=len(citizens), batches=len(groups)):
+            batches = await asyncio.gather(*[react_in_batch(group, session.current_policy, iteration) for group in groups])
+        reactions = [r for batch in batches for r in batch]
+    else:
+        tasks = [c.react_to_policy(session.current_policy, iteration, on_token=st.on_token) for c, st in zip(citizens, streams)]
+        with tracing.span("reactions", "step", citizens=len(citizens)):
+            reactions = await asyncio.gather(*tasks)
+    
+    citizen_scores = []
+    conversation_messages = []
+    citizen_feedback = []
+    
+    for r, stream in zip(reactions, streams):
+        emotional = r.get('emotional_state', 'neutral')
+        msg = f"[{emotional.upper()}] {r['message']} (Score: {r['score'] if r['score'] is not None else 'n/a'})"
+        log_event(r["agent"], msg, r["role"], stream_id=stream.stream_id)
+        conversation_messages.append({"agent": r["agent"], "role": r["role"], "message": r['message']})
+        digest.add_reaction(r)
+        session.debate_history.append(r)
+        if r['score'] is not None:  # Unparseable replies don't count as a vote
             citizen_scores.append(r['score'])
-            citizen_feedback.append(r)
-            await asyncio.sleep(0.1)
-        
-        # Conversational debate
-        max_exchanges = config["max_exchanges"]
-        log_event("System", f"Citizens engaging in conversation ({max_exchanges} exchanges)...")
-        
-        import random
-        active_citizens = list(citizens)
-        exchange_count = len(reactions)
+        citizen_feedback.append(r)
+    
+    # Conversational debate
+    max_exchanges = config["max_exchanges"]
+    log_event("System", f"Citizens engaging in conversation ({max_exchanges} exchanges)...")
+    
+    active_citizens = list(citizens)
+    exchange_count = len(reactions)
+    convergence_config = dict(config.get("convergence", {}))
+    detector = ConvergenceDetector(**{k: v for k, v in convergence_config.items() if k != "enabled"})
+    for r in reactions:
+        detector.seed(r["message"])
+    # Replies see a rolling summary of older messages plus the latest ones, at a fixed prompt size
+    rolling_summary = RollingSummary(config.get("debate_summary_every", 10))
+    
+    def record_reply(speaker, reply_data, stream):
+        if reply_data.get("failed"):  # No usable reply (provider down or unparseable); the turn still counts
+            return
+        detector.observe(reply_data["message"], reply_data.get("introduces_new_point", False), reply_data.get("references_other", ""))
+        if reply_data["should_exit"]:
+            exit_msg = f"{reply_data['message']} [Leaving: {reply_data['exit_reason']}]"
+            log_event(speaker.name, exit_msg, speaker.role, stream_id=stream.stream_id)
+            conversation_messages.append({"agent": speaker.name, "role": speaker.role, "message": exit_msg})
+            digest.add_message(speaker.name, speaker.role, reply_data['message'], reply_data.get("emotional_state"), left=True)
+            active_citizens.remove(speaker)
+            log_event("System", f"👋 {speaker.name} has left the conversation.")
+        else:
+            log_event(speaker.name, reply_data['message'], speaker.role, stream_id=stream.stream_id)
+            conversation_messages.append({"agent": speaker.name, "role": speaker.role, "message": reply_data['message']})
+            digest.add_message(speaker.name, speaker.role, reply_data['message'], reply_data.get("emotional_state"))
+            session.debate_history.append({"agent": speaker.name, "role": speaker.role, "message": reply_data['message']})
+        rolling_summary.update(conversation_messages)
+    
+    # "round" mode: several citizens answer the same snapshot concurrently
+    round_mode = config.get("debate_mode") == "round"
+    round_limit = asyncio.Semaphore(config.get("round_concurrency", 4))
+    
+    async def bounded_reply(speaker, summary, snapshot, exchange_no, stream):
+        async with round_limit:
+            return await speaker.reply_to_conversation(
+                session.current_policy, snapshot, exchange_no, iteration, on_token=stream.on_token, summary=summary
+            )
+    
+    stop_reason = "max_exchanges"
+    while exchange_count < max_exchanges:
+        if len(active_citizens) <= 2:
+            stop_reason = "too_few_citizens"
+            break
+        if session.simulation_paused or session.cycle_complete:
+            stop_reason = "interrupted"
+            break
+        if convergence_config.get("enabled") and detector.saturated():
+            stop_reason = "saturated"
+            log_event("System", f"🔁 Debate saturated: only {detector.novelty:.0%} of the last {detector.window} exchanges added anything new.")
+            break
         
-        while exchange_count < max_exchanges and len(active_citizens) > 2:
-            if simulation_paused or cycle_complete:
-                break
-                
+        if round_mode:
+            round_size = min(config.get("round_size", 4), len(active_citizens), max_exchanges - exchange_count)
+            speakers = random.sample(active_citizens, round_size)
+            summary, snapshot = rolling_summary.context(conversation_messages)
+            streams = [session.token_stream(speaker.name, speaker.role) for speaker in speakers]
+            with tracing.span(f"round {exchange_count}", "exchange", speakers=len(speakers)):
+                replies = await asyncio.gather(*[
+                    bounded_reply(speaker, summary, snapshot, exchange_count + i, stream)
+                    for i, (speaker, stream) in enumerate(zip(speakers, streams))
+                ])
+            # Append in speaker order so the transcript doesn't depend on which reply landed first
+            for speaker, reply_data, stream in zip(speakers, replies, streams):
+                record_reply(speaker, reply_data, stream)
+            exchange_count += len(speakers)
+        else:
             speaker = random.choice(active_citizens)
+            stream = session.token_stream(speaker.name, speaker.role)
+            summary, recent = rolling_summary.context(conversation_messages)
             
-            reply_data = await speaker.reply_to_conversation(
-                current_policy, 
-                conversation_messages, 
-                exchange_count,
-                iteration
-            )
-            
-            if reply_data["should_exit"]:
-                exit_msg = f"{reply_data['message']} [Leaving: {reply_data['exit_reason']}]"
-                log_event(speaker.name, exit_msg, speaker.role)
-                conversation_messages.append({"agent": speaker.name, "role": speaker.role, "message": exit_msg})
-                active_citizens.remove(speaker)
-                log_event("System", f"👋 {speaker.name} has left the conversation.")
-            else:
-                log_event(speaker.name, reply_data['message'], speaker.role)
-                conversation_messages.append({"agent": speaker.name, "role": speaker.role, "message": reply_data['message']})
-                debate_history.append({"agent": speaker.name, "role": speaker.role, "message": reply_data['message']})
-            
+            with tracing.span(f"exchange {exchange_count}", "exchange", speaker=speaker.name):
+                reply_data = await speaker.reply_to_conversation(
+                    session.current_policy, 
+                    recent, 
+                    exchange_count,
+                    iteration,
+                    on_token=stream.on_token,
+                    summary=summary
+                )
+                record_reply(speaker, reply_data, stream)
             exchange_count += 1
-            await asyncio.sleep(0.3)
-        
-        log_event("System", f"Citizen debate concluded: {exchange_count} exchanges.")
-        avg_citizen_score = sum(citizen_scores) / len(citizen_scores) if citizen_scores else 0
-        log_event("System", f"📊 Average Citizen Satisfaction: {avg_citizen_score:.1f}%")
-        
-        # LEVEL 2: Senate Strategic Debate
-        log_event("System", "Phase 2: Senate Strategic Debate", log_type="senate")
-        senate_chat_logs = []  # Clear for new iteration
-        
-        # Reset observers for new iteration
-        if iteration > 1:
-            citizen_summary = " ".join([f['message'][:50] for f in citizen_feedback[:5]])
-            for o in observers:
-                o.reset_for_new_iteration(current_policy, citizen_summary, iteration)
-        
-        # Initial Senate analysis
-        full_conversation = "\n".join([f"{m['agent']}: {m['message']}" for m in conversation_messages[:20]])
-        
-        tasks = [o.analyze_debate(current_policy, citizen_feedback, iteration) for o in observers]
+    
+    rolling_summary.close()
+    log_event("System", f"Citizen debate concluded: {exchange_count} exchanges ({stop_reason.replace('_', ' ')}).")
+    avg_citizen_score = sum(citizen_scores) / len(citizen_scores) if citizen_scores else 0
+    population_estimate = None
+    if session.population is not None:
+        # Weight the sampled reactions back up to the whole population
+        strata = config["population"].get("strata")
+        session.population.record_scores(session.population_sample, [r["score"] for r in reactions])
+        population_estimate = session.population.estimate(session.population_sample, strata)
+        if population_estimate["mean"] is not None:
+            avg_citizen_score = population_estimate["mean"]
+            log_event("System", f"📊 Population estimate: {avg_citizen_score:.1f}% ± {1.96 * population_estimate['stderr']:.1f} "
+                                f"({population_estimate['scored']} voiced of {population_estimate['population']:,})")
+    log_event("System", f"📊 Average Citizen Satisfaction: {avg_citizen_score:.1f}%")
+    
+    return {
+        "citizen_feedback": citizen_feedback,
+        "avg_citizen_score": avg_citizen_score,
+        "population_estimate": population_estimate,
+        "debate": {"stop_reason": stop_reason, "total_exchanges": exchange_count, **detector.summary()}
+    }
+
+async def run_senate_phase(session: SimulationSession, iteration: int, citizen_phase: dict) -> dict:
+    """Level 2: Senate analysis, debate and verdicts. Records the iteration's metrics."""
+    log_event = session.log_event
+    observers, config = session.observers, session.config
+    citizen_feedback = citizen_phase["citizen_feedback"]
+    avg_citizen_score = citizen_phase["avg_citizen_score"]
+    
+    log_event("System", "Phase 2: Senate Strategic Debate", log_type="senate")
+    session.start_senate_view()  # Clear for new iteration
+    
+    # Reset observers for new iteration
+    if iteration > 1:
+        for o in observers:
+            o.reset_for_new_iteration(session.current_policy, session.debate_digest.headline(), iteration)
+    
+    # The whole citizen debate, condensed (built once, shared by every Senate prompt)
+    debate_digest = session.debate_digest.render()
+    
+    streams = [session.token_stream(o.role, o.focus, "senate") for o in observers]
+    tasks = [o.analyze_debate(session.current_policy, debate_digest, iteration, on_token=st.on_token) for o, st in zip(observers, streams)]
+    with tracing.span("analysis", "step", observers=len(observers)):
         initial_reports = await asyncio.gather(*tasks)
-        
-        senate_scores = []
-        senate_messages = []
-        
-        for r in initial_reports:
-            msg = f"[INITIAL] {r['message']} (Viability: {r['score']}%, Recommendation: {r.get('recommendation', 'pending')})"
-            log_event(r["agent"], msg, r["focus"], log_type="senate")
-            senate_messages.append({"agent": r["agent"], "role": r["focus"], "message": r['message']})
+    
+    senate_scores = []
+    senate_messages = []
+    
+    for r, stream in zip(initial_reports, streams):
+        viability = f"{r['score']}%" if r['score'] is not None else "n/a"
+        msg = f"[INITIAL] {r['message']} (Viability: {viability}, Recommendation: {r.get('recommendation', 'pending')})"
+        log_event(r["agent"], msg, r["focus"], log_type="senate", stream_id=stream.stream_id)
+        senate_messages.append({"agent": r["agent"], "role": r["focus"], "message": r['message']})
+        if r['score'] is not None:
             senate_scores.append(r['score'])
-            observer_reports.append(r)
-            await asyncio.sleep(0.3)
-        
-        # Senate conversation
-        max_senate_exchanges = config["max_senate_exchanges"]
-        log_event("System", f"Senate strategic discussion ({max_senate_exchanges} exchanges)...", log_type="senate")
-        
-        senate_exchange_count = 0
-        while senate_exchange_count < max_senate_exchanges:
-            if simulation_paused or cycle_complete:
-                break
-                
-            speaker = random.choice(observers)
+        session.observer_reports.append(r)
+    
+    # Senate conversation
+    max_senate_exchanges = config["max_senate_exchanges"]
+    log_event("System", f"Senate strategic discussion ({max_senate_exchanges} exchanges)...", log_type="senate")
+    
+    senate_exchange_count = 0
+    while senate_exchange_count < max_senate_exchanges:
+        if session.simulation_paused or session.cycle_complete:
+            break
             
+        speaker = random.choice(observers)
+        stream = session.token_stream(speaker.role, speaker.focus, "senate")
+        
+        with tracing.span(f"senate exchange {senate_exchange_count}", "exchange", speaker=speaker.role):
             reply_data = await speaker.reply_to_senate_debate(
-                current_policy,
-                full_conversation,
+                session.current_policy,
+                debate_digest,
                 senate_messages,
                 senate_exchange_count,
-                iteration
+                iteration,
+                on_token=stream.on_token
             )
-            
-            log_event(speaker.role, reply_data['message'], speaker.focus, log_type="senate")
-            senate_messages.append({"agent": speaker.role, "role": speaker.focus, "message": reply_data['message']})
-            
-            senate_exchange_count += 1
-            await asyncio.sleep(0.4)
         
-        # Final verdict from each Senate member
-        log_event("System", "Senate finalizing verdicts...", log_type="senate")
+        if not reply_data.get("failed"):  # No usable reply (provider down or unparseable); the turn still counts
+            log_event(speaker.role, reply_data['message'], speaker.focus, log_type="senate", stream_id=stream.stream_id)
+            senate_messages.append({"agent": speaker.role, "role": speaker.focus, "message": reply_data['message']})
         
-        tasks = [o.final_verdict(current_policy, senate_messages, avg_citizen_score, iteration) for o in observers]
+        senate_exchange_count += 1
+    
+    # Final verdict from each Senate member
+    log_event("System", "Senate finalizing verdicts...", log_type="senate")
+    
+    streams = [session.token_stream(o.role, o.focus, "senate") for o in observers]
+    tasks = [o.final_verdict(session.current_policy, senate_messages, avg_citizen_score, iteration, on_token=st.on_token) for o, st in zip(observers, streams)]
+    with tracing.span("verdicts", "step", observers=len(observers)):
         final_verdicts = await asyncio.gather(*tasks)
-        
-        senate_scores = []
-        for v in final_verdicts:
-            log_event(v["agent"], v['message'], v["focus"], log_type="senate")
+    
+    senate_scores = []
+    for v, stream in zip(final_verdicts, streams):
+        log_event(v["agent"], v['message'], v["focus"], log_type="senate", stream_id=stream.stream_id)
+        if v['score'] is not None:
             senate_scores.append(v['score'])
-            observer_reports.append(v)
-            await asyncio.sleep(0.3)
-        
-        avg_senate_score = sum(senate_scores) / len(senate_scores) if senate_scores else 0
-        log_event("System", f"📊 Average Senate Viability: {avg_senate_score:.1f}%", log_type="senate")
-        
-        # Record metrics
-        metrics.append({
-            "iteration": iteration,
-            "citizen_score": round(avg_citizen_score, 1),
-            "senate_score": round(avg_senate_score, 1)
-        })
-        
-        # Check consensus
-        if avg_citizen_score >= 75 and avg_senate_score >= 80:
-            log_event("System", "🎉 CONSENSUS REACHED!")
-            cycle_complete = True
-            final_report = architect.get_downloadable_policy(current_policy, metrics)
-            break
-        
-        # LEVEL 3: Architect Analysis & Revision
-        log_event("System", "Phase 3: Architect Analysis", log_type="architect")
-        architect_logs = []  # Clear for new iteration
-        
-        log_event("Architect", "Beginning step-by-step policy analysis...", "Policy Architect", log_type="architect")
-        
-        # Run architect analysis
-        synthesis = await architect.generate_report(
-            current_policy, 
-            observer_reports, 
-            citizen_feedback, 
-            iteration
-        )
-        
-        # Log architect's steps
-        for step_log in architect.get_analysis_logs():
-            log_event("Architect", f"[{step_log['step']}] {step_log['content'][:200]}...", "Analysis", log_type="architect")
-            await asyncio.sleep(0.2)
-        
-        # Update policy for next iteration
-        revised_policy = synthesis.get("new_policy", current_policy)
-        final_report = synthesis.get("report_markdown", "")
-        
-        log_event("System", f"Policy revised for iteration {iteration + 1}")
-        log_event("Architect", f"Changes: {json.dumps(synthesis.get('diff', {}).get('summary', 'Policy updated'))}", "Policy Architect", log_type="architect")
-        
-        current_policy = revised_policy
+        session.observer_reports.append(v)
+    
+    avg_senate_score = sum(senate_scores) / len(senate_scores) if senate_scores else 0
+    log_event("System", f"📊 Average Senate Viability: {avg_senate_score:.1f}%", log_type="senate")
+    
+    # Record metrics
+    session.metrics.append({
+        "iteration": iteration,
+        "citizen_score": round(avg_citizen_score, 1),
+        "senate_score": round(avg_senate_score, 1)
+    })
+    if citizen_phase["population_estimate"] is not None:
+        session.metrics[-1]["citizen_stderr"] = citizen_phase["population_estimate"]["stderr"]
+    if "debate" in citizen_phase:  # Older checkpoints predate the convergence stats
+        session.metrics[-1]["debate_stop"] = citizen_phase["debate"]["stop_reason"]
+        session.metrics[-1]["debate_exchanges"] = citizen_phase["debate"]["total_exchanges"]
+    
+    return {
+        "avg_senate_score": avg_senate_score,
+        "verdicts": [{"agent": v["agent"], "role": v["focus"], "score": v["score"]} for v in final_verdicts]
+    }
+
+async def run_architect_phase(session: SimulationSession, iteration: int, citizen_feedback: list):
+    """Level 3: Architect analysis and the revised policy for the next iteration"""
+    log_event = session.log_event
+    architect = session.architect
+    
+    log_event("System", "Phase 3: Architect Analysis", log_type="architect")
+    session.start_architect_view()  # Clear for new iteration
+    
+    log_event("Architect", "Beginning step-by-step policy analysis...", "Policy Architect", log_type="architect")
+    
+    # Run architect analysis (the revised policy text streams while it's written)
+    revision_stream = session.token_stream("Architect", "Policy Architect", "architect")
+    synthesis = await architect.generate_report(
+        session.current_policy, 
+        session.observer_reports, 
+        citizen_feedback, 
+        iteration,
+        on_revision_token=revision_stream.on_token,
+        debate_digest=session.debate_digest.render()
+    )
+    
+    # Log architect's steps
+    for step_log in architect.get_analysis_logs():
+        log_event("Architect", f"[{step_log['step']}] {step_log['content'][:200]}...", "Analysis", log_type="architect")
+    
+    # Update policy for next iteration
+    session.revised_policy = synthesis.get("new_policy", session.current_policy)
+    session.final_report = synthesis.get("report_markdown", "")
     
-    if not cycle_complete:
-        log_event("System", "⚠️ Max iterations reached. Best effort policy generated.")
-        final_report = architect.get_downloadable_policy(current_policy, metrics)
+    log_event("System", f"Policy revised for iteration {iteration + 1}")
+    log_event("Architect", f"Changes: {json.dumps(synthesis.get('diff', {}).get('summary', 'Policy updated'))}", "Policy Architect", log_type="architect", stream_id=revision_stream.stream_id)
     
-    cycle_complete = True
-    log_event("System", "Simulation complete. Policy ready for download.")
+    session.current_policy = session.revised_policy
+
+@contextmanager
+def phase_scope(session: SimulationSession, phase: str, iteration: int):
+    """Tag the phase's LLM calls and time it as a span"""
+    with telemetry.tagged(run=session.session_id, phase=phase, iteration=iteration), \
+            tracing.span(phase, "phase", iteration=iteration):
+        yield
+
+async def run_simulation(session: SimulationSession, initial_policy: str, checkpoint: Optional[dict] = None):
+    """Up to 3 iterations of citizens -> Senate -> Architect, checkpointed after each phase.
+
+    With `checkpoint`, the session has already been restored from it and the
+    run picks up with the phase after the checkpointed one.
+    """
+    log_event = session.log_event
+    architect = session.architect
+    store = get_run_store(session.config.get("run_store"))
+    
+    start_iteration, done_phase, phase_data = 1, None, {}
+    if checkpoint is None:
+        session.current_policy = initial_policy
+        session.cycle_complete = False
+        session.reset_agents()
+        if store is not None:
+            await asyncio.to_thread(store.start_run, session, initial_policy)
+    else:
+        start_iteration, done_phase, phase_data = checkpoint["iteration"], checkpoint["phase"], dict(checkpoint["phase_data"])
+        if done_phase == "architect":
+            start_iteration, done_phase, phase_data = start_iteration + 1, None, {}
+        if store is not None:
+            await asyncio.to_thread(store.resume_run, session.session_id, checkpoint["event_seq"])
+    if store is not None:
+        session.event_sinks.append(partial(store.record_event, session.session_id))
+    if checkpoint is not None:
+        log_event("System", f"↻ Resuming from checkpoint: iteration {checkpoint['iteration']}, after the {checkpoint['phase']} phase")
+    
+    async def save_checkpoint(iteration: int, phase: str, scores: list = ()):
+        if store is not None:
+            with tracing.span("checkpoint", "store", phase=phase):
+                state = session.checkpoint_state(iteration, phase, phase_data)
+                # Serialising and committing the checkpoint is disk work: keep it off the event loop
+                await asyncio.to_thread(store.checkpoint, session.session_id, state, scores, list(session.metrics))
+    
+    # Spans from this task and the tasks it starts go to the session's trace
+    trace_token = tracing.use_trace(session.trace)
+    tracing_config = session.config.get("tracing", {})
+    profiler = None
+    if session.trace is not None and tracing_config.get("profile"):
+        profiler = tracing.SamplingProfiler(tracing_config.get("profile_interval_ms", 5))
+        profiler.start()
+    
+    consensus = False
+    try:
+        for iteration in range(start_iteration, 4):
+            session.current_iteration = iteration
+            with tracing.span(f"iteration {iteration}", "iteration"):
+                # Check if paused
+                while session.simulation_paused:
+                    await asyncio.sleep(1)
+                
+                if session.cycle_complete:
+                    break
+                
+                if done_phase is None:
+                    log_event("System", f"═══════════════════════════════════════")
+                    log_event("System", f"  ITERATION {iteration}/3 STARTING")
+                    log_event("System", f"═══════════════════════════════════════")
+                    
+                    with phase_scope(session, "citizens", iteration):
+                        phase_data = await run_citizen_phase(session, iteration)
+                    await save_checkpoint(iteration, "citizens", [
+                        {"agent": r["agent"], "role": r["role"], "score": r["score"]} for r in phase_data["citizen_feedback"]
+                    ])
+                
+                if done_phase in (None, "citizens"):
+                    with phase_scope(session, "senate", iteration):
+                        senate = await run_senate_phase(session, iteration, phase_data)
+                    phase_data["avg_senate_score"] = senate["avg_senate_score"]
+                    await save_checkpoint(iteration, "senate", senate["verdicts"])
+                
+                # Check consensus
+                if phase_data["avg_citizen_score"] >= 75 and phase_data["avg_senate_score"] >= 80:
+                    log_event("System", "🎉 CONSENSUS REACHED!")
+                    session.cycle_complete = consensus = True
+                    session.final_report = architect.get_downloadable_policy(session.current_policy, session.metrics)
+                    break
+                
+                with phase_scope(session, "architect", iteration):
+                    await run_architect_phase(session, iteration, phase_data["citizen_feedback"])
+                done_phase, phase_data = None, {}
+                await save_checkpoint(iteration, "architect")
+            
+        stopped = session.cycle_complete and not consensus
+        if not session.cycle_complete:
+            log_event("System", "⚠️ Max iterations reached. Best effort policy generated.")
+            session.final_report = architect.get_downloadable_policy(session.current_policy, session.metrics)
+        
+        session.cycle_complete = True
+        log_event("System", "Simulation complete. Policy ready for download.")
+        if store is not None:
+            await asyncio.to_thread(store.finish_run, session.session_id, "stopped" if stopped else "complete",
+                                    session.final_report, list(session.metrics))
+    except Exception:
+        if store is not None:
+            await asyncio.to_thread(store.finish_run, session.session_id, "failed")
+        raise
+    finally:
+        if profiler is not None:
+            session.trace.profile = profiler.stop()
+        tracing.reset_trace(trace_token)
 
 # API Endpoints
+# Every run-scoped endpoint takes an optional session_id; without it the most recent session is used.
 @app.get("/logs")
-def get_logs():
-    return logs
+def get_logs(session_id: Optional[str] = None, since: int = 0):
+    """Log entries with seq >= since (pass the last seen seq + 1 to poll incrementally)"""
+    return get_session(session_id).logs_since(since)
+
+def format_sse(event: str, data, event_id: Optional[int] = None) -> str:
+    lines = [f"event: {event}"]
+    if event_id is not None:
+        lines.append(f"id: {event_id}")
+    lines.append(f"data: {json.dumps(data)}")
+    return "\n".join(lines) + "\n\n"
+
+async def sse_log_stream(request: Request, session: SimulationSession, since: int, follow_latest: bool = False):
+    """Push each log entry as it's produced.
+
+    A stream pinned to a session ends once that run completes. An unpinned
+    stream (no session_id) instead hands over with a "session" event as soon
+    as a newer session is started, so dashboards can reconnect to it.
+    A "view" event carries the first seq of the current iteration's Senate and
+    Architect views whenever it moves (like /senate-logs and /architect-logs).
+    """
+    cursor = since
+    completed_sent = False
+    view = None
+    tokens = session.subscribe_tokens()
+    try:
+        while not await request.is_disconnected():
+            # Partial replies first: the log entry that completes a stream comes after its tokens
+            while not tokens.empty():
+                yield format_sse("token", tokens.get_nowait())
+            # Before the entries, so the client can drop the previous iteration's ones as they arrive
+            if view != (session.senate_since, session.architect_since):
+                view = (session.senate_since, session.architect_since)
+                yield format_sse("view", {"senate_since": view[0], "architect_since": view[1]})
+            for entry in session.logs_since(cursor):
+                yield format_sse("log", entry, entry["seq"])
+            cursor = session.events.next_seq
+            if follow_latest:
+                latest = sessions.latest()
+                if latest is not None and latest is not session:
+                    yield format_sse("session", {"session_id": latest.session_id})
+                    return
+            if session.cycle_complete and not completed_sent:
+                yield format_sse("complete", session.summary())
+                completed_sent = True
+                if not follow_latest:
+                    return
+            if session.cycle_complete:
+                await asyncio.sleep(1)  # Only waiting for a newer session now
+                continue
+            await session.wait_for_logs(cursor, timeout=1 if follow_latest else SSE_KEEPALIVE_SECONDS, tokens=tokens)
+            if session.events.next_seq == cursor and tokens.empty() and not session.cycle_complete:
+                yield ": keep-alive\n\n"
+    finally:
+        session.unsubscribe_tokens(tokens)
+
+@app.get("/api/stream")
+async def stream_logs(request: Request, session_id: Optional[str] = None, since: int = 0):
+    """Server-Sent Events stream of a session's log (resumes from Last-Event-ID)"""
+    session = get_session(session_id)
+    last_event_id = request.headers.get("last-event-id")
+    if last_event_id and last_event_id.isdigit():
+        since = int(last_event_id) + 1
+    return StreamingResponse(
+        sse_log_stream(request, session, since, follow_latest=not session_id),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
 
 @app.get("/citizen-logs")
-def get_citizen_logs():
+def get_citizen_logs(session_id: Optional[str] = None):
     """Get only Citizen debate logs (excludes senate and architect)"""
-    return [l for l in logs if l.get("type", "general") not in ["senate", "architect"]]
+    return get_session(session_id).events.by_type("general")
 
 @app.get("/senate-logs")
-def get_senate_logs():
+def get_senate_logs(session_id: Optional[str] = None):
     """Get only Senate conversation logs"""
-    return senate_chat_logs
+    return get_session(session_id).senate_chat_logs
 
 @app.get("/architect-logs")
-def get_architect_logs():
+def get_architect_logs(session_id: Optional[str] = None):
     """Get real-time Architect analysis logs"""
-    return architect_logs
+    return get_session(session_id).architect_logs
+
+@app.get("/api/replay")
+def replay_logs(session_id: Optional[str] = None, speed: float = 1.0, start: int = 0):
+    """Replay a session's event log at human pace (NDJSON stream)"""
+    session = get_session(session_id)
+    return StreamingResponse(
+        ndjson_replay(session.events, session.config.get("pacing"), speed, start),
+        media_type="application/x-ndjson"
+    )
 
 @app.get("/metrics")
-def get_metrics():
-    return metrics
+def get_metrics(session_id: Optional[str] = None):
+    return get_session(session_id).metrics
+
+@app.get("/metrics/prometheus")
+def get_prometheus_metrics():
+    """LLM call, event-loop and simulation metrics in the Prometheus text format (all processes)"""
+    telemetry.registry.set("policyswarm_active_simulations", (), sum(s.is_running() for s in sessions.all()))
+    if job_manager is not None:
+        for status in ("queued", "running", "complete", "failed", "cancelled"):
+            telemetry.registry.set("policyswarm_jobs", (status,), sum(job["status"] == status for job in job_manager.all()))
+    return PlainTextResponse(telemetry.registry.render(), media_type="text/plain; version=0.0.4")
+
+@app.get("/api/llm-calls")
+def get_llm_calls(limit: int = 100, session_id: Optional[str] = None):
+    """Most recent LLM calls with their tags and timings, plus time per phase and agent"""
+    calls = telemetry.registry.calls(session_id)
+    return {**telemetry.registry.call_summary(session_id), "recent": calls[-limit:] if limit > 0 else []}
+
+@app.get("/api/population")
+def get_population(session_id: Optional[str] = None):
+    """Population-weighted satisfaction, overall and per segment (latest iteration)"""
+    session = get_session(session_id)
+    if session.population is None:
+        if session.population_summary is not None:  # Run happened in a worker process
+            return {"enabled": True, **session.population_summary}
+        return {"enabled": False}
+    strata = session.config["population"].get("strata")
+    return {"enabled": True, **session.population.summary(session.population_sample, strata)}
+
+@app.get("/api/agent-state")
+def get_agent_state(session_id: Optional[str] = None):
+    """Bounded memory of each agent in a session (for debugging prompts)"""
+    return get_session(session_id).agent_snapshots()
 
 @app.get("/agents")
 def get_agents():
     return [p.dict() for p in personas]
 
 @app.get("/report")
-def get_report():
-    return {"report": final_report}
+def get_report(session_id: Optional[str] = None):
+    return {"report": get_session(session_id).final_report}
 
 @app.get("/status")
-def get_status():
+def get_status(session_id: Optional[str] = None):
     """Get current simulation status"""
+    session = get_session(session_id)
     return {
-        "iteration": current_iteration,
-        "paused": simulation_paused,
-        "complete": cycle_complete,
-        "current_policy": current_policy[:200] if current_policy else ""
+        "session_id": session.session_id,
+        "iteration": session.current_iteration,
+        "paused": session.simulation_paused,
+        "complete": session.cycle_complete,
+        "current_policy": session.current_policy[:200] if session.current_policy else ""
     }
 
+@app.get("/api/sessions")
+def list_sessions():
+    """List all live simulation sessions"""
+    return [s.summary() for s in sessions.all()]
+
+@app.delete("/api/sessions/{session_id}")
+def delete_session(session_id: str):
+    """Stop a session and drop its state"""
+    session = get_session(session_id)
+    session.cycle_complete = True
+    session.simulation_paused = False
+    if job_manager is not None and job_manager.has(session_id):
+        job_manager.cancel(session_id)
+    session.notify_listeners()
+    sessions.remove(session_id)
+    return {"status": "Session deleted", "session_id": session_id}
+
+@app.get("/api/sessions/{session_id}/trace")
+def get_session_trace(session_id: str, summary: bool = False):
+    """The run's timeline in Chrome trace format (open in ui.perfetto.dev or chrome://tracing)"""
+    session = get_session(session_id)
+    if session.trace is None:
+        raise HTTPException(status_code=404, detail="Tracing was disabled for this run")
+    if summary:
+        return session.trace.summary()
+    return JSONResponse(session.trace.chrome_trace(),
+                        headers={"Content-Disposition": f"attachment; filename=trace-{session_id[:8]}.json"})
+
+@app.get("/api/sessions/{session_id}/profile")
+def get_session_profile(session_id: str):
+    """Sampled event-loop stacks of a run submitted with profile=true, as folded stacks (flamegraph.pl, speedscope).
+
+    In-process runs share the API's event loop, so their samples include request handling too.
+    """
+    session = get_session(session_id)
+    if session.trace is None or session.trace.profile is None:
+        raise HTTPException(status_code=404, detail="No profile for this run (submit with profile=true; ready when the run ends)")
+    return PlainTextResponse(tracing.folded_text(session.trace.profile))
+
+@app.post("/api/sessions/{session_id}/resume")
+async def resume_session(session_id: str, background_tasks: BackgroundTasks):
+    """Restart a stored run from its last checkpoint (e.g. after a server restart)"""
+    store = get_run_store(config.get("run_store"))
+    if store is None:
+        raise HTTPException(status_code=400, detail="Run store is disabled")
+    run = await asyncio.to_thread(store.get_run, session_id)
+    if run is None:
+        raise HTTPException(status_code=404, detail=f"Unknown run: {session_id}")
+    live = sessions.get(session_id)
+    if live is not None and (live.is_running() or live.run_pending):
+        raise HTTPException(status_code=409, detail="Run is still in progress")
+    if run["status"] == "complete":
+        raise HTTPException(status_code=409, detail="Run already complete")
+    
+    # Without a checkpoint the run restarts from the beginning under the same id
+    checkpoint = await asyncio.to_thread(store.latest_checkpoint, session_id)
+    events = await asyncio.to_thread(store.events, session_id, 0, checkpoint["event_seq"]) if checkpoint else []
+    if live is not None:
+        sessions.remove(session_id)
+    session = restore_session(run, checkpoint, events)
+    job = start_run(session, run["policy"], background_tasks, checkpoint)
+    resumed_from = {"iteration": checkpoint["iteration"], "phase": checkpoint["phase"]} if checkpoint else None
+    return {"status": "Simulation resumed", "session_id": session_id, "resumed_from": resumed_from, **job}
+
+@app.get("/api/runs")
+def list_runs(limit: int = 50, status: Optional[str] = None):
+    """Stored runs, newest first (status: running, complete, stopped, failed or interrupted)"""
+    store = get_run_store(config.get("run_store"))
+    return store.list_runs(limit, status) if store else []
+
+def get_stored_run(run_id: str):
+    store = get_run_store(config.get("run_store"))
+    run = store.get_run(run_id) if store else None
+    if run is None:
+        raise HTTPException(status_code=404, detail=f"Unknown run: {run_id}")
+    return store, run
+
+@app.get("/api/runs/{run_id}")
+def get_run(run_id: str):
+    """A stored run with its metrics, per-agent scores and checkpoints"""
+    store, run = get_stored_run(run_id)
+    return {**run, "metrics": store.metrics(run_id), "scores": store.scores(run_id), "checkpoints": store.checkpoints(run_id)}
+
+@app.get("/api/runs/{run_id}/events")
+def get_run_events(run_id: str, since: int = 0, limit: int = 1000):
+    store, _ = get_stored_run(run_id)
+    return store.events(run_id, since=since, limit=limit)
+
+@app.delete("/api/runs/{run_id}")
+def delete_run(run_id: str):
+    store, _ = get_stored_run(run_id)
+    store.delete_run(run_id)
+    return {"status": "Run deleted", "run_id": run_id}
+
+@app.get("/api/llm-cache")
+def get_llm_cache_stats():
+    """Hit/miss counters for the LLM response cache"""
+    cache = get_response_cache()
+    return cache.summary() if cache else {"enabled": False}
+
+@app.delete("/api/llm-cache")
+def clear_llm_cache():
+    cache = get_response_cache()
+    if cache:
+        cache.clear()
+    return {"status": "Cache cleared" if cache else "Cache disabled"}
+
+@app.get("/api/structured-output")
+def get_structured_output():
+    """Schema validation counters: valid first try, repaired, failed (per prompt type)"""
+    return get_structured_output_stats()
+
+@app.get("/api/llm-resilience")
+def get_llm_resilience():
+    """Retries, deadlines hit, hedges, circuit breakers and p95 latencies of this process's LLM calls
+    (worker processes report theirs through /metrics/prometheus)"""
+    return get_resilience_stats()
+
 @app.get("/config")
 def get_config():
     return config
 
 @app.post("/config")
-async def update_config(fast_demo: bool):
-    global config
+async def update_config(fast_demo: bool, debate_mode: Optional[str] = None, round_size: Optional[int] = None,
+                        reaction_mode: Optional[str] = None, reaction_batch_size: Optional[int] = None):
+    """Update defaults used by sessions started after this call"""
+    if debate_mode is not None:
+        if debate_mode not in ("sequential", "round"):
+            raise HTTPException(status_code=400, detail="debate_mode must be 'sequential' or 'round'")
+        config["debate_mode"] = debate_mode
+    if round_size is not None:
+        config["round_size"] = max(1, round_size)
+    if reaction_mode is not None:
+        if reaction_mode not in ("individual", "batched"):
+            raise HTTPException(status_code=400, detail="reaction_mode must be 'individual' or 'batched'")
+        config["reaction_mode"] = reaction_mode
+    if reaction_batch_size is not None:
+        config["reaction_batch_size"] = max(1, reaction_batch_size)
     config["fast_demo"] = fast_demo
     if fast_demo:
         config["max_exchanges"] = 25
@@ -377,49 +951,54 @@ async def update_config(fast_demo: bool):
     return {"status": "Config updated", "config": config}
 
 @app.post("/api/pause-cycle")
-async def pause_cycle():
+async def pause_cycle(session_id: Optional[str] = None):
     """Pause the current simulation"""
-    global simulation_paused
-    simulation_paused = True
-    return {"status": "Simulation paused"}
+    session = get_session(session_id)
+    session.simulation_paused = True
+    update_run_control(session)
+    return {"status": "Simulation paused", "session_id": session.session_id}
 
 @app.post("/api/continue-cycle")
-async def continue_cycle():
+async def continue_cycle(session_id: Optional[str] = None):
     """Continue the paused simulation"""
-    global simulation_paused
-    simulation_paused = False
-    return {"status": "Simulation resumed"}
+    session = get_session(session_id)
+    session.simulation_paused = False
+    update_run_control(session)
+    return {"status": "Simulation resumed", "session_id": session.session_id}
 
 @app.post("/api/stop-and-download")
-async def stop_and_download():
+async def stop_and_download(session_id: Optional[str] = None):
     """Stop simulation and return downloadable policy"""
-    global cycle_complete, simulation_paused
-    cycle_complete = True
-    simulation_paused = False
+    session = get_session(session_id)
+    session.cycle_complete = True
+    session.simulation_paused = False
+    update_run_control(session)
+    session.notify_listeners()
     
-    download_content = architect.get_downloadable_policy(current_policy, metrics)
-    return {"status": "Cycle stopped", "policy": download_content}
+    download_content = session.architect.get_downloadable_policy(session.current_policy, session.metrics)
+    return {"status": "Cycle stopped", "policy": download_content, "session_id": session.session_id}
 
-@app.get("/api/download-policy")
-def download_policy():
-    """Download the final policy as professional PDF"""
+def report_inputs(session: SimulationSession) -> dict:
+    """Everything the PDF report is rendered from (its hash is the report's ETag)"""
+    metrics = session.metrics
+    policy_document = session.policy_document
+    
     # Gather data for PDF
     citizen_score = metrics[-1]["citizen_score"] if metrics else 50.0
     senate_score = metrics[-1]["senate_score"] if metrics else 50.0
     
     # Extract citizen feedback summary from logs
-    citizen_msgs = [l["message"] for l in logs if l.get("type") != "senate" and l.get("type") != "architect" and l["role"] != "System"][:5]
+    citizen_msgs = [l["message"] for l in session.events.first_of_type("general", 5, exclude_agent="System")]
     citizen_summary = "\n".join([f"• {msg[:150]}..." for msg in citizen_msgs]) if citizen_msgs else "No citizen feedback recorded."
     
     # Extract senate analysis from logs
-    senate_msgs = [l["message"] for l in senate_chat_logs if l["agent"] != "System"][:3]
+    senate_msgs = [l["message"] for l in session.events.first_of_type("senate", 3, since=session.senate_since, exclude_agent="System")]
     senate_summary = "\n".join([f"• {msg[:150]}..." for msg in senate_msgs]) if senate_msgs else "No senate analysis recorded."
     
-    # Generate PDF
-    pdf_buffer = create_policy_pdf(
+    return dict(
         policy_title=policy_document.get("filename", "Policy Document").replace(".md", "").replace("_", " ").title() if policy_document else "Policy Proposal",
-        original_policy=current_policy or "No original policy provided.",
-        revised_policy=architect.revised_policy if hasattr(architect, 'revised_policy') and architect.revised_policy else "Policy revision pending completion of consensus process.",
+        original_policy=session.current_policy or "No original policy provided.",
+        revised_policy=session.revised_policy or "Policy revision pending completion of consensus process.",
         citizen_feedback_summary=citizen_summary,
         senate_analysis=senate_summary,
         eligibility_criteria=[
@@ -438,60 +1017,85 @@ def download_policy():
         ],
         citizen_score=citizen_score,
         senate_score=senate_score,
-        iteration_count=current_iteration
+        iteration_count=session.current_iteration
     )
+
+def prerender_report(session: SimulationSession):
+    """Render a finished run's report in the background so the first download is a cache hit"""
+    try:
+        report_cache.prerender(report_inputs(session))
+    except Exception as e:
+        print(f"Could not queue report for {session.session_id[:8]}: {e}")
+
+@app.get("/api/download-policy")
+async def download_policy(request: Request, session_id: Optional[str] = None):
+    """Download the final policy as professional PDF (rendered once per distinct report)"""
+    session = get_session(session_id)
+    inputs = report_inputs(session)
+    etag = f'"{report_key(inputs)}"'
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+    if etag in request.headers.get("if-none-match", ""):
+        return Response(status_code=304, headers=headers)
     
-    return StreamingResponse(
-        pdf_buffer,
+    _, pdf = await report_cache.render(inputs)
+    return Response(
+        pdf,
         media_type="application/pdf",
-        headers={"Content-Disposition": "attachment; filename=PolicySwarm_Report.pdf"}
+        headers={**headers, "Content-Disposition": "attachment; filename=PolicySwarm_Report.pdf"}
     )
 
+@app.get("/api/report-cache")
+def get_report_cache_stats():
+    """Hit/miss/render counters for the PDF report cache"""
+    return report_cache.summary()
+
 @app.post("/api/upload-policy")
-async def upload_policy_file(file: str, filename: str, background_tasks: BackgroundTasks):
+async def upload_policy_file(file: str, filename: str, background_tasks: BackgroundTasks, profile: bool = False):
     """Upload a markdown policy file"""
-    global policy_document, logs, debate_history, observer_reports, final_report, metrics
-    global current_iteration, simulation_paused, cycle_complete, architect_logs, senate_chat_logs
-    
     try:
-        policy_document = {"filename": filename, "content": file}
-        
-        # Reset all state
-        logs = []
-        debate_history = []
-        observer_reports = []
-        final_report = ""
-        metrics = []
-        current_iteration = 0
-        simulation_paused = False
-        cycle_complete = False
-        architect_logs = []
-        senate_chat_logs = []
+        session = create_session()
+        session.policy_document = {"filename": filename, "content": file}
+        if profile:
+            enable_profiling(session)
         
-        background_tasks.add_task(run_simulation, file)
-        return {"status": "Policy file uploaded and simulation started", "filename": filename}
+        job = start_run(session, file, background_tasks)
+        return {"status": "Policy file uploaded and simulation started", "filename": filename, "session_id": session.session_id, **job}
     except Exception as e:
         return {"status": "error", "message": str(e)}
 
 @app.post("/api/submit-policy")
-async def submit_policy(policy: str, background_tasks: BackgroundTasks):
-    global logs, debate_history, observer_reports, final_report, metrics
-    global current_iteration, simulation_paused, cycle_complete, architect_logs, senate_chat_logs
-    
-    # Reset all state
-    logs = []
-    debate_history = []
-    observer_reports = []
-    final_report = ""
-    metrics = []
-    current_iteration = 0
-    simulation_paused = False
-    cycle_complete = False
-    architect_logs = []
-    senate_chat_logs = []
-    
-    background_tasks.add_task(run_simulation, policy)
-    return {"status": "Simulation Started"}
+async def submit_policy(policy: str, background_tasks: BackgroundTasks, profile: bool = False):
+    session = create_session()
+    if profile:
+        enable_profiling(session)
+    job = start_run(session, policy, background_tasks)
+    return {"status": "Simulation Started", "session_id": session.session_id, **job}
+
+@app.get("/api/jobs")
+def list_jobs():
+    """Simulation jobs and worker processes (empty when running in-process)"""
+    if job_manager is None:
+        return {"enabled": False, "jobs": [], "workers": []}
+    return {"enabled": True, "jobs": job_manager.all(), "workers": job_manager.workers()}
+
+@app.get("/api/jobs/{job_id}")
+def get_job(job_id: str):
+    job = job_manager.get(job_id) if job_manager is not None else None
+    if job is None:
+        raise HTTPException(status_code=404, detail="Unknown job")
+    return job
+
+@app.delete("/api/jobs/{job_id}")
+def cancel_job(job_id: str):
+    """Stop a queued or running job (its session and log are kept)"""
+    if job_manager is None or not job_manager.has(job_id):
+        raise HTTPException(status_code=404, detail="Unknown job")
+    job_manager.cancel(job_id)
+    session = sessions.get(job_id)
+    if session is not None:
+        session.cycle_complete = True
+        session.notify_listeners()
+    return job_manager.get(job_id)
 
 if __name__ == "__main__":
     import uvicorn
@@ -0,0 +1,49 @@
+from core.event_log import EventLog
+
+def fill(log: EventLog, count: int, **fields):
+    for i in range(count):
+        log.append({"agent": f"A{i % 3}", "type": "senate" if i % 4 == 0 else "general", "message": str(i), **fields})
+
+def test_seqs_are_sequential_and_since_reads_the_tail():
+    log = EventLog(capacity=10)
+    fill(log, 6)
+    assert [e["seq"] for e in log.since(0)] == list(range(6))
+    assert [e["seq"] for e in log.since(4)] == [4, 5]
+    assert [e["seq"] for e in log.since(1, limit=2)] == [1, 2]
+    assert log.since(6) == []
+
+def test_ring_buffer_evicts_oldest_entries():
+    log = EventLog(capacity=5)
+    fill(log, 12)
+    assert len(log) == 12
+    assert log.first_seq == 7
+    assert log.get(6) is None
+    assert log.get(7)["message"] == "7"
+    assert [e["seq"] for e in log.since(0)] == [7, 8, 9, 10, 11]  # Nothing spilled
+
+def test_indexes_only_return_live_entries():
+    log = EventLog(capacity=5)
+    fill(log, 12)
+    assert [e["seq"] for e in log.by_type("senate")] == [8]
+    assert [e["seq"] for e in log.by_agent("A1")] == [7, 10]
+    assert [e["seq"] for e in log.by_type("general", since=10)] == [10, 11]
+    assert [e["seq"] for e in log.first_of_type("general", 2, exclude_agent="A1")] == [9, 11]
+
+def test_since_reads_evicted_entries_back_from_the_spill_file(tmp_path):
+    log = EventLog(capacity=4, spill_path=str(tmp_path / "log.jsonl"))
+    fill(log, 15)
+    assert [e["seq"] for e in log.since(0)] == list(range(15))
+    assert [e["seq"] for e in log.since(5)] == list(range(5, 15))
+    assert [e["message"] for e in log.since(3, limit=4)] == ["3", "4", "5", "6"]
+    assert [e["seq"] for e in log.since(10)] == list(range(10, 15))
+    log.close()
+
+def test_spilled_reads_seek_past_older_lines(tmp_path):
+    path = tmp_path / "log.jsonl"
+    path.write_text('{"seq": 0, "message": "from an earlier run"}\n', encoding="utf-8")
+    log = EventLog(capacity=2, spill_path=str(path))
+    fill(log, 6)
+    # Only this log's own spilled lines are read, starting at the requested seq
+    assert [e["message"] for e in log.since(0)] == ["0", "1", "2", "3", "4", "5"]
+    assert [e["message"] for e in log.since(2)] == ["2", "3", "4", "5"]
+    log.close()
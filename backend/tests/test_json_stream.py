@@ -0,0 +1,33 @@
+import json
+from core.json_stream import IncrementalJSONField
+
+def feed_all(chunks, field="message"):
+    extractor = IncrementalJSONField(field)
+    deltas = [extractor.feed(chunk) for chunk in chunks]
+    return extractor, deltas
+
+def test_streams_the_field_as_it_arrives():
+    extractor, deltas = feed_all(['{"score": 4, "mess', 'age": "Hel', 'lo there', '", "should_exit": false}'])
+    assert deltas == ["", "Hel", "lo there", ""]
+    assert extractor.value == "Hello there"
+    assert extractor.done
+
+def test_matches_json_decoding_one_character_at_a_time():
+    document = json.dumps({"message": 'Quote " slash \\ tab \t newline \n rupee ₹ done', "x": 1})
+    extractor, _ = feed_all(list(document))
+    assert extractor.value == json.loads(document)["message"]
+
+def test_escapes_split_across_chunks():
+    extractor, deltas = feed_all(['{"message": "a\\', 'nb\\u00', 'e9c"}'])
+    assert deltas == ["a", "\nb", "éc"]
+    assert extractor.value == "a\nbéc"
+
+def test_other_fields_and_text_after_the_value_are_ignored():
+    extractor, _ = feed_all(['{"summary": "not this", "message": "this"', ', "message_2": "nor this"}'])
+    assert extractor.value == "this"
+    assert extractor.feed("more") == ""
+    assert extractor.text.endswith("more")
+
+def test_missing_field_yields_nothing():
+    extractor, deltas = feed_all(['{"score": 5}'])
+    assert deltas == [""] and extractor.value == "" and not extractor.done
@@ -0,0 +1,85 @@
+import asyncio
+import time
+import pytest
+from core import llm_cache
+from core.llm_cache import LLMCache, make_cache_key
+
+@pytest.fixture
+def clock(monkeypatch):
+    """Controllable time.time() for the cache module"""
+    now = [time.time()]
+    monkeypatch.setattr(llm_cache.time, "time", lambda: now[0])
+    return now
+
+def test_key_covers_provider_options_and_schema():
+    base = make_cache_key("ollama", "m", {"temperature": 0.7}, "hi")
+    assert base == make_cache_key("ollama", "m", {"temperature": 0.7}, "hi")
+    assert base != make_cache_key("openai", "m", {"temperature": 0.7}, "hi")
+    assert base != make_cache_key("ollama", "m", {"temperature": 0.2}, "hi")
+    assert base != make_cache_key("ollama", "m", {"temperature": 0.7}, "hi", {"type": "object"})
+
+def test_memory_tier_is_lru():
+    cache = LLMCache(memory_entries=2)
+    cache.set("a", "1")
+    cache.set("b", "2")
+    assert cache.get("a") == "1"  # a is now the most recent
+    cache.set("c", "3")
+    assert cache.get("b") is None
+    assert cache.get("a") == "1" and cache.get("c") == "3"
+    assert cache.stats["evictions"] == 1
+    assert cache.stats["misses"] == 1
+
+def test_disk_writes_are_batched(tmp_path):
+    cache = LLMCache(str(tmp_path / "cache.sqlite"), flush_every=3)
+    cache.set("a", "1")
+    cache.set("b", "2")
+    assert cache.summary()["pending_writes"] == 2
+    assert cache.summary()["disk_entries"] == 0
+    cache.set("c", "3")
+    assert cache.summary()["pending_writes"] == 0
+    assert cache.summary()["disk_entries"] == 3
+    cache.close()
+
+def test_entries_survive_a_restart(tmp_path):
+    path = str(tmp_path / "cache.sqlite")
+    cache = LLMCache(path, flush_every=100)
+    cache.set("a", "1")
+    cache.close()  # Flushes the pending write
+    reopened = LLMCache(path)
+    assert reopened.get("a") == "1"
+    assert reopened.stats["disk_hits"] == 1
+    assert reopened.get("a") == "1"
+    assert reopened.stats["memory_hits"] == 1  # Promoted to memory by the disk hit
+    reopened.close()
+
+def test_expired_entries_are_misses(tmp_path, clock):
+    path = str(tmp_path / "cache.sqlite")
+    cache = LLMCache(path, ttl_seconds=60, flush_every=1)
+    cache.set("a", "1")
+    clock[0] += 61
+    assert cache.get("a") is None
+    assert cache.stats["expired"] == 2  # Memory copy, then the disk row
+    cache.close()
+    assert LLMCache(path, ttl_seconds=60).get("a") is None
+
+def test_expired_pending_entries_are_not_written(tmp_path, clock):
+    cache = LLMCache(str(tmp_path / "cache.sqlite"), ttl_seconds=60, flush_every=100)
+    cache.set("a", "1")
+    clock[0] += 61
+    assert cache.get("a") is None
+    assert cache.summary()["pending_writes"] == 0
+    cache.flush()
+    assert cache.summary()["disk_entries"] == 0
+    cache.close()
+
+def test_async_helpers(tmp_path):
+    async def scenario():
+        cache = LLMCache(str(tmp_path / "cache.sqlite"), memory_entries=1, flush_every=1)
+        await cache.aset("a", "1")
+        await cache.aset("b", "2")  # Evicts a from memory; it's on disk
+        assert await cache.aget("a") == "1"
+        assert await cache.aget("missing") is None
+        cache.close()
+        return cache.stats
+    stats = asyncio.run(scenario())
+    assert stats["disk_hits"] == 1 and stats["misses"] == 1
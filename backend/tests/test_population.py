@@ -0,0 +1,54 @@
+import numpy as np
+import pytest
+from core.population import DEFAULT_DISTRIBUTIONS, Population
+
+@pytest.fixture(scope="module")
+def population():
+    return Population.generate(20000, seed=7)
+
+def test_generation_follows_the_marginals(population):
+    shares = np.bincount(population.codes["income"], minlength=5) / population.size
+    expected = np.array(list(DEFAULT_DISTRIBUTIONS["income"].values()))
+    assert np.allclose(shares, expected / expected.sum(), atol=0.02)
+    assert Population.generate(500, seed=7).codes["region"].tolist() == Population.generate(500, seed=7).codes["region"].tolist()
+
+def test_occupations_pin_the_age_band(population):
+    labels = population.labels
+    students = population.codes["occupation"] == labels["occupation"].index("Student")
+    assert set(population.codes["age"][students]) == {labels["age"].index("18-25")}
+
+def test_stratified_sample_is_proportional(population):
+    sample = population.stratified_sample(200, strata=("region",), seed=1)
+    assert len(sample) == len(set(sample.tolist())) == 200
+    regions = population.codes["region"]
+    sampled = np.bincount(regions[sample], minlength=len(population.labels["region"]))
+    quotas = np.bincount(regions, minlength=len(population.labels["region"])) / population.size * 200
+    assert np.all(np.abs(sampled - quotas) < 1)  # Largest-remainder allocation
+
+def test_estimate_weights_scores_back_to_the_population():
+    population = Population.generate(1000, distributions={"income": {"Low": 0.8, "High": 0.2}}, seed=3)
+    # Oversample the small stratum: 10 of each
+    low = np.flatnonzero(population.codes["income"] == 0)[:10]
+    high = np.flatnonzero(population.codes["income"] == 1)[:10]
+    sample = np.concatenate([low, high])
+    population.record_scores(sample, [20] * 10 + [80] * 10)
+    estimate = population.estimate(sample, strata=("income",))
+    low_share = np.mean(population.codes["income"] == 0)
+    assert estimate["mean"] == pytest.approx(20 * low_share + 80 * (1 - low_share), abs=0.01)
+    assert estimate["stderr"] == 0.0
+    assert estimate["coverage"] == 1.0
+    segments = {s["segment"]: s for s in population.segment_scores("income", sample, strata=("income",))}
+    assert segments["Low"]["mean"] == 20 and segments["High"]["mean"] == 80
+
+def test_unscored_people_are_left_out():
+    population = Population.generate(1000, distributions={"income": {"Low": 0.5, "High": 0.5}}, seed=3)
+    sample = population.stratified_sample(10, strata=("income",))
+    assert population.estimate(sample, strata=("income",))["mean"] is None
+    population.record_scores(sample, [50, None] * 5)
+    estimate = population.estimate(sample, strata=("income",))
+    assert estimate["scored"] == 5 and estimate["mean"] == 50
+
+def test_personas_have_unique_names(population):
+    personas = population.personas_for(population.stratified_sample(300, seed=2))
+    assert len({p["name"] for p in personas}) == 300
+    assert all(p["traits"] for p in personas)
@@ -0,0 +1,89 @@
+import asyncio
+import pytest
+from core import llm, prompts
+from core.prompts import RollingSummary, count_tokens, fit, fit_lines, truncate, TRUNCATION_MARKER
+
+@pytest.fixture
+def budgets(monkeypatch):
+    """Token budgets from a test config"""
+    config = {"prompt_budgets": {"test": {"policy": 10, "recent": 12}}}
+    monkeypatch.setattr(llm, "config", config)
+    return config["prompt_budgets"]["test"]
+
+def test_budget_overrides_fall_back_to_defaults(budgets):
+    assert prompts.budget("test", "policy") == 10
+    assert prompts.budget("conversation_reply", "recent") == prompts.DEFAULT_BUDGETS["conversation_reply"]["recent"]
+    assert prompts.budget("test", "unknown") == 500
+
+def test_truncate_keeps_short_text_and_cuts_long_text():
+    assert truncate("short text", 50) == "short text"
+    long_text = " ".join(f"word{i}" for i in range(200))
+    cut = truncate(long_text, 20)
+    assert cut.endswith(TRUNCATION_MARKER)
+    assert count_tokens(cut[:-len(TRUNCATION_MARKER)]) <= 20
+    assert long_text.startswith(cut[:-len(TRUNCATION_MARKER)])
+
+def test_fit_uses_the_section_budget(budgets):
+    text = "policy " * 100
+    assert count_tokens(fit(text, "test", "policy").replace(TRUNCATION_MARKER, "")) <= 10
+
+def test_fit_lines_keeps_whole_lines_within_budget(budgets):
+    lines = [f"Speaker{i}: point {i}" for i in range(20)]
+    cost = count_tokens(lines[0]) + 1
+    newest = fit_lines(lines, "test", "recent", newest=True).split("\n")
+    assert newest == lines[-len(newest):]
+    assert len(newest) == budgets["recent"] // cost
+    oldest = fit_lines(lines, "test", "recent").split("\n")
+    assert oldest == lines[:len(oldest)]
+
+def test_fit_lines_always_shows_something(budgets):
+    huge = "x " * 500
+    kept = fit_lines([huge], "test", "recent", newest=True)
+    assert kept and kept.endswith(TRUNCATION_MARKER)
+
+def messages(count: int) -> list:
+    return [{"agent": f"A{i}", "message": f"message {i}"} for i in range(count)]
+
+def test_rolling_summary_refreshes_every_n_messages(monkeypatch):
+    prompts_seen = []
+
+    async def fake_json(prompt, **kwargs):
+        prompts_seen.append(prompt)
+        return {"summary": f"summary {len(prompts_seen)}", "main_points": []}
+    monkeypatch.setattr(llm, "aget_json_response", fake_json)
+
+    async def scenario():
+        summary = RollingSummary(every=3)
+        summary.update(messages(2))
+        assert summary._task is None  # Not enough new messages yet
+        summary.update(messages(4))
+        summary.update(messages(5))  # A refresh is already running
+        await summary._task
+        assert (summary.text, summary.covered) == ("summary 1", 4)
+        assert summary.context(messages(6)) == ("summary 1", messages(6)[4:])
+        summary.update(messages(6))
+        assert summary._task.done()  # Only 2 new messages
+        summary.update(messages(7))
+        await summary._task
+        return summary
+    summary = asyncio.run(scenario())
+    assert summary.updates == 2 and summary.covered == 7
+    assert "A3: message 3" in prompts_seen[0] and "summary 1" in prompts_seen[1]
+
+def test_rolling_summary_keeps_the_old_text_when_a_refresh_fails(monkeypatch):
+    async def fake_json(prompt, **kwargs):
+        return {"parse_failed": True, "error": "bad"}
+    monkeypatch.setattr(llm, "aget_json_response", fake_json)
+
+    async def scenario():
+        summary = RollingSummary(every=2)
+        summary.update(messages(2))
+        await summary._task
+        return summary
+    summary = asyncio.run(scenario())
+    assert (summary.text, summary.covered, summary.updates) == ("", 0, 0)
+
+def test_rolling_summary_can_be_disabled():
+    summary = RollingSummary(every=0)
+    summary.update(messages(50))
+    assert summary._task is None
@@ -0,0 +1,165 @@
+import asyncio
+import time
+import httpx
+import pytest
+from core import resilience
+from core.resilience import CircuitBreaker, CircuitOpenError, DeadlineExceeded, Resilience
+
+@pytest.fixture
+def clock(monkeypatch):
+    """Controllable time.monotonic() for the breaker"""
+    now = [time.monotonic()]
+    monkeypatch.setattr(resilience.time, "monotonic", lambda: now[0])
+    return now
+
+def http_error(status: int) -> httpx.HTTPStatusError:
+    request = httpx.Request("POST", "http://model.test/generate")
+    return httpx.HTTPStatusError(f"HTTP {status}", request=request, response=httpx.Response(status, request=request))
+
+def run_call(res: Resilience, attempt_fn, prompt_type: str = "default", slots: int = 4):
+    async def scenario():
+        stats = {}
+        result = await res.call("endpoint", "test", prompt_type, attempt_fn, asyncio.Semaphore(slots), stats)
+        return result, stats
+    return asyncio.run(scenario())
+
+# ============ CIRCUIT BREAKER ============
+def test_breaker_opens_after_consecutive_failures(clock):
+    breaker = CircuitBreaker(failure_threshold=3, reset_timeout=30)
+    breaker.record_failure()
+    breaker.record_failure()
+    breaker.record_success()  # Resets the streak
+    for _ in range(3):
+        assert breaker.allow()
+        breaker.record_failure()
+    assert breaker.state == "open" and breaker.times_opened == 1
+    assert not breaker.allow()
+
+def test_half_open_lets_one_probe_through(clock):
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=30)
+    breaker.record_failure()
+    clock[0] += 31
+    assert breaker.allow() and breaker.state == "half_open"
+    assert not breaker.allow()  # Probe in flight
+    breaker.release()
+    assert breaker.allow()
+    breaker.record_success()
+    assert breaker.state == "closed" and breaker.allow()
+
+def test_failed_probe_reopens(clock):
+    breaker = CircuitBreaker(failure_threshold=5, reset_timeout=30)
+    for _ in range(5):
+        breaker.record_failure()
+    clock[0] += 31
+    assert breaker.allow()
+    breaker.record_failure()
+    assert breaker.state == "open" and breaker.times_opened == 2
+    assert breaker.retry_in() == pytest.approx(30)
+
+@pytest.mark.parametrize("error, state", [
+    (http_error(400), "closed"),  # The endpoint answered
+    (ValueError("unparseable"), "half_open"),  # Says nothing about the endpoint
+    (http_error(503), "open"),
+])
+def test_errors_during_a_probe(clock, error, state):
+    res = Resilience({"breaker_failures": 1})
+    breaker = res.breaker("endpoint")
+    breaker.record_failure()
+    clock[0] += res.settings["breaker_reset"] + 1
+    assert breaker.allow()
+    assert not res._failed(error, breaker, "endpoint", "test", "default", attempt=0)
+    assert breaker.state == state
+    assert breaker.allow() == (state != "open")  # The probe slot was given back
+
+# ============ CALLS ============
+def test_transient_errors_are_retried():
+    res = Resilience({"backoff_base": 0})
+    attempts = []
+
+    async def attempt():
+        attempts.append(1)
+        if len(attempts) < 3:
+            raise http_error(503)
+        return "ok"
+    result, stats = run_call(res, attempt)
+    assert result == "ok" and stats["attempts"] == 3
+    assert res.stats["retries"] == 2
+    assert res.breaker("endpoint").state == "closed"
+
+def test_other_errors_are_not_retried():
+    res = Resilience({"backoff_base": 0})
+
+    async def attempt():
+        raise http_error(400)
+    with pytest.raises(httpx.HTTPStatusError):
+        run_call(res, attempt)
+    assert res.stats["retries"] == 0 and res.stats["failed"] == 1
+
+def test_slow_attempts_hit_the_deadline():
+    res = Resilience({"deadlines": {"quick": 0.05}, "max_retries": 0})
+
+    async def attempt():
+        await asyncio.sleep(1)
+    with pytest.raises(DeadlineExceeded):
+        run_call(res, attempt, prompt_type="quick")
+    assert res.stats["deadline_exceeded"] == 1
+
+def test_open_circuit_fails_fast():
+    res = Resilience({"backoff_base": 0, "max_retries": 0, "breaker_failures": 2})
+    calls = []
+
+    async def attempt():
+        calls.append(1)
+        raise httpx.ConnectError("refused")
+    for _ in range(2):
+        with pytest.raises(httpx.ConnectError):
+            run_call(res, attempt)
+    with pytest.raises(CircuitOpenError):
+        run_call(res, attempt)
+    assert len(calls) == 2 and res.stats["short_circuited"] == 1
+
+# ============ HEDGING ============
+def hedging(min_samples: int = 1) -> Resilience:
+    res = Resilience({"hedge": {"enabled": True, "percentile": 0.5, "min_delay": 0.02, "min_samples": min_samples}})
+    res._tracker("endpoint", "default").add(0.02)
+    return res
+
+def test_hedge_wins_when_the_first_attempt_stalls():
+    res = hedging()
+    delays = [1.0, 0.0]
+
+    async def attempt():
+        await asyncio.sleep(delays.pop(0))
+        return "answer"
+    started = time.perf_counter()
+    result, stats = run_call(res, attempt)
+    assert result == "answer" and stats["hedged"]
+    assert time.perf_counter() - started < 0.5  # Didn't wait for the stalled attempt
+    assert res.stats["hedges"] == 1 and res.stats["hedges_won"] == 1
+
+def test_no_hedge_without_a_free_slot():
+    res = hedging()
+
+    async def attempt():
+        await asyncio.sleep(0.05)
+        return "answer"
+    result, stats = run_call(res, attempt, slots=1)
+    assert result == "answer" and "hedged" not in stats
+    assert res.stats["hedges"] == 0
+
+def test_no_hedge_until_enough_latency_samples():
+    res = hedging(min_samples=5)
+    assert res.hedge_delay(res._tracker("endpoint", "default")) is None
+
+def test_hedged_race_fails_only_when_both_attempts_fail():
+    res = hedging()
+    outcomes = [(0.05, None), (0.0, RuntimeError("second failed"))]
+
+    async def attempt():
+        delay, error = outcomes.pop(0)
+        await asyncio.sleep(delay)
+        if error:
+            raise error
+        return "first"
+    result, _ = run_call(res, attempt)
+    assert result == "first" and res.stats["hedges_won"] == 0
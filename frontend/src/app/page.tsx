@@ -1,6 +1,6 @@
 "use client";
 
-import React, { useState, useEffect } from 'react';
+import React, { useState, useEffect, useRef } from 'react';
 import axios from 'axios';
 import { motion } from 'framer-motion';
 import { Users, LayoutDashboard, Settings, Eye, Building2, HelpCircle, Play, Pause, Download } from 'lucide-react';
@@ -25,26 +25,81 @@ export default function Home() {
   const [isComplete, setIsComplete] = useState(false);
   const [currentIteration, setCurrentIteration] = useState(0);
   const [citizenLogs, setCitizenLogs] = useState<{ agent: string, role: string, message: string }[]>([]);
-  const [senateLogs, setSenateLogs] = useState<{ agent: string, role: string, message: string }[]>([]);
-  const [architectLogs, setArchitectLogs] = useState<{ agent: string, role: string, message: string }[]>([]);
+  const [senateLogs, setSenateLogs] = useState<{ agent: string, role: string, message: string, seq: number }[]>([]);
+  const [architectLogs, setArchitectLogs] = useState<{ agent: string, role: string, message: string, seq: number }[]>([]);
   const [metrics, setMetrics] = useState<{ iteration: number, citizen_score: number, senate_score: number }[]>([]);
   const [report, setReport] = useState("");
+  // Session of the run started from this tab (null = follow the latest session)
+  const [sessionId, setSessionId] = useState<string | null>(null);
+  const [streamEpoch, setStreamEpoch] = useState(0);
+  // Replies still being generated, keyed by stream_id (replaced by the final log entry)
+  const [partials, setPartials] = useState<Record<number, { agent: string, role: string, message: string, type: string }>>({});
+  // First seq of the current iteration's Senate / Architect views (older entries are hidden)
+  const viewSince = useRef({ senate_since: 0, architect_since: 0 });
+  const sessionParams = () => (sessionId ? { session_id: sessionId } : {});
+
+  // Log entries are pushed over SSE instead of re-fetching the full lists
+  useEffect(() => {
+    setCitizenLogs([]);
+    setSenateLogs([]);
+    setArchitectLogs([]);
+    setPartials({});
+    viewSince.current = { senate_since: 0, architect_since: 0 };
+    const query = sessionId ? `?session_id=${sessionId}` : '';
+    const source = new EventSource(`${API_URL}/api/stream${query}`);
+    // A new iteration clears the Senate and Architect views
+    source.addEventListener('view', (e) => {
+      const view = JSON.parse((e as MessageEvent).data);
+      viewSince.current = view;
+      setSenateLogs(prev => prev.filter(entry => entry.seq >= view.senate_since));
+      setArchitectLogs(prev => prev.filter(entry => entry.seq >= view.architect_since));
+    });
+    source.addEventListener('log', (e) => {
+      const entry = JSON.parse((e as MessageEvent).data);
+      if (entry.stream_id !== undefined) {
+        setPartials(prev => {
+          const rest = { ...prev };
+          delete rest[entry.stream_id];
+          return rest;
+        });
+      }
+      if (entry.type === 'senate') {
+        if (entry.seq >= viewSince.current.senate_since) setSenateLogs(prev => [...prev, entry]);
+      } else if (entry.type === 'architect') {
+        if (entry.seq >= viewSince.current.architect_since) setArchitectLogs(prev => [...prev, entry]);
+      } else {
+        setCitizenLogs(prev => [...prev, entry]);
+      }
+    });
+    source.addEventListener('token', (e) => {
+      const token = JSON.parse((e as MessageEvent).data);
+      setPartials(prev => {
+        const current = prev[token.stream_id];
+        const message = (current ? current.message : '') + token.delta;
+        return { ...prev, [token.stream_id]: { agent: token.agent, role: token.role, message, type: token.type } };
+      });
+    });
+    // Unpinned streams announce a newer session (e.g. an upload); reconnect to follow it
+    source.addEventListener('session', () => {
+      source.close();
+      setStreamEpoch(n => n + 1);
+    });
+    source.addEventListener('complete', () => {
+      setPartials({});
+      if (sessionId) source.close();
+    });
+    return () => source.close();
+  }, [sessionId, streamEpoch]);
 
   useEffect(() => {
     const interval = setInterval(async () => {
       try {
-        const [citizenRes, senateRes, architectRes, metricRes, reportRes, statusRes] = await Promise.all([
-          axios.get(`${API_URL}/citizen-logs`),
-          axios.get(`${API_URL}/senate-logs`),
-          axios.get(`${API_URL}/architect-logs`),
-          axios.get(`${API_URL}/metrics`),
-          axios.get(`${API_URL}/report`),
-          axios.get(`${API_URL}/status`)
+        const [metricRes, reportRes, statusRes] = await Promise.all([
+          axios.get(`${API_URL}/metrics`, { params: sessionParams() }),
+          axios.get(`${API_URL}/report`, { params: sessionParams() }),
+          axios.get(`${API_URL}/status`, { params: sessionParams() })
         ]);
 
-        setCitizenLogs(citizenRes.data);
-        setSenateLogs(senateRes.data);
-        setArchitectLogs(architectRes.data);
         setMetrics(metricRes.data);
         setCurrentIteration(statusRes.data.iteration);
         setIsPaused(statusRes.data.paused);
@@ -65,7 +120,10 @@ export default function Home() {
       }
     }, 1000);
     return () => clearInterval(interval);
-  }, []);
+  }, [sessionId]);
+
+  const withPartials = (logs: { agent: string, role: string, message: string }[], type: string) =>
+    [...logs, ...Object.values(partials).filter(p => p.type === type)];
 
   const handleSubmit = async () => {
     if (!policy) return;
@@ -77,7 +135,8 @@ export default function Home() {
     setMetrics([]);
     setReport("");
     try {
-      await axios.post(`${API_URL}/api/submit-policy`, null, { params: { policy } });
+      const res = await axios.post(`${API_URL}/api/submit-policy`, null, { params: { policy } });
+      setSessionId(res.data.session_id);
     } catch (e) {
       alert("Failed to start simulation. Is backend running?");
       setIsRunning(false);
@@ -85,16 +144,17 @@ export default function Home() {
   };
 
   const handlePause = async () => {
-    await axios.post(`${API_URL}/api/pause-cycle`);
+    await axios.post(`${API_URL}/api/pause-cycle`, null, { params: sessionParams() });
   };
 
   const handleContinue = async () => {
-    await axios.post(`${API_URL}/api/continue-cycle`);
+    await axios.post(`${API_URL}/api/continue-cycle`, null, { params: sessionParams() });
   };
 
   const handleDownload = async () => {
     try {
       const res = await axios.get(`${API_URL}/api/download-policy`, {
+        params: sessionParams(),
         responseType: 'blob'
       });
       const blob = new Blob([res.data], { type: 'application/pdf' });
@@ -228,7 +288,7 @@ export default function Home() {
                     <Users className="w-5 h-5" /> Citizen Debate ({citizenLogs.length} msgs)
                   </h3>
                   <div className="h-80 overflow-hidden">
-                    <DebateFeed logs={citizenLogs} />
+                    <DebateFeed logs={withPartials(citizenLogs, 'general')} />
                   </div>
                 </div>
 
@@ -237,7 +297,7 @@ export default function Home() {
                     <Eye className="w-5 h-5" /> Senate Debate ({senateLogs.length} msgs)
                   </h3>
                   <div className="h-80 overflow-hidden">
-                    <SenateChatFeed logs={senateLogs} />
+                    <SenateChatFeed logs={withPartials(senateLogs, 'senate')} />
                   </div>
                 </div>
               </div>
@@ -274,7 +334,7 @@ export default function Home() {
               </h2>
               <p className="text-slate-400">Real-time strategic discussion between government advisors.</p>
               <div className="h-[70vh]">
-                <SenateChatFeed logs={senateLogs} />
+                <SenateChatFeed logs={withPartials(senateLogs, 'senate')} />
               </div>
             </div>
           )}
@@ -287,11 +347,11 @@ export default function Home() {
 
               <div className="bg-purple-900/20 border border-purple-500/30 rounded-2xl p-6">
                 <h3 className="text-xl font-bold text-purple-400 mb-4">📊 Analysis Steps</h3>
-                {architectLogs.length === 0 ? (
+                {withPartials(architectLogs, 'architect').length === 0 ? (
                   <p className="text-slate-500">Analysis will appear during simulation...</p>
                 ) : (
                   <div className="space-y-3 max-h-72 overflow-y-auto">
-                    {architectLogs.map((log, i) => (
+                    {withPartials(architectLogs, 'architect').map((log, i) => (
                       <div key={i} className="p-3 bg-slate-900/50 rounded-lg border-l-4 border-purple-500">
                         <div className="text-xs text-purple-400 font-mono mb-1">{log.role}</div>
                         <div className="text-sm text-slate-300">{log.message}</div>